@@ -0,0 +1,105 @@
+"""initial schema
+
+Tables as originally created by Base.metadata.create_all. Existing databases
+that were bootstrapped that way already have them, so each table is only
+created when missing.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 09:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if 'users' not in existing:
+        op.create_table(
+            'users',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('email', sa.String(), nullable=False),
+            sa.Column('hashed_password', sa.String(), nullable=False),
+            sa.Column('full_name', sa.String(), nullable=False),
+            sa.Column('is_premium', sa.Boolean(), nullable=True),
+            sa.Column('two_factor_enabled', sa.Boolean(), nullable=True),
+            sa.Column('two_factor_code', sa.String(), nullable=True),
+            sa.Column('two_factor_code_expires', sa.DateTime(), nullable=True),
+            sa.Column('email_verified', sa.Boolean(), nullable=True),
+            sa.Column('email_verification_token', sa.String(), nullable=True),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+            sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        )
+        op.create_index('ix_users_id', 'users', ['id'])
+        op.create_index('ix_users_email', 'users', ['email'], unique=True)
+
+    if 'cvs' not in existing:
+        op.create_table(
+            'cvs',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('title', sa.String(), nullable=False),
+            sa.Column('owner_id', sa.Integer(), sa.ForeignKey('users.id'), nullable=False),
+            sa.Column('personal_info', sa.JSON(), nullable=True),
+            sa.Column('education', sa.JSON(), nullable=True),
+            sa.Column('experience', sa.JSON(), nullable=True),
+            sa.Column('skills', sa.JSON(), nullable=True),
+            sa.Column('projects', sa.JSON(), nullable=True),
+            sa.Column('certifications', sa.JSON(), nullable=True),
+            sa.Column('languages', sa.JSON(), nullable=True),
+            sa.Column('achievements', sa.JSON(), nullable=True),
+            sa.Column('references', sa.JSON(), nullable=True),
+            sa.Column('template_id', sa.String(), nullable=True),
+            sa.Column('color_scheme', sa.String(), nullable=True),
+            sa.Column('is_public', sa.Boolean(), nullable=True),
+            sa.Column('pdf_url', sa.String(), nullable=True),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+            sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        )
+        op.create_index('ix_cvs_id', 'cvs', ['id'])
+
+    if 'subscriptions' not in existing:
+        op.create_table(
+            'subscriptions',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id'), nullable=False),
+            sa.Column('stripe_subscription_id', sa.String(), nullable=True, unique=True),
+            sa.Column('stripe_customer_id', sa.String(), nullable=True),
+            sa.Column('status', sa.String(), nullable=True),
+            sa.Column('plan_name', sa.String(), nullable=True),
+            sa.Column('current_period_start', sa.DateTime(), nullable=True),
+            sa.Column('current_period_end', sa.DateTime(), nullable=True),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        )
+        op.create_index('ix_subscriptions_id', 'subscriptions', ['id'])
+
+    if 'pdf_generations' not in existing:
+        op.create_table(
+            'pdf_generations',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('cv_id', sa.Integer(), sa.ForeignKey('cvs.id'), nullable=False),
+            sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id'), nullable=False),
+            sa.Column('status', sa.String(), nullable=True),
+            sa.Column('file_path', sa.String(), nullable=True),
+            sa.Column('error_message', sa.Text(), nullable=True),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+            sa.Column('completed_at', sa.DateTime(), nullable=True),
+        )
+        op.create_index('ix_pdf_generations_id', 'pdf_generations', ['id'])
+
+
+def downgrade() -> None:
+    op.drop_table('pdf_generations')
+    op.drop_table('subscriptions')
+    op.drop_table('cvs')
+    op.drop_table('users')
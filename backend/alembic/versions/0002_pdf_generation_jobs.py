@@ -0,0 +1,44 @@
+"""pdf generation job and render cache columns
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 09:10:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    columns = {column['name'] for column in inspector.get_columns('pdf_generations')}
+    indexes = {index['name'] for index in inspector.get_indexes('pdf_generations')}
+
+    if 'task_id' not in columns:
+        op.add_column('pdf_generations', sa.Column('task_id', sa.String(), nullable=True))
+    if 'content_hash' not in columns:
+        op.add_column('pdf_generations', sa.Column('content_hash', sa.String(), nullable=True))
+    if 'cache_hit' not in columns:
+        op.add_column('pdf_generations', sa.Column('cache_hit', sa.Boolean(), nullable=True))
+
+    if 'ix_pdf_generations_task_id' not in indexes:
+        op.create_index('ix_pdf_generations_task_id', 'pdf_generations', ['task_id'], unique=True)
+    if 'ix_pdf_generations_content_hash' not in indexes:
+        op.create_index('ix_pdf_generations_content_hash', 'pdf_generations', ['content_hash'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_pdf_generations_content_hash', table_name='pdf_generations')
+    op.drop_index('ix_pdf_generations_task_id', table_name='pdf_generations')
+    op.drop_column('pdf_generations', 'cache_hit')
+    op.drop_column('pdf_generations', 'content_hash')
+    op.drop_column('pdf_generations', 'task_id')
@@ -0,0 +1,42 @@
+"""composite indexes for CV listing and PDF job lookups
+
+Backfills cvs.updated_at so listings can order and paginate on it directly.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 09:20:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("UPDATE cvs SET updated_at = created_at WHERE updated_at IS NULL")
+    with op.batch_alter_table('cvs') as batch_op:
+        batch_op.alter_column('updated_at', server_default=sa.func.now())
+
+    op.create_index('ix_cvs_owner_id_updated_at', 'cvs', ['owner_id', 'updated_at', 'id'])
+    op.create_index(
+        'ix_pdf_generations_cv_id_user_id_status',
+        'pdf_generations',
+        ['cv_id', 'user_id', 'status']
+    )
+    op.create_index('ix_subscriptions_user_id_status', 'subscriptions', ['user_id', 'status'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_subscriptions_user_id_status', table_name='subscriptions')
+    op.drop_index('ix_pdf_generations_cv_id_user_id_status', table_name='pdf_generations')
+    op.drop_index('ix_cvs_owner_id_updated_at', table_name='cvs')
+    with op.batch_alter_table('cvs') as batch_op:
+        batch_op.alter_column('updated_at', server_default=None)
@@ -0,0 +1,30 @@
+"""cv version column for optimistic concurrency
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 11:05:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'cvs',
+        sa.Column('version', sa.Integer(), nullable=False, server_default='1')
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('cvs') as batch_op:
+        batch_op.drop_column('version')
@@ -1,14 +1,20 @@
-from fastapi import APIRouter, HTTPException, Depends, status
-from sqlalchemy.orm import Session
-from typing import List, Dict, Any
-import openai
-import os
+from fastapi import APIRouter, HTTPException, Depends, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Dict, Any, AsyncIterator, Optional, Tuple
+import asyncio
+import json
 from pydantic import BaseModel
 
-from ..models.database import get_db
+from ..models.database import get_async_db
 from ..core.auth import get_current_user
+from ..core.rate_limit import rate_limit, enforce_rate_limit
 from ..models.models import User
 from ..core.config import settings
+from ..services.ai_client import ai_client, AIStreamStalled, AIUnavailable
+from ..services.suggestion_engine import suggestion_engine
+from ..services.suggestion_cache import suggestion_cache, summary_key, job_description_key
+from ..services.ai_batch import pack_entries, batch_messages, parse_batch_output
 
 router = APIRouter()
 
@@ -30,167 +36,348 @@ class AIResponse(BaseModel):
 class AIJobDescriptionResponse(BaseModel):
     suggestions: List[str]
 
-# Configure OpenAI if API key is available
-if hasattr(settings, 'OPENAI_API_KEY') and settings.OPENAI_API_KEY:
-    openai.api_key = settings.OPENAI_API_KEY
-    AI_AVAILABLE = True
-else:
-    AI_AVAILABLE = False
+class SuggestJobDescriptionBatchRequest(BaseModel):
+    entries: List[SuggestJobDescriptionRequest]
+
+class AIJobDescriptionBatchItem(BaseModel):
+    suggestions: List[str]
+    source: str  # ai, cache, mock or ai+mock
+
+class AIJobDescriptionBatchResponse(BaseModel):
+    results: List[AIJobDescriptionBatchItem]  # in request order
+    llm_calls: int
+
+# Bullets returned per job description request
+JOB_DESCRIPTION_BULLETS = 5
 
 def generate_mock_summary(full_name: str, current_summary: str = "") -> str:
-    """Generate a mock professional summary when AI is not available"""
-    base_summaries = [
-        f"Dedicated and results-driven professional with expertise in delivering high-quality solutions. {full_name} brings a strong analytical mindset and excellent communication skills to drive project success and team collaboration.",
-        f"Experienced professional with a proven track record of achieving measurable results. {full_name} combines technical expertise with strategic thinking to solve complex challenges and deliver value to organizations.",
-        f"Dynamic and motivated professional with strong problem-solving abilities. {full_name} is committed to continuous learning and innovation, bringing fresh perspectives to drive business growth and operational excellence.",
-        f"Detail-oriented professional with extensive experience in project management and team leadership. {full_name} excels at building relationships, managing complex initiatives, and delivering results that exceed expectations."
-    ]
-    
-    import random
-    return random.choice(base_summaries)
+    """Generate an offline professional summary when AI is not available"""
+    return suggestion_engine.summary(full_name, current_summary)
 
 def generate_mock_job_descriptions(job_title: str, company: str) -> List[str]:
-    """Generate mock job descriptions when AI is not available"""
-    base_descriptions = [
-        f"Led strategic initiatives at {company} that resulted in improved operational efficiency and team productivity",
-        f"Collaborated with cross-functional teams to deliver high-impact projects on time and within budget",
-        f"Developed and implemented innovative solutions that enhanced business processes and customer satisfaction",
-        f"Managed key stakeholder relationships and communicated project progress to senior leadership",
-        f"Analyzed market trends and business requirements to inform strategic decision-making processes",
-        f"Mentored junior team members and contributed to a positive, collaborative work environment",
-        f"Utilized industry best practices to optimize workflows and drive continuous improvement initiatives"
-    ]
-    
-    # Customize descriptions based on job title
-    role_specific = {
-        "software": [
-            f"Developed and maintained scalable software applications using modern technologies and frameworks",
-            f"Participated in code reviews and implemented best practices for software development lifecycle",
-            f"Debugged and resolved complex technical issues to ensure optimal system performance"
-        ],
-        "manager": [
-            f"Supervised and developed a team of professionals, providing guidance and performance feedback",
-            f"Established and monitored key performance indicators to drive team success and goal achievement",
-            f"Facilitated strategic planning sessions and coordinated cross-departmental initiatives"
-        ],
-        "analyst": [
-            f"Conducted comprehensive data analysis to identify trends and provide actionable business insights",
-            f"Created detailed reports and presentations for stakeholders and executive leadership",
-            f"Implemented data-driven solutions to optimize business processes and support decision-making"
-        ],
-        "sales": [
-            f"Exceeded sales targets through effective client relationship management and strategic prospecting",
-            f"Developed and presented compelling proposals that addressed client needs and pain points",
-            f"Built and maintained a strong pipeline of qualified leads through networking and referrals"
-        ]
-    }
+    """Generate offline job descriptions when AI is not available"""
+    return suggestion_engine.job_descriptions(job_title, company, JOB_DESCRIPTION_BULLETS)
+
+def summary_messages(request: SuggestSummaryRequest) -> List[Dict[str, str]]:
+    prompt = f"""
+    Write a professional summary for {request.full_name}.
+    Current summary: {request.current_summary if request.current_summary else "None provided"}
+    Context: {request.context}
     
-    descriptions = base_descriptions.copy()
-    job_lower = job_title.lower()
+    Generate a compelling 2-3 sentence professional summary that highlights key strengths, 
+    experience, and value proposition. Make it engaging and tailored for a CV/resume.
+    Keep it professional and impactful.
+    """
+    return [
+        {"role": "system", "content": "You are a professional CV/resume writer who creates compelling professional summaries."},
+        {"role": "user", "content": prompt}
+    ]
+
+def job_description_messages(request: SuggestJobDescriptionRequest) -> List[Dict[str, str]]:
+    current_desc = "\n".join(request.current_descriptions) if request.current_descriptions else "None provided"
+    prompt = f"""
+    Generate 5 professional bullet points for a job description.
+    Job Title: {request.job_title}
+    Company: {request.company}
+    Current descriptions: {current_desc}
+    Context: {request.context}
     
-    for key, specific_desc in role_specific.items():
-        if key in job_lower:
-            descriptions.extend(specific_desc)
-            break
+    Create compelling, action-oriented bullet points that highlight achievements, 
+    responsibilities, and impact. Use strong action verbs and quantify results where possible.
+    Make them suitable for a professional CV/resume.
     
-    import random
-    return random.sample(descriptions, min(5, len(descriptions)))
+    Format: Return only the bullet point text without bullets or numbering.
+    """
+    return [
+        {"role": "system", "content": "You are a professional CV/resume writer who creates impactful job descriptions."},
+        {"role": "user", "content": prompt}
+    ]
+
+# Generic requests (no text of the user's own to work from) share a suggestion pool
+
+def summary_cache_key(request: SuggestSummaryRequest) -> Tuple[Optional[tuple], Dict[str, str]]:
+    key = None if request.current_summary else summary_key(request.context)
+    return key, {"full_name": request.full_name}
+
+def job_description_cache_key(request: SuggestJobDescriptionRequest) -> Tuple[Optional[tuple], Dict[str, str]]:
+    key = None if request.current_descriptions else job_description_key(request.job_title, request.context)
+    return key, {"company": request.company}
+
+def with_mock_bullets(bullets: List[str], request: SuggestJobDescriptionRequest) -> List[str]:
+    """Top bullets up to JOB_DESCRIPTION_BULLETS with mock ones."""
+    mock = [
+        text for text in generate_mock_job_descriptions(request.job_title, request.company)
+        if text not in bullets
+    ]
+    return bullets + mock[:JOB_DESCRIPTION_BULLETS - len(bullets)]
 
 @router.post("/suggest-summary", response_model=AIResponse)
 async def suggest_summary(
     request: SuggestSummaryRequest,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(rate_limit("ai"))
 ):
     """Generate AI-powered professional summary suggestions"""
     
-    if not AI_AVAILABLE:
+    if not ai_client.available:
         # Return mock suggestion when AI is not configured
         suggestion = generate_mock_summary(request.full_name, request.current_summary)
         return AIResponse(suggestion=suggestion)
     
+    cache_key, placeholders = summary_cache_key(request)
+    if cache_key:
+        cached = await suggestion_cache.sample(cache_key, 1, placeholders)
+        if cached:
+            return AIResponse(suggestion=cached[0])
+    
     try:
-        # Prepare the prompt for OpenAI
-        prompt = f"""
-        Write a professional summary for {request.full_name}.
-        Current summary: {request.current_summary if request.current_summary else "None provided"}
-        Context: {request.context}
-        
-        Generate a compelling 2-3 sentence professional summary that highlights key strengths, 
-        experience, and value proposition. Make it engaging and tailored for a CV/resume.
-        Keep it professional and impactful.
-        """
-        
-        response = openai.ChatCompletion.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are a professional CV/resume writer who creates compelling professional summaries."},
-                {"role": "user", "content": prompt}
-            ],
+        suggestion = await ai_client.complete(
+            messages=summary_messages(request),
             max_tokens=150,
             temperature=0.7
         )
-        
-        suggestion = response.choices[0].message.content.strip()
+        if cache_key and suggestion:
+            await suggestion_cache.add(cache_key, [suggestion], placeholders)
         return AIResponse(suggestion=suggestion)
         
     except Exception as e:
         # Fallback to mock suggestion if AI fails
+        print(f"AI summary suggestion failed: {str(e)}")
         suggestion = generate_mock_summary(request.full_name, request.current_summary)
         return AIResponse(suggestion=suggestion)
 
 @router.post("/suggest-job-description", response_model=AIJobDescriptionResponse)
 async def suggest_job_description(
     request: SuggestJobDescriptionRequest,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(rate_limit("ai"))
 ):
     """Generate AI-powered job description bullet points"""
     
-    if not AI_AVAILABLE:
+    if not ai_client.available:
         # Return mock suggestions when AI is not configured
         suggestions = generate_mock_job_descriptions(request.job_title, request.company)
         return AIJobDescriptionResponse(suggestions=suggestions)
     
+    cache_key, placeholders = job_description_cache_key(request)
+    if cache_key:
+        cached = await suggestion_cache.sample(cache_key, JOB_DESCRIPTION_BULLETS, placeholders)
+        if cached:
+            return AIJobDescriptionResponse(suggestions=cached)
+    
     try:
-        # Prepare the prompt for OpenAI
-        current_desc = "\n".join(request.current_descriptions) if request.current_descriptions else "None provided"
-        
-        prompt = f"""
-        Generate 5 professional bullet points for a job description.
-        Job Title: {request.job_title}
-        Company: {request.company}
-        Current descriptions: {current_desc}
-        Context: {request.context}
-        
-        Create compelling, action-oriented bullet points that highlight achievements, 
-        responsibilities, and impact. Use strong action verbs and quantify results where possible.
-        Make them suitable for a professional CV/resume.
-        
-        Format: Return only the bullet point text without bullets or numbering.
-        """
-        
-        response = openai.ChatCompletion.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are a professional CV/resume writer who creates impactful job descriptions."},
-                {"role": "user", "content": prompt}
-            ],
+        suggestions_text = await ai_client.complete(
+            messages=job_description_messages(request),
             max_tokens=300,
             temperature=0.7
         )
-        
-        suggestions_text = response.choices[0].message.content.strip()
         suggestions = [s.strip() for s in suggestions_text.split('\n') if s.strip()]
+        if cache_key and suggestions:
+            await suggestion_cache.add(cache_key, suggestions, placeholders)
         
         # Ensure we have at least 3 suggestions
         if len(suggestions) < 3:
-            mock_suggestions = generate_mock_job_descriptions(request.job_title, request.company)
-            suggestions.extend(mock_suggestions[:5-len(suggestions)])
+            suggestions = with_mock_bullets(suggestions, request)
         
-        return AIJobDescriptionResponse(suggestions=suggestions[:5])
+        return AIJobDescriptionResponse(suggestions=suggestions[:JOB_DESCRIPTION_BULLETS])
         
     except Exception as e:
         # Fallback to mock suggestions if AI fails
+        print(f"AI job description suggestion failed: {str(e)}")
         suggestions = generate_mock_job_descriptions(request.job_title, request.company)
         return AIJobDescriptionResponse(suggestions=suggestions)
+
+@router.post("/suggest-job-descriptions/batch", response_model=AIJobDescriptionBatchResponse)
+async def suggest_job_descriptions_batch(
+    request: SuggestJobDescriptionBatchRequest,
+    response: Response,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Generate bullet points for many experience entries at once.
+
+    Entries are packed into as few LLM calls as AI_BATCH_TOKEN_BUDGET
+    allows and the calls run concurrently. Entries the model did not answer
+    (or every entry, if AI is unavailable) get mock suggestions. Each
+    entry counts as one request against the user's AI rate limit.
+    """
+    entries = request.entries
+    if not entries:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No entries to improve"
+        )
+    if len(entries) > settings.AI_BATCH_MAX_ENTRIES:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {settings.AI_BATCH_MAX_ENTRIES} entries per batch"
+        )
+    await enforce_rate_limit(current_user, "ai", db, response, cost=len(entries))
+    
+    results: Dict[int, AIJobDescriptionBatchItem] = {}
+    pending = []
+    if ai_client.available:
+        for entry_id, entry in enumerate(entries):
+            cache_key, placeholders = job_description_cache_key(entry)
+            cached = None
+            if cache_key:
+                cached = await suggestion_cache.sample(cache_key, JOB_DESCRIPTION_BULLETS, placeholders)
+            if cached:
+                results[entry_id] = AIJobDescriptionBatchItem(suggestions=cached, source="cache")
+            else:
+                pending.append(entry_id)
+    
+    packs = pack_entries(
+        entries, pending,
+        token_budget=settings.AI_BATCH_TOKEN_BUDGET,
+        output_tokens_per_entry=settings.AI_BATCH_OUTPUT_TOKENS_PER_ENTRY
+    )
+    
+    async def run_pack(pack: List[int]) -> Dict[int, List[str]]:
+        try:
+            text = await ai_client.complete(
+                messages=batch_messages(entries, pack),
+                max_tokens=settings.AI_BATCH_OUTPUT_TOKENS_PER_ENTRY * len(pack),
+                temperature=0.7
+            )
+        except Exception as e:
+            print(f"Batched AI call failed for {len(pack)} entries: {str(e)}")
+            return {}
+        return parse_batch_output(text, pack)
+    
+    for answers in await asyncio.gather(*(run_pack(pack) for pack in packs)):
+        for entry_id, bullets in answers.items():
+            entry = entries[entry_id]
+            cache_key, placeholders = job_description_cache_key(entry)
+            if cache_key:
+                await suggestion_cache.add(cache_key, bullets, placeholders)
+            source = "ai"
+            if len(bullets) < 3:
+                bullets = with_mock_bullets(bullets, entry)
+                source = "ai+mock"
+            results[entry_id] = AIJobDescriptionBatchItem(
+                suggestions=bullets[:JOB_DESCRIPTION_BULLETS], source=source
+            )
+    
+    # Per-entry fallback: AI unavailable, call failed or entry missing from the answer
+    for entry_id, entry in enumerate(entries):
+        if entry_id not in results:
+            results[entry_id] = AIJobDescriptionBatchItem(
+                suggestions=generate_mock_job_descriptions(entry.job_title, entry.company),
+                source="mock"
+            )
+    
+    return AIJobDescriptionBatchResponse(
+        results=[results[entry_id] for entry_id in range(len(entries))],
+        llm_calls=len(packs)
+    )
+
+# Streaming variants (text/event-stream)
+#
+# Events: "token" (raw model output as it arrives), "bullet" (a completed
+# job description line), "fallback" (the model stalled or failed; the rest
+# comes from mock suggestions) and a final "done" with the full result and
+# its source: "ai", "cache", "mock" or "ai+mock".
+
+def sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def fallback_reason(error: Exception) -> str:
+    if isinstance(error, AIStreamStalled):
+        return "stalled"
+    if isinstance(error, AIUnavailable):
+        return "unavailable"
+    return "error"
+
+def event_stream(events: AsyncIterator[str], headers: Optional[Dict[str, str]] = None) -> StreamingResponse:
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        # Proxies must not buffer the stream
+        headers={**(headers or {}), "Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+async def stream_summary(request: SuggestSummaryRequest) -> AsyncIterator[str]:
+    cache_key, placeholders = summary_cache_key(request)
+    if ai_client.available:
+        if cache_key:
+            cached = await suggestion_cache.sample(cache_key, 1, placeholders)
+            if cached:
+                yield sse("done", {"suggestion": cached[0], "source": "cache"})
+                return
+        parts = []
+        try:
+            async for text in ai_client.stream(summary_messages(request), max_tokens=150, temperature=0.7):
+                parts.append(text)
+                yield sse("token", {"text": text})
+            suggestion = "".join(parts).strip()
+            if suggestion:
+                if cache_key:
+                    await suggestion_cache.add(cache_key, [suggestion], placeholders)
+                yield sse("done", {"suggestion": suggestion, "source": "ai"})
+                return
+        except Exception as e:
+            # Tokens already sent are superseded by the suggestion in "done"
+            yield sse("fallback", {"reason": fallback_reason(e)})
+    yield sse("done", {
+        "suggestion": generate_mock_summary(request.full_name, request.current_summary),
+        "source": "mock"
+    })
+
+async def stream_job_description(request: SuggestJobDescriptionRequest) -> AsyncIterator[str]:
+    cache_key, placeholders = job_description_cache_key(request)
+    bullets: List[str] = []
+    source = "mock"
+    if ai_client.available:
+        if cache_key:
+            cached = await suggestion_cache.sample(cache_key, JOB_DESCRIPTION_BULLETS, placeholders)
+            if cached:
+                for text in cached:
+                    yield sse("bullet", {"text": text})
+                yield sse("done", {"suggestions": cached, "source": "cache"})
+                return
+        pending = ""
+        try:
+            async for text in ai_client.stream(job_description_messages(request), max_tokens=300, temperature=0.7):
+                yield sse("token", {"text": text})
+                # Every completed line is a bullet
+                lines = (pending + text).split('\n')
+                pending = lines.pop()
+                for line in lines:
+                    if line.strip() and len(bullets) < JOB_DESCRIPTION_BULLETS:
+                        bullets.append(line.strip())
+                        yield sse("bullet", {"text": line.strip()})
+            if pending.strip() and len(bullets) < JOB_DESCRIPTION_BULLETS:
+                bullets.append(pending.strip())
+                yield sse("bullet", {"text": pending.strip()})
+            if cache_key and bullets:
+                await suggestion_cache.add(cache_key, bullets, placeholders)
+            source = "ai"
+        except Exception as e:
+            # Keep the bullets already sent and complete the list with mock ones
+            yield sse("fallback", {"reason": fallback_reason(e)})
+            source = "ai+mock" if bullets else "mock"
+
+    if source != "ai" or len(bullets) < 3:
+        for text in with_mock_bullets(bullets, request)[len(bullets):]:
+            bullets.append(text)
+            yield sse("bullet", {"text": text})
+        source = "ai+mock" if source == "ai" else source
+    yield sse("done", {"suggestions": bullets, "source": source})
+
+@router.post("/suggest-summary/stream")
+async def suggest_summary_stream(
+    request: SuggestSummaryRequest,
+    response: Response,
+    current_user: User = Depends(rate_limit("ai"))
+):
+    """Stream a professional summary suggestion as server-sent events."""
+    return event_stream(stream_summary(request), headers=dict(response.headers))
+
+@router.post("/suggest-job-description/stream")
+async def suggest_job_description_stream(
+    request: SuggestJobDescriptionRequest,
+    response: Response,
+    current_user: User = Depends(rate_limit("ai"))
+):
+    """Stream job description bullet points as server-sent events; each
+    bullet is sent as soon as its line is complete."""
+    return event_stream(stream_job_description(request), headers=dict(response.headers))
@@ -1,10 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Request
-from sqlalchemy.orm import Session
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy import select
+from typing import List
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
-from app.models.database import get_db
-from app.models.models import User
+from app.models.database import get_async_db
+from app.models.models import User, RefreshToken
 from app.schemas.schemas import (
     UserCreate, UserLogin, User as UserSchema, Token,
+    RefreshTokenRequest, LoginSession, RateLimitStatus, UsageLimits,
     TwoFactorSetupRequest, TwoFactorSetupResponse,
     TwoFactorVerifyRequest, TwoFactorLoginRequest,
     TwoFactorDisableRequest, EmailVerificationRequest,
@@ -13,9 +17,19 @@ from app.schemas.schemas import (
 from app.core.auth import (
     authenticate_user,
     create_access_token,
-    get_password_hash,
+    decode_access_token,
+    security,
+    RefreshTokenError,
+    hash_refresh_token,
+    issue_refresh_token,
+    revoke_refresh_family,
+    rotate_refresh_token,
+    get_password_hash_async,
     get_current_user,
-    verify_password,
+    get_current_user_for_update,
+    invalidate_cached_user,
+    user_token_claims,
+    verify_password_async,
     generate_2fa_code,
     generate_verification_token,
     generate_backup_codes,
@@ -25,95 +39,95 @@ from app.core.auth import (
     verify_email_token,
     is_2fa_code_valid
 )
+from app.core.rate_limit import rate_limiter
+
+from app.core.config import settings, celery_enabled
 
 # Import email service directly for fallback
 from app.services.email_service import email_service
+from app.services.mail_dispatcher import mail_dispatcher
+from app.services.login_notifier import login_notifier
 
-# Try to import celery tasks, fallback to direct email sending if not available
+# Try to import celery tasks, fallback to the in-process mail queue if not available
 try:
     from app.tasks.email_tasks import (
         send_2fa_code_task,
-        send_email_verification_task,
-        send_login_notification_task
+        send_email_verification_task
     )
-    CELERY_AVAILABLE = True
 except ImportError:
-    CELERY_AVAILABLE = False
-    print("⚠️  Celery not available, using direct email sending")
+    print("⚠️  Celery not available, using the in-process mail queue")
 
 router = APIRouter()
 
-# Helper functions for email sending with celery fallback
-def send_verification_email(user_id: int, verification_token: str):
+# Helper functions for email sending with celery fallback.
+# Neither path blocks the handler: Celery tasks are published, otherwise the
+# message is queued for the in-process sender coroutines.
+def send_verification_email(user: User, verification_token: str):
     """Send verification email with celery fallback."""
-    if CELERY_AVAILABLE:
-        send_email_verification_task.delay(user_id, verification_token)
+    if celery_enabled():
+        send_email_verification_task.delay(user.id, verification_token)
     else:
-        # Direct email sending fallback
-        from app.models.database import get_db
-        db = next(get_db())
-        try:
-            user = db.query(User).filter(User.id == user_id).first()
-            if user:
-                email_service.send_email_verification(
-                    email=user.email,
-                    verification_token=verification_token,
-                    user_name=user.full_name
-                )
-        finally:
-            db.close()
+        mail_dispatcher.enqueue(
+            email_service.build_email_verification_message(
+                email=user.email,
+                verification_token=verification_token,
+                user_name=user.full_name
+            ),
+            "email verification"
+        )
 
-def send_2fa_code_email(user_id: int, code: str):
+def send_2fa_code_email(user: User, code: str):
     """Send 2FA code email with celery fallback."""
-    if CELERY_AVAILABLE:
-        send_2fa_code_task.delay(user_id, code)
+    if celery_enabled():
+        send_2fa_code_task.delay(user.id, code)
     else:
-        # Direct email sending fallback
-        from app.models.database import get_db
-        db = next(get_db())
-        try:
-            user = db.query(User).filter(User.id == user_id).first()
-            if user:
-                email_service.send_2fa_code(
-                    email=user.email,
-                    code=code,
-                    user_name=user.full_name
-                )
-        finally:
-            db.close()
+        mail_dispatcher.enqueue(
+            email_service.build_2fa_code_message(
+                email=user.email,
+                code=code,
+                user_name=user.full_name
+            ),
+            "2FA code email"
+        )
 
-def send_login_notification_email(user_id: int, login_info: dict):
-    """Send login notification email with celery fallback."""
-    if CELERY_AVAILABLE:
-        send_login_notification_task.delay(user_id, login_info)
-    else:
-        # Direct email sending fallback
-        from app.models.database import get_db
-        db = next(get_db())
-        try:
-            user = db.query(User).filter(User.id == user_id).first()
-            if user:
-                email_service.send_login_notification(
-                    email=user.email,
-                    user_name=user.full_name,
-                    login_info=login_info
-                )
-        finally:
-            db.close()
+def send_login_notification_email(user: User, login_info: dict):
+    """Send login notification; logins close together are sent as one digest."""
+    login_notifier.record(user, login_info)
+
+def client_ip(request: Request) -> str:
+    return request.client.host if request.client else "Unknown"
+
+def token_response(user: User, refresh_token: str, session_id: str) -> dict:
+    return {
+        "access_token": create_access_token(data=user_token_claims(user, session_id)),
+        "token_type": "bearer",
+        "refresh_token": refresh_token,
+        "expires_in": settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+    }
+
+async def start_session(db: AsyncSession, user: User, request: Request) -> dict:
+    """Issue the access/refresh token pair for a completed login."""
+    refresh_token, session_id = issue_refresh_token(
+        db, user.id, request.headers.get("user-agent"), client_ip(request)
+    )
+    await db.commit()
+    return token_response(user, refresh_token, session_id)
 
 @router.post("/register", response_model=UserSchema)
-async def register(user_data: UserCreate, db: Session = Depends(get_db)):
+async def register(user_data: UserCreate, db: AsyncSession = Depends(get_async_db)):
     """Register a new user."""
     # Check if user already exists
-    db_user = db.query(User).filter(User.email == user_data.email).first()
+    result = await db.execute(select(User).filter(User.email == user_data.email))
+    db_user = result.scalars().first()
     if db_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
     
-    # Create new user
-    hashed_password = get_password_hash(user_data.password)
+    # Create new user (ending the read first, so no connection is held while hashing)
+    await db.commit()
+    hashed_password = await get_password_hash_async(user_data.password)
     verification_token = generate_verification_token()
     
     db_user = User(
@@ -124,18 +138,18 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
     )
     
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     
     # Send verification email
-    send_verification_email(db_user.id, verification_token)
+    send_verification_email(db_user, verification_token)
     
     return db_user
 
 @router.post("/login", response_model=Token)
-async def login(user_credentials: UserLogin, request: Request, db: Session = Depends(get_db)):
+async def login(user_credentials: UserLogin, request: Request, db: AsyncSession = Depends(get_async_db)):
     """Authenticate user and return access token."""
-    user = authenticate_user(db, user_credentials.email, user_credentials.password)
+    user = await authenticate_user(db, user_credentials.email, user_credentials.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -147,10 +161,10 @@ async def login(user_credentials: UserLogin, request: Request, db: Session = Dep
     if user.two_factor_enabled:
         # Generate and send 2FA code
         code = generate_2fa_code()
-        set_2fa_code(db, user, code)
+        await set_2fa_code(db, user, code)
         
         # Send 2FA code via email
-        send_2fa_code_email(user.id, code)
+        send_2fa_code_email(user, code)
         
         raise HTTPException(
             status_code=status.HTTP_202_ACCEPTED,
@@ -158,17 +172,98 @@ async def login(user_credentials: UserLogin, request: Request, db: Session = Dep
         )
     
     # Regular login without 2FA
-    access_token = create_access_token(data={"sub": user.email})
+    tokens = await start_session(db, user, request)
     
     # Send login notification
     login_info = {
         "time": datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S UTC"),
-        "ip": request.client.host if request.client else "Unknown",
+        "ip": client_ip(request),
         "device": request.headers.get("user-agent", "Unknown")
     }
-    send_login_notification_email(user.id, login_info)
+    send_login_notification_email(user, login_info)
     
-    return {"access_token": access_token, "token_type": "bearer"}
+    return tokens
+
+@router.post("/refresh", response_model=Token)
+async def refresh_access_token(
+    request_data: RefreshTokenRequest,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Exchange a refresh token for a new access token and refresh token.
+
+    The presented refresh token is single use; no password check or login
+    notification is involved.
+    """
+    try:
+        user, refresh_token, session_id = await rotate_refresh_token(
+            db, request_data.refresh_token, client_ip(request)
+        )
+    except RefreshTokenError as e:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=str(e),
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return token_response(user, refresh_token, session_id)
+
+@router.post("/logout")
+async def logout(request_data: RefreshTokenRequest, db: AsyncSession = Depends(get_async_db)):
+    """End the session a refresh token belongs to."""
+    result = await db.execute(
+        select(RefreshToken.family_id).filter(
+            RefreshToken.token_hash == hash_refresh_token(request_data.refresh_token)
+        )
+    )
+    family_id = result.scalar()
+    if family_id is not None:
+        await revoke_refresh_family(db, family_id)
+        await db.commit()
+    return {"message": "Logged out successfully"}
+
+@router.get("/sessions", response_model=List[LoginSession])
+async def list_sessions(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """List the devices the current user is logged in on."""
+    current_session = (decode_access_token(credentials.credentials) or {}).get("sid")
+    result = await db.execute(
+        select(RefreshToken).filter(
+            RefreshToken.user_id == current_user.id,
+            RefreshToken.revoked_at.is_(None),
+            RefreshToken.expires_at > datetime.utcnow()
+        ).order_by(RefreshToken.created_at.desc())
+    )
+    return [
+        LoginSession(
+            id=token.family_id,
+            device=token.device,
+            ip_address=token.ip_address,
+            last_refreshed_at=token.created_at,
+            expires_at=token.expires_at,
+            current=token.family_id == current_session
+        )
+        for token in result.scalars().all()
+    ]
+
+@router.delete("/sessions/{session_id}")
+async def revoke_session(
+    session_id: str,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Log out one device. Access tokens already issued to it stay valid
+    until they expire (ACCESS_TOKEN_EXPIRE_MINUTES)."""
+    revoked = await revoke_refresh_family(db, session_id, user_id=current_user.id)
+    if not revoked:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Session not found"
+        )
+    await db.commit()
+    return {"message": "Session revoked"}
 
 @router.get("/me", response_model=UserSchema)
 async def read_users_me(current_user: User = Depends(get_current_user)):
@@ -178,28 +273,49 @@ async def read_users_me(current_user: User = Depends(get_current_user)):
 @router.put("/me", response_model=UserSchema)
 async def update_user_me(
     user_update: dict,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_for_update),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update current user information."""
     # Update allowed fields
     if "full_name" in user_update:
         current_user.full_name = user_update["full_name"]
     
-    db.commit()
-    db.refresh(current_user)
+    await db.commit()
+    await db.refresh(current_user)
+    invalidate_cached_user(current_user.id)
     return current_user
 
+@router.get("/me/limits", response_model=UsageLimits)
+async def read_usage_limits(
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Current user's plan and what is left of each rate limit."""
+    plan = await rate_limiter.plan_for(current_user, db)
+    limits = {}
+    for scope in rate_limiter.limits[plan]:
+        decision = await rate_limiter.check(current_user, scope, db, cost=0)
+        headers = decision.headers()
+        limits[scope] = RateLimitStatus(
+            limit=decision.limit.capacity,
+            period_seconds=int(decision.limit.period),
+            remaining=int(headers["X-RateLimit-Remaining"]),
+            reset_seconds=int(headers["X-RateLimit-Reset"])
+        )
+    return UsageLimits(plan=plan, limits=limits)
+
 # 2FA Endpoints
 
 @router.post("/2fa/verify-login", response_model=Token)
 async def verify_2fa_login(
     request_data: TwoFactorLoginRequest,
     request: Request,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Complete login with 2FA verification code."""
-    user = db.query(User).filter(User.email == request_data.email).first()
+    result = await db.execute(select(User).filter(User.email == request_data.email))
+    user = result.scalars().first()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -214,30 +330,30 @@ async def verify_2fa_login(
         )
     
     # Clear the used 2FA code
-    clear_2fa_code(db, user)
+    await clear_2fa_code(db, user)
     
-    # Create access token
-    access_token = create_access_token(data={"sub": user.email})
+    # Create access and refresh tokens
+    tokens = await start_session(db, user, request)
     
     # Send login notification
     login_info = {
         "time": datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S UTC"),
-        "ip": request.client.host if request.client else "Unknown",
+        "ip": client_ip(request),
         "device": request.headers.get("user-agent", "Unknown")
     }
-    send_login_notification_email(user.id, login_info)
+    send_login_notification_email(user, login_info)
     
-    return {"access_token": access_token, "token_type": "bearer"}
+    return tokens
 
 @router.post("/2fa/setup", response_model=TwoFactorSetupResponse)
 async def setup_2fa(
     request_data: TwoFactorSetupRequest,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_for_update),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Enable 2FA for the current user."""
     # Verify current password
-    if not verify_password(request_data.password, current_user.hashed_password):
+    if not await verify_password_async(request_data.password, current_user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid password"
@@ -252,8 +368,9 @@ async def setup_2fa(
     
     # Enable 2FA
     current_user.two_factor_enabled = True
-    db.commit()
-    db.refresh(current_user)
+    await db.commit()
+    await db.refresh(current_user)
+    invalidate_cached_user(current_user.id)
     
     # Generate backup codes
     backup_codes = generate_backup_codes()
@@ -266,12 +383,12 @@ async def setup_2fa(
 @router.post("/2fa/disable")
 async def disable_2fa(
     request_data: TwoFactorDisableRequest,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_for_update),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Disable 2FA for the current user."""
     # Verify current password
-    if not verify_password(request_data.password, current_user.hashed_password):
+    if not await verify_password_async(request_data.password, current_user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid password"
@@ -282,8 +399,8 @@ async def disable_2fa(
         if not is_2fa_code_valid(current_user, request_data.verification_code):
             # Generate and send new code if not provided or invalid
             code = generate_2fa_code()
-            set_2fa_code(db, current_user, code)
-            send_2fa_code_email(current_user.id, code)
+            await set_2fa_code(db, current_user, code)
+            send_2fa_code_email(current_user, code)
             
             raise HTTPException(
                 status_code=status.HTTP_202_ACCEPTED,
@@ -292,9 +409,7 @@ async def disable_2fa(
     
     # Disable 2FA
     current_user.two_factor_enabled = False
-    clear_2fa_code(db, current_user)
-    db.commit()
-    db.refresh(current_user)
+    await clear_2fa_code(db, current_user)
     
     return {"message": "Two-factor authentication has been disabled"}
 
@@ -309,10 +424,10 @@ async def get_2fa_status(current_user: User = Depends(get_current_user)):
 @router.post("/verify-email")
 async def verify_email(
     request_data: EmailVerificationRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Verify user email with verification token."""
-    user = verify_email_token(db, request_data.token)
+    user = await verify_email_token(db, request_data.token)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -324,10 +439,11 @@ async def verify_email(
 @router.post("/resend-verification")
 async def resend_verification_email(
     request_data: ResendVerificationRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Resend email verification link."""
-    user = db.query(User).filter(User.email == request_data.email).first()
+    result = await db.execute(select(User).filter(User.email == request_data.email))
+    user = result.scalars().first()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -342,17 +458,17 @@ async def resend_verification_email(
     
     # Generate new verification token
     verification_token = generate_verification_token()
-    set_email_verification_token(db, user, verification_token)
+    await set_email_verification_token(db, user, verification_token)
     
     # Send verification email
-    send_verification_email(user.id, verification_token)
+    send_verification_email(user, verification_token)
     
     return {"message": "Verification email sent successfully"}
 
 @router.post("/2fa/request-code")
 async def request_2fa_code(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_for_update),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Request a new 2FA code (for manual requests)."""
     if not current_user.two_factor_enabled:
@@ -363,7 +479,7 @@ async def request_2fa_code(
     
     # Generate and send new 2FA code
     code = generate_2fa_code()
-    set_2fa_code(db, current_user, code)
-    send_2fa_code_email(current_user.id, code)
+    await set_2fa_code(db, current_user, code)
+    send_2fa_code_email(current_user, code)
     
     return {"message": "Verification code sent to your email"}
@@ -1,15 +1,31 @@
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
-from sqlalchemy.orm import Session
-from typing import List
-from app.models.database import get_db
-from app.models.models import User, CV as CVModel
+import base64
+import json
+import uuid
+from datetime import datetime
+from fastapi import APIRouter, Body, Depends, HTTPException, status, BackgroundTasks, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
+from sqlalchemy.orm.exc import StaleDataError
+from starlette.concurrency import run_in_threadpool
+from typing import Any, Dict, List, Optional
+from app.models.database import get_async_db
+from app.models.models import User, CV as CVModel, PDFGeneration
 from app.schemas.schemas import (
-    CVCreate, CVUpdate, CV as CVSchema, 
+    CVCreate, CVUpdate, CV as CVSchema, CVSummary, CVPatch, CVPatchResult,
     ValidationResponse, PDFGenerationRequest, PDFGenerationResponse
 )
 from app.core.auth import get_current_user, get_current_premium_user
+from app.core.config import settings
+from app.core.rate_limit import enforce_rate_limit
+from app.services.cv_batch_validation import stream_batch_validation
+from app.services.cv_patch import apply_cv_patch, JSONPatchError, JSONPatchTestFailed
 from app.services.cv_validation import cv_validator
-# from app.services.pdf_generator import generate_pdf_task  # Temporarily disabled
+from app.services.pdf_cache import cv_content_hash, pdf_render_cache
+from app.services.pdf_generator import pdf_generator
+from app.services.pdf_export import cv_render_data, safe_filename, stream_cv_zip
+from app.services.pdf_jobs import enqueue_pdf_generation, get_task_state
 
 router = APIRouter()
 
@@ -17,7 +33,7 @@ router = APIRouter()
 async def create_cv(
     cv_data: CVCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new CV."""
     # Validate CV data first
@@ -50,31 +66,119 @@ async def create_cv(
     )
     
     db.add(db_cv)
-    db.commit()
-    db.refresh(db_cv)
+    await db.commit()
+    await db.refresh(db_cv)
     
     return db_cv
 
-@router.get("/", response_model=List[CVSchema])
+# Listing order: most recently changed first (served by ix_cvs_owner_id_updated_at)
+CV_LIST_SORT_KEY = CVModel.updated_at
+
+def _encode_cursor(cv: CVModel) -> str:
+    """Opaque keyset cursor for the position after cv."""
+    sort_value = cv.updated_at
+    raw = json.dumps([sort_value.isoformat(), cv.id])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def _decode_cursor(cursor: str):
+    """Return (sort_value, id) from a cursor, or raise a 400."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, cv_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(sort_value), int(cv_id)
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+@router.get("/", response_model=List[CVSummary])
 async def get_user_cvs(
+    response: Response,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get all CVs for the current user."""
-    cvs = db.query(CVModel).filter(CVModel.owner_id == current_user.id).all()
+    """Get a page of CV summaries for the current user.
+
+    The cursor for the next page, if any, is returned in the X-Next-Cursor header.
+    The first page also carries the user's CV count in X-Total-Count.
+    """
+    query = (
+        select(CVModel)
+        .options(load_only(
+            CVModel.id, CVModel.title, CVModel.template_id, CVModel.color_scheme,
+            CVModel.is_public, CVModel.created_at, CVModel.updated_at
+        ))
+        .filter(CVModel.owner_id == current_user.id)
+    )
+    if cursor:
+        sort_value, cv_id = _decode_cursor(cursor)
+        query = query.filter(or_(
+            CV_LIST_SORT_KEY < sort_value,
+            and_(CV_LIST_SORT_KEY == sort_value, CVModel.id < cv_id)
+        ))
+    query = query.order_by(CV_LIST_SORT_KEY.desc(), CVModel.id.desc()).limit(limit + 1)
+    
+    result = await db.execute(query)
+    cvs = result.scalars().all()
+    
+    if len(cvs) > limit:
+        cvs = cvs[:limit]
+        response.headers["X-Next-Cursor"] = _encode_cursor(cvs[-1])
+    if not cursor:
+        total = await db.scalar(
+            select(func.count()).select_from(CVModel).filter(CVModel.owner_id == current_user.id)
+        )
+        response.headers["X-Total-Count"] = str(total)
     return cvs
 
+@router.post("/export")
+async def export_cvs(
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Export all of the user's CVs as a streamed ZIP of PDFs.
+
+    Each CV counts as one PDF against the user's rate limit.
+    """
+    result = await db.execute(
+        select(CVModel)
+        .filter(CVModel.owner_id == current_user.id)
+        .order_by(CVModel.id)
+    )
+    cvs = [cv_render_data(cv) for cv in result.scalars().all()]
+    
+    if not cvs:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No CVs to export"
+        )
+    
+    headers = {"Content-Disposition": 'attachment; filename="smartcv_export.zip"'}
+    decision = await enforce_rate_limit(current_user, "pdf", db, cost=len(cvs))
+    if decision is not None:
+        headers.update(decision.headers())
+    
+    return StreamingResponse(
+        stream_cv_zip(cvs),
+        media_type="application/zip",
+        headers=headers
+    )
+
 @router.get("/{cv_id}", response_model=CVSchema)
 async def get_cv(
     cv_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get a specific CV by ID."""
-    cv = db.query(CVModel).filter(
+    result = await db.execute(select(CVModel).filter(
         CVModel.id == cv_id,
         CVModel.owner_id == current_user.id
-    ).first()
+    ))
+    cv = result.scalars().first()
     
     if not cv:
         raise HTTPException(
@@ -89,13 +193,14 @@ async def update_cv(
     cv_id: int,
     cv_update: CVUpdate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update a CV."""
-    cv = db.query(CVModel).filter(
+    result = await db.execute(select(CVModel).filter(
         CVModel.id == cv_id,
         CVModel.owner_id == current_user.id
-    ).first()
+    ))
+    cv = result.scalars().first()
     
     if not cv:
         raise HTTPException(
@@ -115,22 +220,93 @@ async def update_cv(
         else:
             setattr(cv, field, value)
     
-    db.commit()
-    db.refresh(cv)
+    try:
+        await db.commit()
+    except StaleDataError:
+        # Another write bumped the version between our read and this UPDATE
+        await db.rollback()
+        result = await db.execute(select(CVModel.version).filter(CVModel.id == cv_id))
+        raise _version_conflict(result.scalar())
+    await db.refresh(cv)
     
     return cv
 
+def _version_conflict(current_version: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail={
+            "message": "CV was modified elsewhere, reload it and retry",
+            "version": current_version
+        }
+    )
+
+@router.patch("/{cv_id}", response_model=CVPatchResult)
+async def patch_cv(
+    cv_id: int,
+    cv_patch: CVPatch,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Apply JSON Patch (RFC 6902) operations to a CV.
+
+    Only the touched sections and items are re-validated and only changed
+    columns are written. The version must match the stored CV, otherwise
+    409 is returned with the current version.
+    """
+    result = await db.execute(select(CVModel).filter(
+        CVModel.id == cv_id,
+        CVModel.owner_id == current_user.id
+    ))
+    cv = result.scalars().first()
+    
+    if not cv:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="CV not found"
+        )
+    
+    if cv.version != cv_patch.version:
+        raise _version_conflict(cv.version)
+    
+    operations = [op.dict(by_alias=True, exclude_unset=True) for op in cv_patch.operations]
+    try:
+        changes = apply_cv_patch(cv, operations)
+    except JSONPatchTestFailed as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except JSONPatchError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+    
+    if changes:
+        for field, value in changes.items():
+            setattr(cv, field, value)
+        try:
+            # UPDATE ... WHERE version = :old, so a concurrent write is detected here
+            await db.commit()
+        except StaleDataError:
+            await db.rollback()
+            result = await db.execute(select(CVModel.version).filter(CVModel.id == cv_id))
+            raise _version_conflict(result.scalar())
+        await db.refresh(cv, attribute_names=["version", "updated_at"])
+    
+    return CVPatchResult(
+        id=cv.id,
+        version=cv.version,
+        updated_at=cv.updated_at,
+        updated_fields=sorted(changes)
+    )
+
 @router.delete("/{cv_id}")
 async def delete_cv(
     cv_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete a CV."""
-    cv = db.query(CVModel).filter(
+    result = await db.execute(select(CVModel).filter(
         CVModel.id == cv_id,
         CVModel.owner_id == current_user.id
-    ).first()
+    ))
+    cv = result.scalars().first()
     
     if not cv:
         raise HTTPException(
@@ -138,8 +314,8 @@ async def delete_cv(
             detail="CV not found"
         )
     
-    db.delete(cv)
-    db.commit()
+    await db.delete(cv)
+    await db.commit()
     
     return {"message": "CV deleted successfully"}
 
@@ -152,18 +328,47 @@ async def validate_cv(
     validation_result = cv_validator.validate_cv(cv_data)
     return validation_result
 
+@router.post("/validate/batch")
+async def validate_cv_batch(
+    payloads: List[Dict[str, Any]] = Body(...),
+    current_user: User = Depends(get_current_user)
+):
+    """Validate many CVs in one request.
+
+    Streams one NDJSON line per CV as results become available. Each line
+    has the payload's index; payloads that fail schema parsing get an
+    "errors" list instead of failing the whole batch.
+    """
+    if not payloads:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No CVs to validate"
+        )
+    if len(payloads) > settings.VALIDATION_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {settings.VALIDATION_BATCH_MAX_ITEMS} CVs per batch"
+        )
+    
+    return StreamingResponse(
+        stream_batch_validation(payloads),
+        media_type="application/x-ndjson"
+    )
+
 @router.post("/{cv_id}/generate-pdf", response_model=PDFGenerationResponse)
 async def generate_pdf(
     cv_id: int,
     background_tasks: BackgroundTasks,
+    response: Response,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Generate PDF for a CV."""
-    cv = db.query(CVModel).filter(
+    result = await db.execute(select(CVModel).filter(
         CVModel.id == cv_id,
         CVModel.owner_id == current_user.id
-    ).first()
+    ))
+    cv = result.scalars().first()
     
     if not cv:
         raise HTTPException(
@@ -171,48 +376,209 @@ async def generate_pdf(
             detail="CV not found"
         )
     
-    # For non-premium users, limit PDF generations
-    if not current_user.is_premium:
-        # You can add logic here to check generation limits
-        pass
+    # PDF generations per user, by plan (RATE_LIMITS)
+    await enforce_rate_limit(current_user, "pdf", db, response)
     
-    # Start background task for PDF generation
-    task_id = f"pdf_{cv_id}_{current_user.id}"
-    # background_tasks.add_task(generate_pdf_task, cv_id, current_user.id, task_id)  # Temporarily disabled
+    # Record the job, then hand it to Celery or the fallback worker pool
+    task_id = f"pdf_{cv_id}_{uuid.uuid4().hex}"
+    pdf_gen = PDFGeneration(
+        cv_id=cv_id,
+        user_id=current_user.id,
+        task_id=task_id,
+        status="pending"
+    )
+    db.add(pdf_gen)
+    await db.commit()
+    await db.refresh(pdf_gen)
+    
+    try:
+        await run_in_threadpool(enqueue_pdf_generation, pdf_gen.id, task_id)
+    except Exception as e:
+        pdf_gen.status = "failed"
+        pdf_gen.error_message = f"Could not queue PDF generation: {str(e)}"
+        await db.commit()
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="PDF generation is temporarily unavailable"
+        )
     
     return PDFGenerationResponse(
         task_id=task_id,
-        status="disabled",
-        message="PDF generation temporarily disabled - WeasyPrint setup required"
+        status="pending",
+        message="PDF generation queued"
     )
 
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Check an If-None-Match header value against an ETag."""
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return any(tag[2:] == etag if tag.startswith("W/") else tag == etag for tag in candidates)
+
+@router.get("/{cv_id}/pdf")
+async def download_pdf(
+    cv_id: int,
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Return the CV as a PDF, from the render cache when its content
+    has been rendered before. Only renders count against the rate limit."""
+    result = await db.execute(select(CVModel).filter(
+        CVModel.id == cv_id,
+        CVModel.owner_id == current_user.id
+    ))
+    cv = result.scalars().first()
+    
+    if not cv:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="CV not found"
+        )
+    
+    content_hash = cv_content_hash(cv)
+    etag = f'"{content_hash}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    pdf_bytes = await run_in_threadpool(pdf_render_cache.get_bytes, content_hash)
+    headers["X-PDF-Cache"] = "hit" if pdf_bytes is not None else "miss"
+    if pdf_bytes is None:
+        decision = await enforce_rate_limit(current_user, "pdf", db)
+        if decision is not None:
+            headers.update(decision.headers())
+        pdf_bytes = await _render_and_cache(cv, content_hash)
+    return _pdf_response(cv, pdf_bytes, headers)
+
+async def _render_and_cache(cv: CVModel, content_hash: str) -> bytes:
+    # ReportLab is CPU-bound, keep it off the event loop
+    pdf_bytes = await run_in_threadpool(pdf_generator.render_pdf_bytes, cv)
+    await run_in_threadpool(pdf_render_cache.put_bytes, content_hash, pdf_bytes)
+    return pdf_bytes
+
+def _pdf_response(cv: CVModel, pdf_bytes: bytes, headers: Dict[str, str]) -> Response:
+    filename = safe_filename(cv.title, f"cv_{cv.id}")
+    headers["Content-Disposition"] = f'attachment; filename="{filename}.pdf"'
+    return Response(content=pdf_bytes, media_type="application/pdf", headers=headers)
+
 @router.get("/{cv_id}/pdf-status/{task_id}")
 async def get_pdf_status(
     cv_id: int,
     task_id: str,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get PDF generation status."""
-    # You can implement task status checking here
-    # For now, return a simple response
-    return {
+    result = await db.execute(select(PDFGeneration).filter(
+        PDFGeneration.task_id == task_id,
+        PDFGeneration.cv_id == cv_id,
+        PDFGeneration.user_id == current_user.id
+    ))
+    pdf_gen = result.scalars().first()
+    
+    if not pdf_gen:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="PDF generation task not found"
+        )
+    
+    job_status = pdf_gen.status
+    if job_status in ("pending", "processing"):
+        # The row is updated by the worker; Celery knows about crashes and retries
+        task_state = await run_in_threadpool(get_task_state, task_id)
+        if task_state == "RETRY":
+            job_status = "processing"
+        elif task_state == "FAILURE":
+            job_status = "failed"
+    
+    messages = {
+        "pending": "PDF generation queued",
+        "processing": "PDF generation in progress",
+        "completed": "PDF generated successfully",
+        "failed": "PDF generation failed"
+    }
+    response = {
         "task_id": task_id,
-        "status": "processing",
-        "message": "PDF generation in progress"
+        "status": job_status,
+        "message": messages.get(job_status, "PDF generation in progress")
     }
+    if job_status == "completed":
+        response["download_url"] = f"/api/cv/{cv_id}/pdf-status/{task_id}/download"
+        response["cache_hit"] = bool(pdf_gen.cache_hit)
+    elif job_status == "failed" and pdf_gen.error_message:
+        response["error"] = pdf_gen.error_message
+    return response
+
+@router.get("/{cv_id}/pdf-status/{task_id}/download")
+async def download_generated_pdf(
+    cv_id: int,
+    task_id: str,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Return the PDF a completed generation job rendered.
+
+    The job's artifact is looked up in the render cache by its content hash.
+    If it was evicted it is rendered again, unless the CV has changed since
+    the job ran.
+    """
+    result = await db.execute(select(PDFGeneration).filter(
+        PDFGeneration.task_id == task_id,
+        PDFGeneration.cv_id == cv_id,
+        PDFGeneration.user_id == current_user.id
+    ))
+    pdf_gen = result.scalars().first()
+    
+    if not pdf_gen:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="PDF generation task not found"
+        )
+    if pdf_gen.status != "completed" or not pdf_gen.content_hash:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="PDF generation has not completed"
+        )
+    
+    result = await db.execute(select(CVModel).filter(
+        CVModel.id == cv_id,
+        CVModel.owner_id == current_user.id
+    ))
+    cv = result.scalars().first()
+    if not cv:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="CV not found"
+        )
+    
+    content_hash = pdf_gen.content_hash
+    headers = {"ETag": f'"{content_hash}"', "Cache-Control": "private, no-cache"}
+    pdf_bytes = await run_in_threadpool(pdf_render_cache.get_bytes, content_hash)
+    headers["X-PDF-Cache"] = "hit" if pdf_bytes is not None else "miss"
+    if pdf_bytes is None:
+        if cv_content_hash(cv) != content_hash:
+            raise HTTPException(
+                status_code=status.HTTP_410_GONE,
+                detail="This PDF has expired and the CV has changed since; generate it again"
+            )
+        pdf_bytes = await _render_and_cache(cv, content_hash)
+    return _pdf_response(cv, pdf_bytes, headers)
 
 @router.post("/{cv_id}/duplicate", response_model=CVSchema)
 async def duplicate_cv(
     cv_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Duplicate an existing CV."""
-    original_cv = db.query(CVModel).filter(
+    result = await db.execute(select(CVModel).filter(
         CVModel.id == cv_id,
         CVModel.owner_id == current_user.id
-    ).first()
+    ))
+    original_cv = result.scalars().first()
     
     if not original_cv:
         raise HTTPException(
@@ -238,7 +604,7 @@ async def duplicate_cv(
     )
     
     db.add(new_cv)
-    db.commit()
-    db.refresh(new_cv)
+    await db.commit()
+    await db.refresh(new_cv)
     
     return new_cv
@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Request
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 try:
     import stripe
     STRIPE_AVAILABLE = True
@@ -7,9 +8,9 @@ except ImportError:
     STRIPE_AVAILABLE = False
     stripe = None
 
-from app.models.database import get_db
+from app.models.database import get_async_db
 from app.models.models import User, Subscription
-from app.core.auth import get_current_user
+from app.core.auth import get_current_user, get_current_user_for_update, invalidate_cached_user
 from app.core.config import settings
 
 # Configure Stripe if available
@@ -22,7 +23,7 @@ router = APIRouter()
 async def create_checkout_session(
     plan: str,  # 'premium' or 'pro'
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a Stripe checkout session for subscription."""
     if not STRIPE_AVAILABLE:
@@ -82,7 +83,7 @@ async def create_checkout_session(
             )
 
 @router.post("/webhook")
-async def stripe_webhook(request: Request, db: Session = Depends(get_db)):
+async def stripe_webhook(request: Request, db: AsyncSession = Depends(get_async_db)):
     """Handle Stripe webhook events."""
     if not STRIPE_AVAILABLE:
         raise HTTPException(
@@ -120,13 +121,13 @@ async def stripe_webhook(request: Request, db: Session = Depends(get_db)):
     
     return {'status': 'success'}
 
-async def handle_successful_payment(session, db: Session):
+async def handle_successful_payment(session, db: AsyncSession):
     """Handle successful payment from checkout session."""
     user_id = int(session['metadata']['user_id'])
     plan = session['metadata']['plan']
     
     # Get user
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         return
     
@@ -143,50 +144,55 @@ async def handle_successful_payment(session, db: Session):
     )
     
     db.add(subscription)
-    db.commit()
+    await db.commit()
+    invalidate_cached_user(user_id)
 
-async def handle_subscription_renewal(invoice, db: Session):
+async def handle_subscription_renewal(invoice, db: AsyncSession):
     """Handle subscription renewal."""
     subscription_id = invoice['subscription']
     
     # Update subscription status
-    subscription = db.query(Subscription).filter(
+    result = await db.execute(select(Subscription).filter(
         Subscription.stripe_subscription_id == subscription_id
-    ).first()
+    ))
+    subscription = result.scalars().first()
     
     if subscription:
         subscription.status = 'active'
-        db.commit()
+        await db.commit()
 
-async def handle_subscription_cancellation(stripe_subscription, db: Session):
+async def handle_subscription_cancellation(stripe_subscription, db: AsyncSession):
     """Handle subscription cancellation."""
     subscription_id = stripe_subscription['id']
     
     # Update subscription and user status
-    subscription = db.query(Subscription).filter(
+    result = await db.execute(select(Subscription).filter(
         Subscription.stripe_subscription_id == subscription_id
-    ).first()
+    ))
+    subscription = result.scalars().first()
     
     if subscription:
         subscription.status = 'canceled'
         
         # Update user premium status
-        user = db.query(User).filter(User.id == subscription.user_id).first()
+        user = await db.get(User, subscription.user_id)
         if user:
             user.is_premium = False
         
-        db.commit()
+        await db.commit()
+        invalidate_cached_user(subscription.user_id)
 
 @router.get("/subscription")
 async def get_subscription(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get current user's subscription details."""
-    subscription = db.query(Subscription).filter(
+    result = await db.execute(select(Subscription).filter(
         Subscription.user_id == current_user.id,
         Subscription.status == 'active'
-    ).first()
+    ))
+    subscription = result.scalars().first()
     
     if not subscription:
         return {'has_subscription': False}
@@ -200,8 +206,8 @@ async def get_subscription(
 
 @router.post("/cancel-subscription")
 async def cancel_subscription(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_for_update),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Cancel user's subscription."""
     if not STRIPE_AVAILABLE:
@@ -210,10 +216,11 @@ async def cancel_subscription(
             detail="Payment processing is currently unavailable"
         )
     
-    subscription = db.query(Subscription).filter(
+    result = await db.execute(select(Subscription).filter(
         Subscription.user_id == current_user.id,
         Subscription.status == 'active'
-    ).first()
+    ))
+    subscription = result.scalars().first()
     
     if not subscription:
         raise HTTPException(
@@ -229,7 +236,8 @@ async def cancel_subscription(
         subscription.status = 'canceled'
         current_user.is_premium = False
         
-        db.commit()
+        await db.commit()
+        invalidate_cached_user(current_user.id)
         
         return {'message': 'Subscription canceled successfully'}
         
@@ -1,19 +1,25 @@
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 import jwt
 import hashlib
 import secrets
 import string
 from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.cache import TTLCache
 from app.core.config import settings
-from app.models.database import get_db
-from app.models.models import User
+from app.core.hashing import password_hasher
+from app.models.database import get_async_db
+from app.models.models import User, RefreshToken
 
 # JWT token scheme
 security = HTTPBearer()
 
+# Authenticated users by id (per process; other workers rely on the TTL)
+user_cache = TTLCache(maxsize=settings.USER_CACHE_MAX_SIZE, ttl=settings.USER_CACHE_TTL_SECONDS)
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a plaintext password against a hashed password."""
     try:
@@ -40,6 +46,14 @@ def get_password_hash(password: str) -> str:
     # Return salt:hash
     return f"{salt}:{password_hash.hex()}"
 
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the hashing pool without blocking the event loop."""
+    return await password_hasher.run(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password on the hashing pool without blocking the event loop."""
+    return await password_hasher.run(get_password_hash, password)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Create a JWT access token."""
     to_encode = data.copy()
@@ -52,49 +66,192 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
-def verify_token(token: str) -> Optional[str]:
-    """Verify and decode JWT token."""
+def decode_access_token(token: str) -> Optional[dict]:
+    """Decode a JWT access token and return its claims."""
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            return None
-        return email
     except jwt.InvalidTokenError:
         return None
+    if payload.get("sub") is None:
+        return None
+    return payload
+
+def verify_token(token: str) -> Optional[str]:
+    """Verify and decode JWT token."""
+    payload = decode_access_token(token)
+    return payload.get("sub") if payload else None
+
+def user_token_claims(user: User, session_id: Optional[str] = None) -> dict:
+    """Claims identifying a user (and login session) in an access token."""
+    claims = {"sub": user.email, "uid": user.id}
+    if session_id:
+        claims["sid"] = session_id
+    return claims
 
-def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
+# Refresh tokens
+
+class RefreshTokenError(Exception):
+    """A refresh token is unknown, expired or revoked."""
+
+def hash_refresh_token(token: str) -> str:
+    """Refresh tokens are 256 random bits, so a plain SHA-256 is enough to
+    store them (unlike passwords, there is nothing to brute-force)."""
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+def issue_refresh_token(
+    db: AsyncSession,
+    user_id: int,
+    device: Optional[str],
+    ip_address: Optional[str],
+    family_id: Optional[str] = None
+) -> Tuple[str, str]:
+    """Add a new refresh token to the session (the caller commits).
+
+    Returns (token, family_id); a new family is started for a fresh login.
+    """
+    token = secrets.token_urlsafe(32)
+    family_id = family_id or secrets.token_hex(16)
+    db.add(RefreshToken(
+        user_id=user_id,
+        token_hash=hash_refresh_token(token),
+        family_id=family_id,
+        device=device[:512] if device else None,
+        ip_address=ip_address,
+        expires_at=datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    ))
+    return token, family_id
+
+async def revoke_refresh_family(db: AsyncSession, family_id: str, user_id: Optional[int] = None) -> int:
+    """Revoke every live token of a session. Returns how many were revoked."""
+    statement = update(RefreshToken).where(
+        RefreshToken.family_id == family_id,
+        RefreshToken.revoked_at.is_(None)
+    )
+    if user_id is not None:
+        statement = statement.where(RefreshToken.user_id == user_id)
+    result = await db.execute(
+        statement.values(revoked_at=datetime.utcnow()).execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+async def rotate_refresh_token(
+    db: AsyncSession,
+    token: str,
+    ip_address: Optional[str]
+) -> Tuple[User, str, str]:
+    """Exchange a refresh token for its successor.
+
+    One indexed lookup (token hash, joined to the user) and no password
+    hashing. Returns (user, new_token, family_id) and commits.
+    """
+    result = await db.execute(
+        select(RefreshToken, User)
+        .join(User, User.id == RefreshToken.user_id)
+        .filter(RefreshToken.token_hash == hash_refresh_token(token))
+    )
+    row = result.first()
+    if row is None:
+        raise RefreshTokenError("Invalid refresh token")
+    stored, user = row
+    now = datetime.utcnow()
+
+    if stored.revoked_at is not None:
+        if now - stored.revoked_at > timedelta(seconds=settings.REFRESH_TOKEN_REUSE_GRACE_SECONDS):
+            # A rotated token came back: it was copied, so end the whole session
+            await revoke_refresh_family(db, stored.family_id)
+            await db.commit()
+        raise RefreshTokenError("Refresh token has been revoked")
+    if stored.expires_at <= now:
+        raise RefreshTokenError("Refresh token has expired")
+
+    # Claim the token; a concurrent refresh with the same token gets rowcount 0
+    claimed = await db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.id == stored.id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    if claimed.rowcount != 1:
+        await db.rollback()
+        raise RefreshTokenError("Refresh token has been revoked")
+
+    new_token, family_id = issue_refresh_token(
+        db, user.id, stored.device, ip_address, family_id=stored.family_id
+    )
+    await db.commit()
+    return user, new_token, family_id
+
+async def authenticate_user(db: AsyncSession, email: str, password: str) -> Optional[User]:
     """Authenticate user with email and password."""
-    user = db.query(User).filter(User.email == email).first()
+    result = await db.execute(select(User).filter(User.email == email))
+    user = result.scalars().first()
     if not user:
         return None
-    if not verify_password(password, user.hashed_password):
+    # End the read so no connection is held while the password is hashed
+    await db.commit()
+    if not await verify_password_async(password, user.hashed_password):
         return None
     return user
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
-    """Get current authenticated user from JWT token."""
+async def _resolve_user(token: str, db: AsyncSession, use_cache: bool) -> User:
+    """Resolve the user for an access token, optionally via the user cache."""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
     
-    token = credentials.credentials
-    email = verify_token(token)
-    if email is None:
+    payload = decode_access_token(token)
+    if payload is None:
         raise credentials_exception
+    email = payload["sub"]
+    user_id = payload.get("uid")
     
-    user = db.query(User).filter(User.email == email).first()
-    if user is None:
+    if use_cache and user_id is not None:
+        user = user_cache.get(user_id)
+        if user is not None and user.email == email:
+            return user
+    
+    if user_id is not None:
+        user = await db.get(User, user_id)
+    else:
+        # Tokens issued before the uid claim was added
+        result = await db.execute(select(User).filter(User.email == email))
+        user = result.scalars().first()
+    if user is None or user.email != email:
         raise credentials_exception
     
+    if use_cache:
+        # Cached instances are shared across requests, so detach them
+        db.expunge(user)
+        user_cache.set(user.id, user)
+    
     return user
 
-def get_current_premium_user(current_user: User = Depends(get_current_user)) -> User:
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_db)
+) -> User:
+    """Get current authenticated user from JWT token.
+
+    The returned user may come from the in-process cache and is detached from
+    the session; handlers that modify the user should depend on
+    get_current_user_for_update instead.
+    """
+    return await _resolve_user(credentials.credentials, db, use_cache=True)
+
+async def get_current_user_for_update(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_db)
+) -> User:
+    """Get current user freshly loaded and attached to the request session."""
+    return await _resolve_user(credentials.credentials, db, use_cache=False)
+
+def invalidate_cached_user(user_id: int):
+    """Drop a user from the cache after it has been modified."""
+    user_cache.delete(user_id)
+
+async def get_current_premium_user(current_user: User = Depends(get_current_user)) -> User:
     """Get current authenticated premium user."""
     if not current_user.is_premium:
         raise HTTPException(
@@ -135,32 +292,37 @@ def generate_backup_codes(count: int = 8) -> list[str]:
         codes.append(formatted_code)
     return codes
 
-def set_2fa_code(db: Session, user: User, code: str, expires_minutes: int = 10):
+async def set_2fa_code(db: AsyncSession, user: User, code: str, expires_minutes: int = 10):
     """Set 2FA code for user with expiration."""
     user.two_factor_code = code
     user.two_factor_code_expires = datetime.utcnow() + timedelta(minutes=expires_minutes)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
+    invalidate_cached_user(user.id)
 
-def clear_2fa_code(db: Session, user: User):
+async def clear_2fa_code(db: AsyncSession, user: User):
     """Clear 2FA code from user."""
     user.two_factor_code = None
     user.two_factor_code_expires = None
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
+    invalidate_cached_user(user.id)
 
-def set_email_verification_token(db: Session, user: User, token: str):
+async def set_email_verification_token(db: AsyncSession, user: User, token: str):
     """Set email verification token for user."""
     user.email_verification_token = token
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
+    invalidate_cached_user(user.id)
 
-def verify_email_token(db: Session, token: str) -> Optional[User]:
+async def verify_email_token(db: AsyncSession, token: str) -> Optional[User]:
     """Verify email verification token and return user."""
-    user = db.query(User).filter(User.email_verification_token == token).first()
+    result = await db.execute(select(User).filter(User.email_verification_token == token))
+    user = result.scalars().first()
     if user:
         user.email_verified = True
         user.email_verification_token = None
-        db.commit()
-        db.refresh(user)
+        await db.commit()
+        await db.refresh(user)
+        invalidate_cached_user(user.id)
     return user
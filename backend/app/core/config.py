@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
-from typing import List, Optional
+from typing import Dict, List, Optional
+import importlib.util
 import os
 from dotenv import load_dotenv
 
@@ -9,12 +10,39 @@ load_dotenv()
 class Settings(BaseSettings):
     # Database
     DATABASE_URL: Optional[str] = None
+    DATABASE_ASYNC: bool = False  # Use the asyncpg engine in API routers
+    DATABASE_ASYNC_URL: Optional[str] = None  # Defaults to DATABASE_URL with the asyncpg driver
+
+    # Database connection pool (per process, applies to both engines)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30  # seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 1800  # seconds before a connection is replaced
+    DB_POOL_PRE_PING: bool = True
     
     # JWT
     SECRET_KEY: str = "your-super-secret-key-change-this-in-production"
     ALGORITHM: str = "HS256"
-    ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = 15  # renewed through /api/auth/refresh
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 30
+    REFRESH_TOKEN_REUSE_GRACE_SECONDS: int = 30  # concurrent refreshes (e.g. two tabs) are not treated as theft
+
+    # Password hashing pool (per worker process)
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 64
+
+    # Authenticated user cache (per worker process)
+    USER_CACHE_TTL_SECONDS: int = 60
+    USER_CACHE_MAX_SIZE: int = 10000
     
+    # Memoized per-entry CV validation results (per worker process)
+    VALIDATION_CACHE_TTL_SECONDS: int = 600
+    VALIDATION_CACHE_MAX_SIZE: int = 20000
+    
+    # Bulk validation (POST /api/cv/validate/batch)
+    VALIDATION_BATCH_MAX_ITEMS: int = 1000
+    VALIDATION_BATCH_CHUNK_SIZE: int = 25
+
     # CORS
     ALLOWED_HOSTS: List[str] = [
         "http://localhost:3000", 
@@ -38,6 +66,9 @@ class Settings(BaseSettings):
     CELERY_BROKER_URL: Optional[str] = None
     CELERY_RESULT_BACKEND: Optional[str] = None
     
+    # In-process worker pool for CPU-heavy jobs (PDF rendering) when no broker is configured
+    CPU_POOL_WORKERS: int = 2
+    
     # Stripe (optional)
     STRIPE_SECRET_KEY: Optional[str] = None
     STRIPE_PUBLISHABLE_KEY: Optional[str] = None
@@ -48,8 +79,24 @@ class Settings(BaseSettings):
     SMTP_PORT: int = 587
     SMTP_USER: Optional[str] = None
     SMTP_PASSWORD: Optional[str] = None
+    SMTP_USE_TLS: bool = True  # STARTTLS after connecting
+    SMTP_TIMEOUT_SECONDS: int = 30
     EMAIL_ENABLED: bool = False
     
+    # Persistent SMTP connections (per process)
+    SMTP_POOL_SIZE: int = 4
+    SMTP_POOL_IDLE_TIMEOUT: int = 60  # close connections idle longer than this
+    SMTP_POOL_HEALTHCHECK_AFTER: int = 5  # NOOP before reusing a connection idle this long
+    
+    # In-process mail queue used when no Celery broker is configured
+    MAIL_QUEUE_MAX_SIZE: int = 1000  # further messages are dropped (see /metrics)
+    MAIL_SENDERS: int = 2
+    MAIL_DRAIN_TIMEOUT_SECONDS: int = 10
+    
+    # Login notifications: logins within the window are sent as one digest email
+    LOGIN_NOTIFICATION_WINDOW_SECONDS: float = 120  # later logins are batched this long; 0 sends each at once
+    LOGIN_DIGEST_MAX_ROWS: int = 20
+    
     def __post_init__(self):
         # Enable email if SMTP credentials are provided
         if self.SMTP_USER and self.SMTP_PASSWORD:
@@ -58,15 +105,54 @@ class Settings(BaseSettings):
     # AI Configuration (optional)
     GEMINI_API_KEY: Optional[str] = None
     OPENAI_API_KEY: Optional[str] = None
+    OPENAI_BASE_URL: Optional[str] = None  # any OpenAI-compatible endpoint
+    OPENAI_MODEL: str = "gpt-3.5-turbo"
+    OPENAI_TIMEOUT_SECONDS: float = 20  # per call
+    OPENAI_MAX_RETRIES: int = 1
+    OPENAI_MAX_CONCURRENCY: int = 16  # concurrent calls per worker process
+    OPENAI_QUEUE_TIMEOUT_SECONDS: float = 5  # wait for a free slot before falling back to mock output
+    OPENAI_STREAM_STALL_SECONDS: float = 5  # streamed responses fall back to mock output after this long without data
+    
+    # POST /api/ai/suggest-job-descriptions/batch
+    AI_BATCH_MAX_ENTRIES: int = 50
+    AI_BATCH_TOKEN_BUDGET: int = 3500  # estimated prompt + completion tokens per LLM call
+    AI_BATCH_OUTPUT_TOKENS_PER_ENTRY: int = 250
+    
+    # Pools of AI suggestions shared between users (Redis when REDIS_URL is set)
+    SUGGESTION_CACHE_TTL_SECONDS: int = 7 * 24 * 3600
+    SUGGESTION_CACHE_MAX_SIZE: int = 5000  # pools kept in memory without Redis
+    SUGGESTION_POOL_MIN_SIZE: int = 10  # distinct suggestions collected before a pool is served
+    SUGGESTION_POOL_MAX_SIZE: int = 40
+    
+    # Per-user token buckets, "N/period": bursts of up to N requests, refilled
+    # at N per period. Keyed by plan (Subscription.plan_name, "premium" for
+    # premium users without a known plan, "free" otherwise), then scope.
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMITS: Dict[str, Dict[str, str]] = {
+        "free": {"ai": "30/hour", "pdf": "10/day"},
+        "basic": {"ai": "100/hour", "pdf": "50/day"},
+        "premium": {"ai": "300/hour", "pdf": "200/day"},
+        "pro": {"ai": "1000/hour", "pdf": "1000/day"},
+    }
+    RATE_LIMIT_MAX_BUCKETS: int = 100000  # buckets kept in memory without Redis
+    RATE_LIMIT_PLAN_CACHE_SECONDS: int = 300
     
     # File upload
     MAX_FILE_SIZE: int = 5 * 1024 * 1024  # 5MB
     UPLOAD_DIR: str = "/tmp/uploads/"
     
+    # Rendered PDF cache
+    PDF_CACHE_DIR: str = "/tmp/uploads/pdf_cache"
+    PDF_CACHE_MAX_BYTES: int = 256 * 1024 * 1024  # 256MB
+    
     # Environment
     ENVIRONMENT: str = "development"
     DEBUG: bool = True
     
+    # Runtime metrics (GET /metrics) are off unless a token is set; scrapers
+    # send it as "Authorization: Bearer <token>"
+    METRICS_TOKEN: Optional[str] = None
+    
     # Frontend URL for email links
     FRONTEND_URL: str = "https://smartcv-tau.vercel.app"
     
@@ -75,6 +161,17 @@ class Settings(BaseSettings):
 
 settings = Settings()
 
+# Celery is optional; without it background work stays in-process
+CELERY_INSTALLED = importlib.util.find_spec("celery") is not None
+
+def celery_enabled() -> bool:
+    """Whether background work (emails, PDF jobs) goes to Celery.
+
+    Only with a real broker: without one tasks would be published to the
+    in-memory broker, which no worker reads.
+    """
+    return CELERY_INSTALLED and bool(settings.CELERY_BROKER_URL)
+
 # Validate required settings
 if not settings.DATABASE_URL:
     raise ValueError("DATABASE_URL environment variable is required")
@@ -0,0 +1,159 @@
+"""
+Shared CV content rules: compiled patterns and the action verb lexicon used
+by both the request schemas and the validation service.
+"""
+import re
+from typing import FrozenSet, Iterable
+
+# MM/YYYY, e.g. 09/2021
+DATE_PATTERN = re.compile(r'^\d{2}/\d{4}$')
+
+# Any digit: a quantified achievement (numbers, percentages, amounts)
+NUMBER_PATTERN = re.compile(r'\d')
+
+# Leading/trailing punctuation around the first word of a bullet ("Led," "•Built")
+_WORD_STRIP = "•-–—*·:;,.!?()[]\"'"
+
+# Verbs shown to users in suggestions
+SUGGESTED_ACTION_VERBS = (
+    'achieved', 'administered', 'analyzed', 'built', 'collaborated',
+    'created', 'designed', 'developed', 'directed', 'enhanced',
+    'established', 'executed', 'generated', 'implemented', 'improved',
+    'increased', 'led', 'managed', 'optimized', 'organized',
+    'planned', 'produced', 'reduced', 'resolved', 'streamlined'
+)
+
+# Base forms; inflections are generated below
+_BASE_VERBS = """
+accelerate accomplish achieve acquire adapt address adjust administer advance
+advise advocate align allocate analyse analyze anticipate apply appraise
+approve arbitrate architect arrange articulate assemble assess assign assist
+attain audit augment author automate balance benchmark boost brainstorm brief
+budget build calculate campaign capture catalog catalogue centralize chair
+champion chart clarify classify coach codify collaborate collect combine
+command commission communicate compile complete compose compute conceive
+conceptualize conduct configure consolidate construct consult contract
+contribute control convert convince coordinate correct counsel craft create
+cultivate curate customize cut debug decrease define delegate deliver
+demonstrate deploy design detect determine develop devise diagnose direct
+discover dispatch document double draft drive earn edit educate effect
+eliminate empower enable encourage engineer enhance enlist ensure establish
+evaluate examine exceed execute expand expedite experiment explain explore
+facilitate finalize fix forecast forge formalize formulate foster found
+fund gain gather generate govern grow guide handle harmonize head
+hire identify illustrate implement improve incorporate increase influence
+initiate innovate inspect inspire install institute instruct integrate
+interpret interview introduce invent investigate launch lead lecture
+leverage liaise lower maintain manage map market master maximize measure
+mediate mentor merge migrate minimize model moderate modernize monitor
+motivate navigate negotiate operate optimize orchestrate organize originate
+outpace outperform overhaul oversee own partner perform persuade pilot
+pioneer plan present prioritize process procure produce program project
+promote propose prototype provide publish purchase qualify quantify raise
+rebuild recommend reconcile record recruit redesign reduce refactor refine
+reform regulate rehabilitate reinforce remodel reorganize repair replace
+report represent research reshape resolve restore restructure retain
+revamp review revise revitalize save scale schedule screen secure select
+sell serve set shape ship simplify solve source spearhead specify sponsor
+standardize steer stimulate strategize streamline strengthen structure
+succeed summarize supervise supply support surpass survey sustain
+synthesize systematize tailor target teach test track train transform
+translate troubleshoot unify unite upgrade utilize validate verify win
+write
+"""
+
+# Verbs whose final consonant doubles before -ed/-ing
+_DOUBLED_FINAL = frozenset({
+    'commit', 'control', 'equip', 'map', 'plan', 'program',
+    'ship', 'submit', 'transfer', 'propel', 'compel', 'excel', 'refer',
+})
+
+# Irregular past forms (participles included where they differ)
+_IRREGULAR_PAST = {
+    'build': ('built',), 'rebuild': ('rebuilt',), 'lead': ('led',),
+    'drive': ('drove', 'driven'), 'grow': ('grew', 'grown'),
+    'oversee': ('oversaw', 'overseen'), 'sell': ('sold',), 'set': ('set',),
+    'teach': ('taught',), 'win': ('won',), 'write': ('wrote', 'written'),
+    'cut': ('cut',), 'forecast': ('forecast', 'forecasted'),
+}
+
+_VOWELS = frozenset('aeiou')
+
+
+def _inflections(verb: str) -> Iterable[str]:
+    """Yield the base form plus -s, -ing and past forms of a verb."""
+    yield verb
+
+    # Third person: -s/-es/-ies
+    if verb.endswith(('s', 'x', 'z', 'ch', 'sh')):
+        yield verb + 'es'
+    elif verb.endswith('y') and verb[-2:-1] not in _VOWELS:
+        yield verb[:-1] + 'ies'
+    else:
+        yield verb + 's'
+
+    doubled = verb in _DOUBLED_FINAL
+
+    # Gerund: -ing
+    if verb.endswith('ie'):
+        yield verb[:-2] + 'ying'
+    elif verb.endswith('e') and not verb.endswith(('ee', 'ye', 'oe')):
+        yield verb[:-1] + 'ing'
+    elif doubled:
+        yield verb + verb[-1] + 'ing'
+    else:
+        yield verb + 'ing'
+
+    # Past: irregular, or -d/-ied/-ed
+    if verb in _IRREGULAR_PAST:
+        yield from _IRREGULAR_PAST[verb]
+    elif verb.endswith('e'):
+        yield verb + 'd'
+    elif verb.endswith('y') and verb[-2:-1] not in _VOWELS:
+        yield verb[:-1] + 'ied'
+    elif doubled:
+        yield verb + verb[-1] + 'ed'
+    else:
+        yield verb + 'ed'
+
+
+def _build_lexicon(verbs: Iterable[str]) -> FrozenSet[str]:
+    forms = set()
+    for verb in verbs:
+        forms.update(_inflections(verb))
+    return frozenset(forms)
+
+
+# Every accepted surface form, built once at import for O(1) lookups
+ACTION_VERBS: FrozenSet[str] = _build_lexicon(_BASE_VERBS.split()) | frozenset(SUGGESTED_ACTION_VERBS)
+
+
+def first_word(text: str) -> str:
+    """Lower-cased first word of a bullet, without surrounding punctuation.
+
+    A separate leading bullet marker ("• Built ...") is skipped.
+    """
+    for part in text.split(None, 2)[:2]:
+        word = part.strip(_WORD_STRIP).lower()
+        if word:
+            return word
+    return ""
+
+
+def is_action_verb(word: str) -> bool:
+    """Whether a word is a known action verb in any common inflection."""
+    return word in ACTION_VERBS
+
+
+def starts_with_action_verb(text: str) -> bool:
+    """Whether a bullet opens with an action verb ("Led ...", "• Built ...")."""
+    return is_action_verb(first_word(text))
+
+
+def is_valid_date(value: str) -> bool:
+    """MM/YYYY check shared by the schemas and the validator."""
+    return DATE_PATTERN.match(value) is not None
+
+
+def has_number(text: str) -> bool:
+    return NUMBER_PATTERN.search(text) is not None
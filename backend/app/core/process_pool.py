@@ -0,0 +1,39 @@
+"""
+Shared process pool for CPU-bound work that must not run on API workers' event loop.
+"""
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from app.core.config import settings
+
+_pool: Optional[ProcessPoolExecutor] = None
+_lock = threading.Lock()
+
+
+def _init_worker():
+    """Drop DB connections inherited from the parent process."""
+    from app.models.database import engine
+    engine.dispose(close=False)
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Return the per-process worker pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        with _lock:
+            if _pool is None:
+                _pool = ProcessPoolExecutor(
+                    max_workers=settings.CPU_POOL_WORKERS,
+                    initializer=_init_worker
+                )
+    return _pool
+
+
+def shutdown_process_pool():
+    """Wait for queued jobs and stop the pool."""
+    global _pool
+    with _lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True)
+            _pool = None
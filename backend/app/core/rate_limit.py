@@ -0,0 +1,282 @@
+"""
+Per-user rate limits for the expensive endpoints (AI suggestions, PDF jobs).
+
+Each user has one token bucket per scope, sized by their plan: a bucket of
+RATE_LIMITS[plan][scope] = "N/period" holds at most N tokens and refills
+N tokens per period, so N is both the burst size and the sustained quota.
+A request costs one token (a batch costs one per entry); when the bucket
+is short the request is refused with 429 and a Retry-After header.
+
+A bucket is two numbers (tokens, last update) refilled lazily on access,
+so a check is O(1) in time and memory. Buckets live in Redis when
+REDIS_URL is set (shared by all workers, updated atomically by a Lua
+script), otherwise in an in-process LRU cache. If Redis fails, limits fall
+back to the in-process buckets for a while rather than failing open.
+"""
+import math
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from fastapi import Depends, HTTPException, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.auth import get_current_user
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models.database import get_async_db
+from app.models.models import Subscription, User
+
+# redis is optional; without it each worker keeps its own buckets
+try:
+    import redis.asyncio as redis_asyncio
+    REDIS_AVAILABLE = True
+except ImportError:
+    redis_asyncio = None
+    REDIS_AVAILABLE = False
+
+# After a Redis error the in-process buckets are used for this long
+REDIS_RETRY_AFTER_SECONDS = 30
+
+PERIOD_SECONDS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+# Refill, take `cost` tokens if there are enough, and store the bucket, all
+# in one atomic step. Redis's clock is used so all workers agree on time.
+# Returns {allowed, tokens left, seconds until `cost` tokens are available};
+# floats go back as strings because Redis truncates Lua numbers to integers.
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+local wait = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+else
+    wait = (cost - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000))
+return {allowed, tostring(tokens), tostring(wait)}
+"""
+
+
+@dataclass
+class Limit:
+    """A bucket of `capacity` tokens refilling at `rate` tokens per second."""
+    capacity: int
+    period: float
+
+    @property
+    def rate(self) -> float:
+        return self.capacity / self.period
+
+    @classmethod
+    def parse(cls, spec: str) -> "Limit":
+        """Parse "N/period", e.g. "30/hour" or "5/day"."""
+        count, _, period = spec.partition('/')
+        return cls(capacity=int(count), period=PERIOD_SECONDS[period.strip()])
+
+
+@dataclass
+class Decision:
+    allowed: bool
+    limit: Limit
+    remaining: float
+    retry_after: float
+
+    def headers(self) -> Dict[str, str]:
+        headers = {
+            "X-RateLimit-Limit": str(self.limit.capacity),
+            "X-RateLimit-Remaining": str(int(self.remaining)),
+            "X-RateLimit-Reset": str(math.ceil((self.limit.capacity - self.remaining) / self.limit.rate)),
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(max(1, math.ceil(self.retry_after)))
+        return headers
+
+
+class MemoryBuckets:
+    """Token buckets in an in-process LRU cache. An entry expires once it
+    would have refilled completely, which is the same as a missing one."""
+
+    def __init__(self, maxsize: int):
+        self._buckets = TTLCache(maxsize=maxsize, ttl=PERIOD_SECONDS["day"])
+        self._lock = threading.Lock()
+
+    def take(self, key: str, limit: Limit, cost: int) -> Tuple[bool, float, float]:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (limit.capacity, now))
+            tokens = min(limit.capacity, tokens + max(0.0, now - updated_at) * limit.rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self._buckets.set(key, (tokens, now), ttl=limit.period)
+        retry_after = 0.0 if allowed else (cost - tokens) / limit.rate
+        return allowed, tokens, retry_after
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class RateLimiter:
+    """Token buckets per (scope, user), sized by the user's plan."""
+
+    def __init__(
+        self,
+        limits: Dict[str, Dict[str, str]],
+        redis_url: Optional[str],
+        max_buckets: int,
+        plan_ttl: float,
+        enabled: bool = True
+    ):
+        self.enabled = enabled
+        self.limits = {
+            plan: {scope: Limit.parse(spec) for scope, spec in scopes.items()}
+            for plan, scopes in limits.items()
+        }
+        self._memory = MemoryBuckets(maxsize=max_buckets)
+        # Plan names of premium users, so the subscription is not read per request
+        self._plans = TTLCache(maxsize=max_buckets, ttl=plan_ttl)
+        self._redis = None
+        self._script = None
+        self._redis_down_until = 0.0
+        if redis_url and REDIS_AVAILABLE:
+            self._redis = redis_asyncio.from_url(redis_url)
+            self._script = self._redis.register_script(TOKEN_BUCKET_SCRIPT)
+
+        self.allowed: Dict[str, int] = {}
+        self.limited: Dict[str, int] = {}
+        self.errors = 0
+
+    async def plan_for(self, user: User, db: AsyncSession) -> str:
+        """The user's plan: the active subscription's plan_name for premium
+        users ("premium" if it is unknown), otherwise "free"."""
+        if not getattr(user, "is_premium", False):
+            return "free"
+        # Keyed on is_premium too, so an upgrade or cancellation shows at once
+        cache_key = (user.id, user.is_premium)
+        plan = self._plans.get(cache_key)
+        if plan is None:
+            result = await db.execute(
+                select(Subscription.plan_name)
+                .filter(Subscription.user_id == user.id, Subscription.status == 'active')
+                .order_by(Subscription.id.desc())
+                .limit(1)
+            )
+            plan_name = result.scalar()
+            plan = plan_name if plan_name in self.limits else "premium"
+            self._plans.set(cache_key, plan)
+        return plan
+
+    def limit_for(self, plan: str, scope: str) -> Limit:
+        return self.limits.get(plan, self.limits["free"])[scope]
+
+    async def _take(self, key: str, limit: Limit, cost: int) -> Tuple[bool, float, float]:
+        if self._redis is not None and time.monotonic() >= self._redis_down_until:
+            try:
+                allowed, tokens, wait = await self._script(
+                    keys=[key], args=[limit.capacity, limit.rate, cost]
+                )
+                return bool(allowed), float(tokens), float(wait)
+            except Exception as e:
+                self.errors += 1
+                self._redis_down_until = time.monotonic() + REDIS_RETRY_AFTER_SECONDS
+                print(f"Rate limiter Redis call failed, using per-worker buckets for "
+                      f"{REDIS_RETRY_AFTER_SECONDS}s: {str(e)}")
+        return self._memory.take(key, limit, cost)
+
+    async def check(self, user: User, scope: str, db: AsyncSession, cost: int = 1) -> Decision:
+        """Take cost tokens from the user's bucket for scope. cost=0 only
+        reports the current state."""
+        limit = self.limit_for(await self.plan_for(user, db), scope)
+        if cost > limit.capacity:
+            # Can never be granted; the caller refuses it outright
+            return Decision(allowed=False, limit=limit, remaining=0, retry_after=limit.period)
+        allowed, remaining, retry_after = await self._take(
+            f"smartcv:ratelimit:{scope}:{user.id}", limit, cost
+        )
+        if cost:
+            counters = self.allowed if allowed else self.limited
+            counters[scope] = counters.get(scope, 0) + 1
+        return Decision(allowed=allowed, limit=limit, remaining=remaining, retry_after=retry_after)
+
+    async def close(self):
+        if self._redis is not None:
+            await self._redis.aclose()
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "backend": "redis" if self._redis is not None else "memory",
+            "redis_fallback": time.monotonic() < self._redis_down_until,
+            "allowed": dict(self.allowed),
+            "limited": dict(self.limited),
+            "errors": self.errors,
+            "memory_buckets": len(self._memory),
+        }
+
+
+# Global instance
+rate_limiter = RateLimiter(
+    limits=settings.RATE_LIMITS,
+    redis_url=settings.REDIS_URL,
+    max_buckets=settings.RATE_LIMIT_MAX_BUCKETS,
+    plan_ttl=settings.RATE_LIMIT_PLAN_CACHE_SECONDS,
+    enabled=settings.RATE_LIMIT_ENABLED
+)
+
+
+async def enforce_rate_limit(
+    user: User,
+    scope: str,
+    db: AsyncSession,
+    response: Optional[Response] = None,
+    cost: int = 1
+) -> Optional[Decision]:
+    """Charge cost tokens to the user's bucket for scope, or raise 429.
+
+    The X-RateLimit-* headers are added to response when given. Returns the
+    decision (None when limits are disabled) for endpoints that build their
+    own response.
+    """
+    if not rate_limiter.enabled:
+        return None
+    decision = await rate_limiter.check(user, scope, db, cost)
+    if cost > decision.limit.capacity:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Your plan allows at most {decision.limit.capacity} {scope} requests at once"
+        )
+    if not decision.allowed:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=f"Too many {scope} requests, try again in {decision.headers()['Retry-After']}s",
+            headers=decision.headers()
+        )
+    if response is not None:
+        response.headers.update(decision.headers())
+    return decision
+
+
+def rate_limit(scope: str, cost: int = 1):
+    """Dependency charging each request to the current user's bucket for
+    scope; resolves to the current user."""
+    async def dependency(
+        response: Response,
+        current_user: User = Depends(get_current_user),
+        db: AsyncSession = Depends(get_async_db)
+    ) -> User:
+        await enforce_rate_limit(current_user, scope, db, response, cost)
+        return current_user
+    return dependency
@@ -1,15 +1,227 @@
+import asyncio
+import threading
+import time
+import weakref
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
+from starlette.concurrency import run_in_threadpool
 from app.core.config import settings
 
-engine = create_engine(settings.DATABASE_URL)
+class PoolWaitStats:
+    """Thread-safe counters for time spent waiting on pool checkouts."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, waited: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            attempts = self.checkouts + self.timeouts
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": round(self.total_wait / attempts * 1000, 3) if attempts else 0.0,
+                "max_wait_ms": round(self.max_wait * 1000, 3),
+            }
+
+def timed_pool_class(base):
+    """Subclass a QueuePool variant so checkout wait times are recorded.
+
+    Stats live on the class, so they survive pool.recreate() on dispose.
+    """
+    class TimedPool(base):
+        wait_stats = PoolWaitStats()
+
+        def _do_get(self):
+            start = time.perf_counter()
+            try:
+                conn = super()._do_get()
+            except Exception:
+                self.wait_stats.record(time.perf_counter() - start, timed_out=True)
+                raise
+            self.wait_stats.record(time.perf_counter() - start)
+            return conn
+
+    TimedPool.__name__ = f"Timed{base.__name__}"
+    return TimedPool
+
+def pool_options() -> dict:
+    """Engine keyword arguments for the configured connection pool."""
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+engine = create_engine(
+    settings.DATABASE_URL,
+    poolclass=timed_pool_class(QueuePool),
+    **pool_options()
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+def get_async_database_url(url: str) -> str:
+    """Translate a sync PostgreSQL URL to its asyncpg equivalent."""
+    if settings.DATABASE_ASYNC_URL:
+        return settings.DATABASE_ASYNC_URL
+    if url.startswith("postgres://"):
+        url = "postgresql://" + url[len("postgres://"):]
+    if url.startswith("postgresql+psycopg2://"):
+        url = "postgresql://" + url[len("postgresql+psycopg2://"):]
+    if url.startswith("postgresql://"):
+        return "postgresql+asyncpg://" + url[len("postgresql://"):]
+    return url
+
+# Async engine (optional, enabled with DATABASE_ASYNC)
+async_engine = None
+AsyncSessionLocal = None
+if settings.DATABASE_ASYNC:
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+    from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+    async_engine = create_async_engine(
+        get_async_database_url(settings.DATABASE_URL),
+        poolclass=timed_pool_class(AsyncAdaptedQueuePool),
+        **pool_options()
+    )
+    AsyncSessionLocal = async_sessionmaker(
+        async_engine, autoflush=False, expire_on_commit=False
+    )
+
+def _pool_status(pool) -> dict:
+    status = {
+        "pool_size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+    }
+    wait_stats = getattr(pool, "wait_stats", None)
+    if wait_stats is not None:
+        status.update(wait_stats.snapshot())
+    return status
+
+def get_pool_metrics() -> dict:
+    """Connection pool usage for this process's engines."""
+    metrics = {"sync": _pool_status(engine.pool)}
+    if async_engine is not None:
+        metrics["async"] = _pool_status(async_engine.pool)
+    return metrics
+
+# Connections a ThreadedSession may hold, per event loop. Waiting here rather
+# than in the pool keeps threadpool workers free for the sessions that hold
+# connections, which need a worker to commit and release them.
+_connection_slots = weakref.WeakKeyDictionary()
+
+def _get_connection_slots() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    slots = _connection_slots.get(loop)
+    if slots is None:
+        slots = asyncio.Semaphore(settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW)
+        _connection_slots[loop] = slots
+    return slots
+
+class ThreadedSession:
+    """Async facade over a sync Session that runs each DB call in the threadpool.
+
+    Exposes the subset of the AsyncSession API used by the routers so the same
+    handler code runs against either engine. A connection slot is taken before
+    the first call of a transaction and given back when it ends (commit,
+    rollback or close), matching when the Session returns its connection.
+    """
+
+    def __init__(self, session):
+        self.sync_session = session
+        self._slots = None
+
+    async def _take_slot(self):
+        if self._slots is None:
+            slots = _get_connection_slots()
+            await slots.acquire()
+            self._slots = slots
+
+    async def _run(self, func, *args, **kwargs):
+        await self._take_slot()
+        return await run_in_threadpool(func, *args, **kwargs)
+
+    async def _end_transaction(self, func):
+        try:
+            await run_in_threadpool(func)
+        finally:
+            if self._slots is not None:
+                self._slots.release()
+                self._slots = None
+
+    def add(self, instance):
+        self.sync_session.add(instance)
+
+    def expunge(self, instance):
+        self.sync_session.expunge(instance)
+
+    async def execute(self, statement, *args, **kwargs):
+        return await self._run(self.sync_session.execute, statement, *args, **kwargs)
+
+    async def scalar(self, statement, *args, **kwargs):
+        return await self._run(self.sync_session.scalar, statement, *args, **kwargs)
+
+    async def get(self, entity, ident, **kwargs):
+        return await self._run(self.sync_session.get, entity, ident, **kwargs)
+
+    async def merge(self, instance, **kwargs):
+        return await self._run(self.sync_session.merge, instance, **kwargs)
+
+    async def delete(self, instance):
+        await self._run(self.sync_session.delete, instance)
+
+    async def flush(self):
+        await self._run(self.sync_session.flush)
+
+    async def commit(self):
+        # Flushing pending objects may be the transaction's first use of a connection
+        await self._take_slot()
+        await self._end_transaction(self.sync_session.commit)
+
+    async def rollback(self):
+        await self._end_transaction(self.sync_session.rollback)
+
+    async def refresh(self, instance, **kwargs):
+        await self._run(self.sync_session.refresh, instance, **kwargs)
+
+    async def close(self):
+        await self._end_transaction(self.sync_session.close)
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    """Yield an AsyncSession, or a threaded sync session when DATABASE_ASYNC is off."""
+    if AsyncSessionLocal is not None:
+        async with AsyncSessionLocal() as db:
+            yield db
+    else:
+        db = ThreadedSession(SessionLocal(expire_on_commit=False))
+        try:
+            yield db
+        finally:
+            await db.close()
@@ -1,8 +1,15 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, ForeignKey, JSON, Index
+from sqlalchemy.dialects import sqlite
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.models.database import Base
 
+# SQLite's CURRENT_TIMESTAMP has whole seconds; binding datetimes without
+# microseconds keeps keyset comparisons (see GET /api/cv/) consistent with it
+KeysetTimestamp = DateTime(timezone=True).with_variant(
+    sqlite.DATETIME(truncate_microseconds=True), "sqlite"
+)
+
 class User(Base):
     __tablename__ = "users"
     
@@ -28,6 +35,10 @@ class User(Base):
 
 class CV(Base):
     __tablename__ = "cvs"
+    __table_args__ = (
+        # Owner listing, ordered by last update (see GET /api/cv/)
+        Index("ix_cvs_owner_id_updated_at", "owner_id", "updated_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False)
@@ -47,7 +58,7 @@ class CV(Base):
     references = Column(JSON)
     
     # Template and styling
-    template_id = Column(String, default="modern")
+    template_id = Column(String, default="1")
     color_scheme = Column(String, default="blue")
     
     # Status
@@ -55,13 +66,21 @@ class CV(Base):
     pdf_url = Column(String)
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    updated_at = Column(KeysetTimestamp, server_default=func.now(), onupdate=func.now())
+    
+    # Optimistic concurrency: bumped on every UPDATE, stale writes raise StaleDataError
+    version = Column(Integer, nullable=False, default=1, server_default="1")
     
     # Relationships
     owner = relationship("User", back_populates="cvs")
+    
+    __mapper_args__ = {"version_id_col": version}
 
 class Subscription(Base):
     __tablename__ = "subscriptions"
+    __table_args__ = (
+        Index("ix_subscriptions_user_id_status", "user_id", "status"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -78,12 +97,41 @@ class Subscription(Base):
 
 class PDFGeneration(Base):
     __tablename__ = "pdf_generations"
+    __table_args__ = (
+        Index("ix_pdf_generations_cv_id_user_id_status", "cv_id", "user_id", "status"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     cv_id = Column(Integer, ForeignKey("cvs.id"), nullable=False)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    task_id = Column(String, unique=True, index=True)  # Celery / fallback job id
     status = Column(String, default="pending")  # pending, processing, completed, failed
     file_path = Column(String)
+    content_hash = Column(String, index=True)  # Render cache key
+    cache_hit = Column(Boolean, default=False)
     error_message = Column(Text)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     completed_at = Column(DateTime)
+
+class RefreshToken(Base):
+    """Opaque refresh token, stored as a SHA-256 hash.
+
+    Tokens are single use: refreshing revokes the presented token and issues
+    its successor in the same family (one family per login/device). Presenting
+    an already rotated token revokes the whole family.
+    """
+    __tablename__ = "refresh_tokens"
+    __table_args__ = (
+        # Active sessions of a user (see GET /api/auth/sessions)
+        Index("ix_refresh_tokens_user_id_revoked_at", "user_id", "revoked_at"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    token_hash = Column(String(64), unique=True, index=True, nullable=False)
+    family_id = Column(String(32), index=True, nullable=False)
+    device = Column(String)  # User-Agent at login
+    ip_address = Column(String)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    expires_at = Column(DateTime, nullable=False)
+    revoked_at = Column(DateTime, nullable=True)
@@ -1,6 +1,7 @@
-from pydantic import BaseModel, EmailStr, validator
+from pydantic import BaseModel, EmailStr, Field, validator
 from typing import Optional, List, Dict, Any
 from datetime import datetime
+from app.core.cv_rules import is_valid_date
 
 # Base schemas
 class UserBase(BaseModel):
@@ -27,6 +28,29 @@ class User(UserBase):
 class Token(BaseModel):
     access_token: str
     token_type: str
+    refresh_token: Optional[str] = None
+    expires_in: Optional[int] = None  # access token lifetime in seconds
+
+class RefreshTokenRequest(BaseModel):
+    refresh_token: str
+
+class LoginSession(BaseModel):
+    id: str  # refresh token family, stable across rotations
+    device: Optional[str] = None
+    ip_address: Optional[str] = None
+    last_refreshed_at: Optional[datetime] = None
+    expires_at: datetime
+    current: bool = False
+
+class RateLimitStatus(BaseModel):
+    limit: int  # requests per period, also the largest burst
+    period_seconds: int
+    remaining: int
+    reset_seconds: int  # until the bucket is full again
+
+class UsageLimits(BaseModel):
+    plan: str
+    limits: Dict[str, RateLimitStatus]
 
 # 2FA Schemas
 class TwoFactorSetupRequest(BaseModel):
@@ -89,8 +113,7 @@ class Education(BaseModel):
     @validator('start_date', 'end_date')
     def validate_date_format(cls, v):
         if v and v != "Present":
-            import re
-            if not re.match(r'^\d{2}/\d{4}$', v):
+            if not is_valid_date(v):
                 raise ValueError('Date must be in MM/YYYY format')
         return v
 
@@ -157,8 +180,13 @@ class CVBase(BaseModel):
     languages: Optional[List[Language]] = []
     achievements: Optional[List[Achievement]] = []
     references: Optional[List[Reference]] = []
-    template_id: Optional[str] = "modern"
+    template_id: Optional[str] = "1"
     color_scheme: Optional[str] = "blue"
+    
+    @validator('template_id', pre=True)
+    def validate_template_id(cls, v):
+        # The frontend sends its numeric template ids
+        return str(v) if isinstance(v, int) else v
 
 class CVCreate(CVBase):
     pass
@@ -176,18 +204,53 @@ class CVUpdate(BaseModel):
     references: Optional[List[Reference]] = None
     template_id: Optional[str] = None
     color_scheme: Optional[str] = None
+    
+    @validator('template_id', pre=True)
+    def validate_template_id(cls, v):
+        return str(v) if isinstance(v, int) else v
 
 class CV(CVBase):
     id: int
     owner_id: int
     is_public: bool
     pdf_url: Optional[str] = None
+    version: int = 1
     created_at: datetime
     updated_at: Optional[datetime] = None
     
     class Config:
         from_attributes = True
 
+class CVSummary(BaseModel):
+    """Lightweight CV listing entry (no section data)."""
+    id: int
+    title: str
+    template_id: Optional[str] = None
+    color_scheme: Optional[str] = None
+    is_public: Optional[bool] = False
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
+
+# JSON Patch (RFC 6902) Schemas
+class PatchOperation(BaseModel):
+    op: str  # add/remove/replace/move/copy/test
+    path: str  # JSON pointer, e.g. /experience/0/job_title
+    from_: Optional[str] = Field(None, alias="from")
+    value: Any = None
+
+class CVPatch(BaseModel):
+    version: int  # CV version the operations were computed against
+    operations: List[PatchOperation]
+
+class CVPatchResult(BaseModel):
+    id: int
+    version: int
+    updated_at: Optional[datetime] = None
+    updated_fields: List[str] = []
+
 # Validation Response
 class ValidationResponse(BaseModel):
     is_valid: bool
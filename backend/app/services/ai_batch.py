@@ -0,0 +1,125 @@
+"""
+Packing several job description requests into one LLM call.
+
+Entries are packed, in order, into as few requests as fit the token budget
+(prompt estimate plus the completion tokens reserved per entry).
+The model answers with a JSON object keyed by entry id, which is parsed
+back per entry; anything missing or malformed is left for the caller to
+fill with mock suggestions.
+"""
+import json
+from typing import Dict, List, Optional, Sequence
+
+# Rough size of an English token for estimating prompt length (no tokenizer needed)
+CHARS_PER_TOKEN = 4
+
+SYSTEM_PROMPT = (
+    "You are a professional CV/resume writer who creates impactful job descriptions. "
+    "You answer with JSON only."
+)
+
+_INSTRUCTIONS = """
+Generate 5 professional bullet points for each of the job entries below.
+Create compelling, action-oriented bullet points that highlight achievements,
+responsibilities, and impact. Use strong action verbs and quantify results where possible.
+Make them suitable for a professional CV/resume.
+
+Answer with a JSON object mapping each entry id to its list of bullet point
+strings, without bullets or numbering, e.g. {"0": ["...", "..."], "1": ["..."]}.
+
+Entries:
+"""
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def describe_entry(entry_id: int, entry) -> str:
+    current = "; ".join(entry.current_descriptions) if entry.current_descriptions else "None provided"
+    return (
+        f"[{entry_id}] Job Title: {entry.job_title} | Company: {entry.company} | "
+        f"Current descriptions: {current} | Context: {entry.context}\n"
+    )
+
+
+def _fits(costs: Sequence[int], base: int, token_budget: int) -> bool:
+    return len(costs) == 1 or base + sum(costs) <= token_budget
+
+
+def pack_entries(
+    entries: Sequence,
+    ids: Sequence[int],
+    token_budget: int,
+    output_tokens_per_entry: int
+) -> List[List[int]]:
+    """Group entry ids into as few packs as fit token_budget (estimated
+    prompt plus completion), then even out their sizes: packs run
+    concurrently, so the largest one sets the latency. An entry too large
+    for any pack gets a pack of its own."""
+    base = estimate_tokens(SYSTEM_PROMPT + _INSTRUCTIONS)
+    costs = [
+        estimate_tokens(describe_entry(entry_id, entries[entry_id])) + output_tokens_per_entry
+        for entry_id in ids
+    ]
+
+    # Greedy first fit, in order, gives the number of packs needed
+    packs: List[List[int]] = []
+    current: List[int] = []
+    used = base
+    for entry_id, cost in zip(ids, costs):
+        if current and used + cost > token_budget:
+            packs.append(current)
+            current, used = [], base
+        current.append(entry_id)
+        used += cost
+    if current:
+        packs.append(current)
+
+    # Same number of packs, sizes differing by at most one entry
+    count = len(packs)
+    if count > 1:
+        size, extra = divmod(len(ids), count)
+        balanced, start = [], 0
+        for index in range(count):
+            end = start + size + (1 if index < extra else 0)
+            balanced.append((start, end))
+            start = end
+        if all(_fits(costs[start:end], base, token_budget) for start, end in balanced):
+            packs = [list(ids[start:end]) for start, end in balanced]
+    return packs
+
+
+def batch_messages(entries: Sequence, pack: Sequence[int]) -> List[Dict[str, str]]:
+    prompt = _INSTRUCTIONS + "".join(describe_entry(entry_id, entries[entry_id]) for entry_id in pack)
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": prompt}
+    ]
+
+
+def parse_batch_output(text: str, pack: Sequence[int]) -> Dict[int, List[str]]:
+    """Bullets per entry id from the model's JSON answer.
+
+    Tolerates text around the JSON object (e.g. code fences); entries that
+    are missing or not a list of strings are left out.
+    """
+    start, end = text.find('{'), text.rfind('}')
+    if start == -1 or end <= start:
+        return {}
+    try:
+        data = json.loads(text[start:end + 1])
+    except ValueError:
+        return {}
+    if not isinstance(data, dict):
+        return {}
+
+    results = {}
+    for entry_id in pack:
+        bullets: Optional[list] = data.get(str(entry_id))
+        if not isinstance(bullets, list):
+            continue
+        cleaned = [item.strip() for item in bullets if isinstance(item, str) and item.strip()]
+        if cleaned:
+            results[entry_id] = cleaned
+    return results
@@ -0,0 +1,212 @@
+"""
+Async OpenAI client shared by the AI endpoints: one HTTP connection pool per
+process, a timeout on every call and a cap on concurrent requests, so slow
+completions never hold up the event loop or pile up without bound.
+"""
+import asyncio
+import time
+from typing import AsyncIterator, Dict, List, Optional
+
+from app.core.config import settings
+
+# openai is optional; without it the AI endpoints serve mock suggestions
+try:
+    import httpx
+    from openai import AsyncOpenAI, APITimeoutError, DefaultAsyncHttpxClient
+    OPENAI_AVAILABLE = True
+except ImportError:
+    OPENAI_AVAILABLE = False
+
+
+class AIUnavailable(Exception):
+    """The AI backend is not configured or too busy to take the call."""
+
+
+class AIStreamStalled(Exception):
+    """A streamed completion stopped sending chunks."""
+
+
+class AIClient:
+    """Chat completions over a shared AsyncOpenAI client."""
+
+    def __init__(
+        self,
+        api_key: Optional[str],
+        model: str,
+        base_url: Optional[str] = None,
+        timeout: float = 20,
+        max_retries: int = 1,
+        max_concurrency: int = 16,
+        queue_timeout: float = 5,
+        stall_timeout: float = 5
+    ):
+        self.api_key = api_key
+        self.model = model
+        self.base_url = base_url
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.max_concurrency = max_concurrency
+        self.queue_timeout = queue_timeout
+        self.stall_timeout = stall_timeout
+        self._client = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+        self.calls = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.rejected = 0
+        self.stalls = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._total_latency = 0.0
+
+    @property
+    def available(self) -> bool:
+        return OPENAI_AVAILABLE and bool(self.api_key)
+
+    def _get_client(self):
+        if self._client is None:
+            # Keep-alive connections are reused across calls (one pool per process)
+            limits = httpx.Limits(
+                max_connections=self.max_concurrency,
+                max_keepalive_connections=self.max_concurrency
+            )
+            self._client = AsyncOpenAI(
+                api_key=self.api_key,
+                base_url=self.base_url or None,
+                timeout=self.timeout,
+                max_retries=self.max_retries,
+                http_client=DefaultAsyncHttpxClient(limits=limits)
+            )
+        return self._client
+
+    async def _acquire(self):
+        if not self.available:
+            raise AIUnavailable("OpenAI is not configured")
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise AIUnavailable("Too many AI requests in flight")
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def _release(self):
+        self.in_flight -= 1
+        self._semaphore.release()
+
+    async def complete(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: int,
+        temperature: float = 0.7
+    ) -> str:
+        """Return the completion text.
+
+        Raises AIUnavailable if not configured or no slot frees up within
+        queue_timeout; API errors and timeouts propagate to the caller.
+        """
+        await self._acquire()
+        started = time.monotonic()
+        try:
+            response = await self._get_client().chat.completions.create(
+                model=self.model,
+                messages=messages,
+                max_tokens=max_tokens,
+                temperature=temperature
+            )
+            self.calls += 1
+            self._total_latency += time.monotonic() - started
+            return (response.choices[0].message.content or "").strip()
+        except APITimeoutError:
+            self.timeouts += 1
+            raise
+        except Exception:
+            self.failures += 1
+            raise
+        finally:
+            self._release()
+
+    async def stream(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: int,
+        temperature: float = 0.7
+    ) -> AsyncIterator[str]:
+        """Yield completion text as it arrives.
+
+        Raises AIStreamStalled if the first or any later chunk takes longer
+        than stall_timeout; other errors are as for complete().
+        """
+        await self._acquire()
+        started = time.monotonic()
+        response = None
+        try:
+            try:
+                response = await asyncio.wait_for(
+                    self._get_client().chat.completions.create(
+                        model=self.model,
+                        messages=messages,
+                        max_tokens=max_tokens,
+                        temperature=temperature,
+                        stream=True
+                    ),
+                    self.stall_timeout
+                )
+                chunks = response.__aiter__()
+                while True:
+                    try:
+                        chunk = await asyncio.wait_for(chunks.__anext__(), self.stall_timeout)
+                    except StopAsyncIteration:
+                        break
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+            except asyncio.TimeoutError:
+                self.stalls += 1
+                raise AIStreamStalled(f"No data from OpenAI for {self.stall_timeout}s")
+            except (AIStreamStalled, GeneratorExit):
+                raise
+            except Exception:
+                self.failures += 1
+                raise
+            self.calls += 1
+            self._total_latency += time.monotonic() - started
+        finally:
+            if response is not None:
+                await response.close()
+            self._release()
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+    def stats(self) -> dict:
+        return {
+            "available": self.available,
+            "model": self.model,
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "calls": self.calls,
+            "failures": self.failures,
+            "timeouts": self.timeouts,
+            "rejected": self.rejected,
+            "stalls": self.stalls,
+            "avg_latency_ms": round(self._total_latency / self.calls * 1000, 1) if self.calls else 0.0,
+        }
+
+
+# Global instance
+ai_client = AIClient(
+    api_key=settings.OPENAI_API_KEY,
+    model=settings.OPENAI_MODEL,
+    base_url=settings.OPENAI_BASE_URL,
+    timeout=settings.OPENAI_TIMEOUT_SECONDS,
+    max_retries=settings.OPENAI_MAX_RETRIES,
+    max_concurrency=settings.OPENAI_MAX_CONCURRENCY,
+    queue_timeout=settings.OPENAI_QUEUE_TIMEOUT_SECONDS,
+    stall_timeout=settings.OPENAI_STREAM_STALL_SECONDS
+)
@@ -0,0 +1,83 @@
+"""
+Bulk CV validation: payloads are validated in chunks, on the shared worker
+pool for large batches, and results are streamed as NDJSON lines.
+"""
+import asyncio
+import json
+from typing import Any, AsyncIterator, Dict, List, Tuple
+
+from pydantic import ValidationError
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.process_pool import get_process_pool
+from app.schemas.schemas import CVCreate
+from app.services.cv_validation import cv_validator
+
+
+def validate_payloads(items: List[Tuple[int, Dict[str, Any]]]) -> List[dict]:
+    """Validate (index, payload) pairs; runs in worker processes."""
+    results = []
+    for index, payload in items:
+        try:
+            cv_data = CVCreate(**payload)
+        except ValidationError as e:
+            results.append({
+                "index": index,
+                "is_valid": False,
+                "errors": [
+                    f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+                    for error in e.errors()
+                ]
+            })
+            continue
+        result = cv_validator.validate_cv(cv_data)
+        results.append({"index": index, **result.dict()})
+    return results
+
+
+def _ndjson(results: List[dict]) -> bytes:
+    return "".join(json.dumps(result) + "\n" for result in results).encode()
+
+
+async def stream_batch_validation(payloads: List[Dict[str, Any]]) -> AsyncIterator[bytes]:
+    """Yield NDJSON validation results, one line per CV, as chunks finish.
+
+    Lines carry the payload's index and may arrive out of order.
+    """
+    chunk_size = max(1, settings.VALIDATION_BATCH_CHUNK_SIZE)
+    indexed = list(enumerate(payloads))
+    chunks = [indexed[i:i + chunk_size] for i in range(0, len(indexed), chunk_size)]
+
+    if len(chunks) <= 1:
+        # Not worth a round trip to another process
+        yield _ndjson(await run_in_threadpool(validate_payloads, indexed))
+        return
+
+    loop = asyncio.get_running_loop()
+    pool = get_process_pool()
+    window = max(1, settings.CPU_POOL_WORKERS * 2)
+    remaining = iter(chunks)
+    in_flight = set()
+
+    def submit_next() -> bool:
+        chunk = next(remaining, None)
+        if chunk is None:
+            return False
+        in_flight.add(loop.run_in_executor(pool, validate_payloads, chunk))
+        return True
+
+    try:
+        while len(in_flight) < window and submit_next():
+            pass
+
+        while in_flight:
+            done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                in_flight.discard(future)
+                submit_next()
+                yield _ndjson(future.result())
+    finally:
+        # Client went away: drop the chunks that have not started
+        for future in in_flight:
+            future.cancel()
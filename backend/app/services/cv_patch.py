@@ -0,0 +1,263 @@
+"""
+RFC 6902 JSON Patch for CVs, applied per column so only the sections and
+items an operation touches are copied, re-validated and written back.
+"""
+import copy
+from typing import Any, Dict, List, Tuple
+
+from pydantic import ValidationError
+
+from app.schemas.schemas import (
+    PersonalInfo, Education, WorkExperience, Skill, Project,
+    Certification, Language, Achievement, Reference
+)
+
+# List sections and the model each item is validated against
+SECTION_MODELS = {
+    'education': Education,
+    'experience': WorkExperience,
+    'skills': Skill,
+    'projects': Project,
+    'certifications': Certification,
+    'languages': Language,
+    'achievements': Achievement,
+    'references': Reference,
+}
+
+SCALAR_FIELDS = ('title', 'template_id', 'color_scheme')
+
+PATCHABLE_FIELDS = set(SECTION_MODELS) | set(SCALAR_FIELDS) | {'personal_info'}
+
+
+class JSONPatchError(ValueError):
+    """The patch document is malformed or cannot be applied."""
+
+
+class JSONPatchTestFailed(JSONPatchError):
+    """A "test" operation did not match the current document."""
+
+
+def parse_pointer(pointer: str) -> List[str]:
+    """Split an RFC 6901 JSON pointer into unescaped reference tokens."""
+    if not isinstance(pointer, str) or not pointer.startswith('/'):
+        raise JSONPatchError(f"Invalid JSON pointer: {pointer!r}")
+    return [token.replace('~1', '/').replace('~0', '~') for token in pointer[1:].split('/')]
+
+
+def _list_index(container: list, token: str, allow_end: bool) -> int:
+    if token == '-' and allow_end:
+        return len(container)
+    if not token.isdigit() or (len(token) > 1 and token.startswith('0')):
+        raise JSONPatchError(f"Invalid array index: {token!r}")
+    index = int(token)
+    limit = len(container) + (1 if allow_end else 0)
+    if index >= limit:
+        raise JSONPatchError(f"Array index out of range: {index}")
+    return index
+
+
+def _child(container, token: str):
+    if isinstance(container, list):
+        return container[_list_index(container, token, allow_end=False)]
+    if isinstance(container, dict):
+        if token not in container:
+            raise JSONPatchError(f"Path member not found: {token!r}")
+        return container[token]
+    raise JSONPatchError(f"Cannot traverse into a scalar at {token!r}")
+
+
+class CVPatcher:
+    """Applies a patch to a CV row, tracking what each operation touched."""
+
+    def __init__(self, cv):
+        self.cv = cv
+        # Working copies of the columns that have been touched
+        self.columns: Dict[str, Any] = {}
+        # Columns replaced or reordered as a whole (all items re-validated)
+        self.whole_columns = set()
+        # Section items added or modified in place, by column
+        self.touched_items: Dict[str, Dict[int, Any]] = {}
+
+    def _column(self, field: str):
+        if field not in PATCHABLE_FIELDS:
+            raise JSONPatchError(f"Field cannot be patched: {field!r}")
+        if field not in self.columns:
+            value = getattr(self.cv, field)
+            if value is None and field in SECTION_MODELS:
+                value = []
+            self.columns[field] = copy.deepcopy(value)
+        return self.columns[field]
+
+    def _touch(self, tokens: List[str], item=None):
+        """Record that the item (or whole column) under tokens changed."""
+        field = tokens[0]
+        if len(tokens) == 1 or field not in SECTION_MODELS:
+            self.whole_columns.add(field)
+            return
+        if item is None:
+            item = _child(self.columns[field], tokens[1])
+        self.touched_items.setdefault(field, {})[id(item)] = item
+
+    def _resolve(self, pointer: str) -> Tuple[List[str], Any]:
+        tokens = parse_pointer(pointer)
+        value = self._column(tokens[0])
+        for token in tokens[1:]:
+            value = _child(value, token)
+        return tokens, value
+
+    def _parent(self, tokens: List[str]):
+        parent = self._column(tokens[0])
+        for token in tokens[1:-1]:
+            parent = _child(parent, token)
+        return parent
+
+    def _add(self, tokens: List[str], value):
+        if len(tokens) == 1:
+            # Loaded first so fields outside PATCHABLE_FIELDS are refused
+            self._column(tokens[0])
+            self.columns[tokens[0]] = value
+            self._touch(tokens)
+            return
+        parent = self._parent(tokens)
+        last = tokens[-1]
+        if isinstance(parent, list):
+            parent.insert(_list_index(parent, last, allow_end=True), value)
+        elif isinstance(parent, dict):
+            parent[last] = value
+        else:
+            raise JSONPatchError(f"Cannot add a member to a scalar at {last!r}")
+        self._touch(tokens, item=value if len(tokens) == 2 else None)
+
+    def _remove(self, tokens: List[str]):
+        if len(tokens) == 1:
+            raise JSONPatchError(f"Cannot remove the {tokens[0]!r} field")
+        parent = self._parent(tokens)
+        last = tokens[-1]
+        if isinstance(parent, list):
+            removed = parent.pop(_list_index(parent, last, allow_end=False))
+        elif isinstance(parent, dict):
+            if last not in parent:
+                raise JSONPatchError(f"Path member not found: {last!r}")
+            removed = parent.pop(last)
+        else:
+            raise JSONPatchError(f"Cannot remove a member of a scalar at {last!r}")
+        if len(tokens) == 2 and tokens[0] in SECTION_MODELS:
+            # Removing an item leaves the others as they were
+            self.touched_items.get(tokens[0], {}).pop(id(removed), None)
+        else:
+            self._touch(tokens)
+        return removed
+
+    def apply(self, operations: List[dict]):
+        """Apply operations in order; raises JSONPatchError on the first failure."""
+        for position, operation in enumerate(operations):
+            op = operation.get('op')
+            path = operation.get('path')
+            try:
+                if op == 'add':
+                    self._require_value(operation)
+                    self._add(parse_pointer(path), copy.deepcopy(operation['value']))
+                elif op == 'remove':
+                    self._remove(parse_pointer(path))
+                elif op == 'replace':
+                    self._require_value(operation)
+                    tokens, _ = self._resolve(path)
+                    if len(tokens) > 1:
+                        self._remove(tokens)
+                    self._add(tokens, copy.deepcopy(operation['value']))
+                elif op == 'move':
+                    source = parse_pointer(operation.get('from'))
+                    target = parse_pointer(path)
+                    if target[:len(source)] == source and target != source:
+                        raise JSONPatchError("Cannot move a value into one of its children")
+                    self._add(target, self._remove(source))
+                elif op == 'copy':
+                    _, value = self._resolve(operation.get('from'))
+                    self._add(parse_pointer(path), copy.deepcopy(value))
+                elif op == 'test':
+                    self._require_value(operation)
+                    _, value = self._resolve(path)
+                    if value != operation['value']:
+                        raise JSONPatchTestFailed(f"Test failed at {path}")
+                else:
+                    raise JSONPatchError(f"Unsupported operation: {op!r}")
+            except JSONPatchError as e:
+                raise type(e)(f"Operation {position} ({op}): {str(e)}")
+
+    @staticmethod
+    def _require_value(operation: dict):
+        if 'value' not in operation:
+            raise JSONPatchError("Missing 'value'")
+
+    def validated_changes(self) -> Dict[str, Any]:
+        """Re-validate what was touched and return the columns that changed.
+
+        Raises JSONPatchError listing every validation problem found.
+        """
+        errors = []
+        changes = {}
+
+        for field, value in self.columns.items():
+            if value == getattr(self.cv, field):
+                # Only read (e.g. by "test") or changed and changed back
+                continue
+
+            if field in SCALAR_FIELDS:
+                if not isinstance(value, str) or (field == 'title' and not value.strip()):
+                    errors.append(f"{field}: must be a non-empty string")
+                    continue
+            elif field == 'personal_info':
+                if not isinstance(value, dict):
+                    errors.append("personal_info: must be an object")
+                    continue
+                try:
+                    value = PersonalInfo(**value).dict()
+                except ValidationError as e:
+                    errors.extend(_format_errors('personal_info', e))
+                    continue
+            else:
+                value = self._validate_section(field, value, errors)
+
+            if value != getattr(self.cv, field):
+                changes[field] = value
+
+        if errors:
+            raise JSONPatchError("; ".join(errors))
+        return changes
+
+    def _validate_section(self, field: str, items, errors: List[str]):
+        if not isinstance(items, list):
+            errors.append(f"{field}: must be a list")
+            return items
+
+        model = SECTION_MODELS[field]
+        validate_all = field in self.whole_columns
+        touched = self.touched_items.get(field, {})
+        result = []
+        for index, item in enumerate(items):
+            if validate_all or id(item) in touched:
+                if not isinstance(item, dict):
+                    errors.append(f"{field}/{index}: must be an object")
+                    continue
+                try:
+                    item = model(**item).dict()
+                except ValidationError as e:
+                    errors.extend(_format_errors(f"{field}/{index}", e))
+                    continue
+            result.append(item)
+        return result
+
+
+def _format_errors(prefix: str, error: ValidationError) -> List[str]:
+    return [
+        f"{prefix}/{'/'.join(str(part) for part in detail['loc'])}: {detail['msg']}"
+        for detail in error.errors()
+    ]
+
+
+def apply_cv_patch(cv, operations: List[dict]) -> Dict[str, Any]:
+    """Apply JSON Patch operations to a CV and return {column: new_value}
+    for the columns whose value actually changed."""
+    patcher = CVPatcher(cv)
+    patcher.apply(operations)
+    return patcher.validated_changes()
@@ -1,6 +1,29 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Callable, Tuple
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.cv_rules import (
+    SUGGESTED_ACTION_VERBS, has_number, is_valid_date, starts_with_action_verb
+)
 from app.schemas.schemas import CVBase, ValidationResponse
-import re
+
+# Results are keyed by the entry's field values, so an edit to one entry
+# only re-validates that entry
+validation_cache = TTLCache(
+    maxsize=settings.VALIDATION_CACHE_MAX_SIZE,
+    ttl=settings.VALIDATION_CACHE_TTL_SECONDS
+)
+
+def _personal_info_key(personal_info) -> Tuple:
+    return ('personal_info', personal_info.full_name, personal_info.email,
+            personal_info.phone, personal_info.profile_summary)
+
+def _education_key(education) -> Tuple:
+    return ('education', education.school_name, education.degree,
+            education.field_of_study, education.start_date, education.end_date)
+
+def _experience_key(experience) -> Tuple:
+    return ('experience', experience.job_title, experience.company_name,
+            experience.start_date, experience.end_date, tuple(experience.job_description))
 
 class CVValidationService:
     """Service to validate CV data and provide suggestions."""
@@ -13,13 +36,8 @@ class CVValidationService:
             'skills': ['skill_name']
         }
         
-        self.action_verbs = [
-            'achieved', 'administered', 'analyzed', 'built', 'collaborated',
-            'created', 'designed', 'developed', 'directed', 'enhanced',
-            'established', 'executed', 'generated', 'implemented', 'improved',
-            'increased', 'led', 'managed', 'optimized', 'organized',
-            'planned', 'produced', 'reduced', 'resolved', 'streamlined'
-        ]
+        # Shown in suggestions; matching uses the full lexicon in cv_rules
+        self.action_verbs = list(SUGGESTED_ACTION_VERBS)
     
     def validate_cv(self, cv_data: CVBase) -> ValidationResponse:
         """Validate CV data and return validation response."""
@@ -27,7 +45,10 @@ class CVValidationService:
         suggestions = []
         
         # Validate personal information
-        missing_personal = self._validate_personal_info(cv_data.personal_info)
+        missing_personal, _ = self._cached(
+            _personal_info_key(cv_data.personal_info),
+            self._validate_personal_info, cv_data.personal_info
+        )
         missing_fields.extend(missing_personal)
         
         # Validate education (at least one required)
@@ -35,20 +56,21 @@ class CVValidationService:
             missing_fields.append("At least one education entry is required")
         else:
             for i, edu in enumerate(cv_data.education):
-                missing_edu = self._validate_education(edu, i)
-                missing_fields.extend(missing_edu)
+                missing_edu, _ = self._cached(_education_key(edu), self._validate_education, edu)
+                prefix = f"Education {i + 1}: "
+                missing_fields.extend(prefix + message for message in missing_edu)
         
         # Validate experience (preferred)
         if not cv_data.experience:
             suggestions.append("Consider adding work experience to strengthen your CV")
         else:
             for i, exp in enumerate(cv_data.experience):
-                missing_exp = self._validate_experience(exp, i)
-                missing_fields.extend(missing_exp)
-                
-                # Check job descriptions for action verbs
-                exp_suggestions = self._suggest_experience_improvements(exp, i)
-                suggestions.extend(exp_suggestions)
+                missing_exp, exp_suggestions = self._cached(
+                    _experience_key(exp), self._validate_experience, exp
+                )
+                prefix = f"Experience {i + 1}: "
+                missing_fields.extend(prefix + message for message in missing_exp)
+                suggestions.extend(prefix + message for message in exp_suggestions)
         
         # Validate skills
         if not cv_data.skills:
@@ -66,7 +88,15 @@ class CVValidationService:
             suggestions=suggestions
         )
     
-    def _validate_personal_info(self, personal_info) -> List[str]:
+    def _cached(self, key: Tuple, validate: Callable, entry) -> Tuple[List[str], List[str]]:
+        """Return (missing, suggestions) for an entry, validating it on a cache miss."""
+        result = validation_cache.get(key)
+        if result is None:
+            result = validate(entry)
+            validation_cache.set(key, result)
+        return result
+    
+    def _validate_personal_info(self, personal_info) -> Tuple[List[str], List[str]]:
         """Validate personal information fields."""
         missing = []
         
@@ -84,81 +114,77 @@ class CVValidationService:
         elif len(personal_info.profile_summary.split()) < 10:
             missing.append("Profile summary should be at least 10 words")
         
-        return missing
+        return missing, []
     
-    def _validate_education(self, education, index: int) -> List[str]:
-        """Validate education entry."""
+    def _validate_education(self, education) -> Tuple[List[str], List[str]]:
+        """Validate education entry (messages are not numbered)."""
         missing = []
-        prefix = f"Education {index + 1}: "
         
         if not education.school_name.strip():
-            missing.append(f"{prefix}School name is required")
+            missing.append("School name is required")
         
         if not education.degree.strip():
-            missing.append(f"{prefix}Degree is required")
+            missing.append("Degree is required")
         
         if not education.field_of_study.strip():
-            missing.append(f"{prefix}Field of study is required")
+            missing.append("Field of study is required")
         
         if not education.start_date.strip():
-            missing.append(f"{prefix}Start date is required")
+            missing.append("Start date is required")
         elif not self._validate_date_format(education.start_date):
-            missing.append(f"{prefix}Start date must be in MM/YYYY format")
+            missing.append("Start date must be in MM/YYYY format")
         
         if education.end_date and education.end_date != "Present":
             if not self._validate_date_format(education.end_date):
-                missing.append(f"{prefix}End date must be in MM/YYYY format or 'Present'")
+                missing.append("End date must be in MM/YYYY format or 'Present'")
         
-        return missing
+        return missing, []
     
-    def _validate_experience(self, experience, index: int) -> List[str]:
-        """Validate work experience entry."""
+    def _validate_experience(self, experience) -> Tuple[List[str], List[str]]:
+        """Validate work experience entry and suggest improvements (messages are not numbered)."""
         missing = []
-        prefix = f"Experience {index + 1}: "
         
         if not experience.job_title.strip():
-            missing.append(f"{prefix}Job title is required")
+            missing.append("Job title is required")
         
         if not experience.company_name.strip():
-            missing.append(f"{prefix}Company name is required")
+            missing.append("Company name is required")
         
         if not experience.start_date.strip():
-            missing.append(f"{prefix}Start date is required")
+            missing.append("Start date is required")
         elif not self._validate_date_format(experience.start_date):
-            missing.append(f"{prefix}Start date must be in MM/YYYY format")
+            missing.append("Start date must be in MM/YYYY format")
         
         if experience.end_date and experience.end_date != "Present":
             if not self._validate_date_format(experience.end_date):
-                missing.append(f"{prefix}End date must be in MM/YYYY format or 'Present'")
+                missing.append("End date must be in MM/YYYY format or 'Present'")
         
         if not experience.job_description or len(experience.job_description) < 2:
-            missing.append(f"{prefix}At least 2 job description bullet points are required")
+            missing.append("At least 2 job description bullet points are required")
         
-        return missing
+        return missing, self._suggest_experience_improvements(experience)
     
-    def _suggest_experience_improvements(self, experience, index: int) -> List[str]:
+    def _suggest_experience_improvements(self, experience) -> List[str]:
         """Suggest improvements for work experience."""
         suggestions = []
-        prefix = f"Experience {index + 1}: "
         
         # Check for action verbs
         weak_descriptions = []
         for i, desc in enumerate(experience.job_description):
-            first_word = desc.strip().split()[0].lower() if desc.strip() else ""
-            if first_word not in self.action_verbs:
+            if not starts_with_action_verb(desc):
                 weak_descriptions.append(i + 1)
         
         if weak_descriptions:
             suggestions.append(
-                f"{prefix}Consider starting bullet points {weak_descriptions} with action verbs like: "
+                f"Consider starting bullet points {weak_descriptions} with action verbs like: "
                 f"{', '.join(self.action_verbs[:5])}, etc."
             )
         
         # Check for quantifiable achievements
-        has_numbers = any(re.search(r'\d+', desc) for desc in experience.job_description)
+        has_numbers = any(has_number(desc) for desc in experience.job_description)
         if not has_numbers:
             suggestions.append(
-                f"{prefix}Try to include quantifiable achievements (numbers, percentages, etc.)"
+                "Try to include quantifiable achievements (numbers, percentages, etc.)"
             )
         
         return suggestions
@@ -188,8 +214,7 @@ class CVValidationService:
         if not date_str or date_str == "Present":
             return True
         
-        pattern = r'^\d{2}/\d{4}$'
-        return bool(re.match(pattern, date_str))
+        return is_valid_date(date_str)
     
     def improve_description(self, description: str) -> str:
         """Suggest improvements for job descriptions."""
@@ -200,8 +225,7 @@ class CVValidationService:
             return '\n'.join(bullet_points)
         
         # Suggest action verb if not present
-        first_word = description.strip().split()[0].lower() if description.strip() else ""
-        if first_word not in self.action_verbs:
+        if not starts_with_action_verb(description):
             suggested_verb = self.action_verbs[0]  # Default suggestion
             return f"Consider starting with an action verb like '{suggested_verb}': {description}"
         
@@ -0,0 +1,206 @@
+"""
+Email templates, loaded and compiled once at import.
+
+Each template is split into literal segments and placeholder names, so
+rendering a message is a single join. The plaintext alternative is derived
+from the HTML at compile time, and the MIME structure around both parts is
+fixed, so messages are serialized directly to bytes.
+"""
+import base64
+import html
+import re
+import secrets
+import string
+from email.header import Header
+from email.utils import formataddr, parseaddr
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+TEMPLATE_DIR = Path(__file__).resolve().parent.parent / "templates" / "email"
+
+# Tags that end a line of text in the plaintext version
+_BLOCK_TAGS = {'p', 'div', 'br', 'h1', 'h2', 'h3', 'tr', 'table', 'li'}
+
+
+class CompiledTemplate:
+    """A template pre-split into (literal, placeholder) segments."""
+
+    def __init__(self, source: str):
+        self.segments: List[Tuple[str, Optional[str]]] = [
+            (literal, field) for literal, field, _, _ in string.Formatter().parse(source)
+        ]
+        self.fields = frozenset(field for _, field in self.segments if field)
+
+    def render(
+        self,
+        values: Dict[str, str],
+        escape: Callable[[str], str] = str,
+        raw: Iterable[str] = ()
+    ) -> str:
+        """Substitute values; fields listed in raw are inserted unescaped."""
+        parts = []
+        for literal, field in self.segments:
+            parts.append(literal)
+            if field is not None:
+                value = str(values[field])
+                parts.append(value if field in raw else escape(value))
+        return ''.join(parts)
+
+
+class _TextExtractor(HTMLParser):
+    """Turn template HTML into plaintext, keeping {placeholders} intact."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts: List[str] = []
+        self._link: Optional[Tuple[int, str]] = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _BLOCK_TAGS:
+            self.parts.append('\n')
+        elif tag == 'a' and dict(attrs).get('href'):
+            self._link = (len(self.parts), dict(attrs)['href'])
+
+    def handle_endtag(self, tag):
+        if tag in _BLOCK_TAGS:
+            self.parts.append('\n')
+        elif tag == 'a' and self._link:
+            start, href = self._link
+            label = ''.join(self.parts[start:]).strip()
+            # Keep the link target, unless the link text already is the target
+            self.parts[start:] = [href if label in ('', href) else f"{label}: {href}"]
+            self._link = None
+
+    def handle_data(self, data):
+        # Whitespace in HTML text collapses; only block tags break lines
+        self.parts.append(re.sub(r'\s+', ' ', data))
+
+
+def html_to_text(source: str) -> str:
+    """Plaintext rendering of an HTML template (placeholders are preserved)."""
+    extractor = _TextExtractor()
+    extractor.feed(source)
+    extractor.close()
+    lines = [line.strip() for line in ''.join(extractor.parts).split('\n')]
+    text = '\n'.join(lines)
+    return re.sub(r'\n{3,}', '\n\n', text).strip() + '\n'
+
+
+_TEXT_PART_HEADERS = (
+    b'Content-Type: text/plain; charset="utf-8"\r\n'
+    b'MIME-Version: 1.0\r\n'
+    b'Content-Transfer-Encoding: base64\r\n\r\n'
+)
+_HTML_PART_HEADERS = (
+    b'Content-Type: text/html; charset="utf-8"\r\n'
+    b'MIME-Version: 1.0\r\n'
+    b'Content-Transfer-Encoding: base64\r\n\r\n'
+)
+
+
+def _refuse_line_breaks(value: str):
+    if '\r' in value or '\n' in value:
+        raise ValueError("Header values may not contain line breaks")
+
+
+def _header_value(value: str) -> str:
+    """Header-safe value: no line breaks, RFC 2047 encoded if not ASCII."""
+    _refuse_line_breaks(value)
+    if value.isascii():
+        return value
+    return Header(value, 'utf-8').encode()
+
+
+def _address_value(value: str) -> str:
+    """Header-safe address: only a non-ASCII display name is encoded."""
+    _refuse_line_breaks(value)
+    if value.isascii():
+        return value
+    return formataddr(parseaddr(value), charset='utf-8')
+
+
+def _base64_body(text: str) -> bytes:
+    return base64.encodebytes(text.encode('utf-8')).replace(b'\n', b'\r\n')
+
+
+class RenderedEmail:
+    """A serialized message ready for SMTP sendmail()."""
+
+    def __init__(self, sender: str, recipient: str, subject: str, data: bytes):
+        self.sender = sender
+        self.recipients = [recipient]
+        self.subject = subject
+        self.data = data
+
+    def as_bytes(self) -> bytes:
+        return self.data
+
+
+class TemplateFragment:
+    """HTML template plus its derived plaintext, compiled once."""
+
+    def __init__(self, name: str):
+        source = (TEMPLATE_DIR / f"{name}.html").read_text(encoding='utf-8')
+        self.name = name
+        self.html = CompiledTemplate(source)
+        self.text = CompiledTemplate(html_to_text(source))
+
+    def render(self, blocks: Optional[Dict[str, Tuple[str, str]]] = None, **values) -> Tuple[str, str]:
+        """Return (plaintext, html); HTML values are escaped.
+
+        blocks maps a field to an already rendered (plaintext, html) pair,
+        e.g. joined fragments, which is inserted as-is.
+        """
+        if not blocks:
+            return self.text.render(values), self.html.render(values, html.escape)
+        text_values = dict(values)
+        html_values = dict(values)
+        for field, (text, markup) in blocks.items():
+            text_values[field] = text
+            html_values[field] = markup
+        return (
+            self.text.render(text_values),
+            self.html.render(html_values, html.escape, raw=blocks.keys())
+        )
+
+
+class EmailTemplate(TemplateFragment):
+    """A complete email: subject plus HTML and plaintext bodies."""
+
+    def __init__(self, name: str, subject: str):
+        super().__init__(name)
+        self.subject = subject
+
+    def render_message(
+        self,
+        sender: str,
+        recipient: str,
+        blocks: Optional[Dict[str, Tuple[str, str]]] = None,
+        **values
+    ) -> RenderedEmail:
+        """Render a multipart/alternative message (plaintext first, HTML last)."""
+        text_body, html_body = self.render(blocks, **values)
+        # '-' is not in the base64 alphabet, so the boundary cannot collide with a body
+        boundary = f"=_smartcv-{secrets.token_hex(12)}".encode()
+        headers = (
+            f'Content-Type: multipart/alternative; boundary="{boundary.decode()}"\r\n'
+            f'MIME-Version: 1.0\r\n'
+            f'From: {_address_value(sender)}\r\n'
+            f'To: {_address_value(recipient)}\r\n'
+            f'Subject: {_header_value(self.subject)}\r\n\r\n'
+        ).encode('ascii')
+        data = b''.join((
+            headers,
+            b'--', boundary, b'\r\n', _TEXT_PART_HEADERS, _base64_body(text_body),
+            b'--', boundary, b'\r\n', _HTML_PART_HEADERS, _base64_body(html_body),
+            b'--', boundary, b'--\r\n',
+        ))
+        return RenderedEmail(sender, recipient, self.subject, data)
+
+
+TWO_FACTOR_CODE = EmailTemplate("two_factor_code", "SmartCV - Two-Factor Authentication Code")
+EMAIL_VERIFICATION = EmailTemplate("email_verification", "SmartCV - Verify Your Email Address")
+LOGIN_NOTIFICATION = EmailTemplate("login_notification", "SmartCV - New Login Detected")
+LOGIN_DIGEST = EmailTemplate("login_digest", "SmartCV - New Logins Detected")
+LOGIN_DIGEST_ROW = TemplateFragment("login_digest_row")
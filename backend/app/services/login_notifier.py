@@ -0,0 +1,152 @@
+"""
+Login notification coalescing. The first login of a user is notified at
+once and opens a window; logins during the window are buffered and sent
+when it closes, a single one as the usual notification, several as one
+digest email. While logins keep arriving each window is followed by
+another, so a burst costs one email per window.
+
+Buffers live in the worker process, so each API worker coalesces the logins
+it handles.
+"""
+import asyncio
+from typing import Dict, List, Optional
+
+from app.core.config import settings, celery_enabled
+from app.services.email_service import email_service
+from app.services.mail_dispatcher import mail_dispatcher
+
+# Celery is optional; celery_enabled() is False without it
+try:
+    from app.tasks.email_tasks import send_login_notification_task, send_login_digest_task
+except ImportError:
+    pass
+
+
+class _PendingLogins:
+    """Logins buffered for one user until the window closes."""
+
+    def __init__(self, user_id: int, email: str, user_name: str):
+        self.user_id = user_id
+        self.email = email
+        self.user_name = user_name
+        self.logins: List[dict] = []
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+
+class LoginNotificationCoalescer:
+    """Notifies the first login at once and coalesces the ones that follow
+    within the window into one email."""
+
+    def __init__(self, window: float):
+        self.window = window
+        self._pending: Dict[int, _PendingLogins] = {}
+
+        self.events = 0
+        self.coalesced = 0
+        self.single = 0
+        self.digests = 0
+
+    def record(self, user, login_info: dict):
+        """Notify a login, or buffer it if the user's window is open.
+
+        Must be called from the event loop thread.
+        """
+        self.events += 1
+        pending = self._pending.get(user.id)
+        if pending is not None:
+            self.coalesced += 1
+            pending.logins.append(login_info)
+            return
+
+        # Copy what the email needs: the ORM object may be expired by then
+        pending = _PendingLogins(user.id, user.email, user.full_name)
+        self._send(pending, [login_info])
+        if self.window > 0:
+            self._pending[user.id] = pending
+            self._open_window(pending)
+
+    def _open_window(self, pending: _PendingLogins):
+        pending.timer = asyncio.get_running_loop().call_later(
+            self.window, self._close_window, pending.user_id
+        )
+
+    def _close_window(self, user_id: int):
+        pending = self._pending.get(user_id)
+        if pending is None:
+            return
+        if not pending.logins:
+            del self._pending[user_id]
+            return
+        logins, pending.logins = pending.logins, []
+        self._send(pending, logins)
+        # Still active: keep coalescing rather than notifying the next login at once
+        self._open_window(pending)
+
+    def _flush(self, user_id: int):
+        pending = self._pending.pop(user_id, None)
+        if pending is None:
+            return
+        if pending.timer is not None:
+            pending.timer.cancel()
+        if pending.logins:
+            self._send(pending, pending.logins)
+
+    def _send(self, pending: _PendingLogins, logins: List[dict]):
+        try:
+            self._deliver(pending, logins)
+        except Exception as e:
+            print(f"Failed to send login notification: {str(e)}")
+
+    def _deliver(self, pending: _PendingLogins, logins: List[dict]):
+        use_celery = celery_enabled()
+        if len(logins) == 1:
+            self.single += 1
+            if use_celery:
+                send_login_notification_task.delay(pending.user_id, logins[0])
+            else:
+                mail_dispatcher.enqueue(
+                    email_service.build_login_notification_message(
+                        email=pending.email,
+                        user_name=pending.user_name,
+                        login_info=logins[0]
+                    ),
+                    "login notification"
+                )
+            return
+
+        self.digests += 1
+        if use_celery:
+            send_login_digest_task.delay(pending.user_id, logins)
+        else:
+            mail_dispatcher.enqueue(
+                email_service.build_login_digest_message(
+                    email=pending.email,
+                    user_name=pending.user_name,
+                    logins=logins
+                ),
+                "login digest"
+            )
+
+    def flush_all(self):
+        """Send everything still buffered (used at shutdown)."""
+        for user_id in list(self._pending):
+            self._flush(user_id)
+
+    def stats(self) -> dict:
+        return {
+            "window_seconds": self.window,
+            "events": self.events,
+            "coalesced": self.coalesced,
+            "single_notifications": self.single,
+            "digests": self.digests,
+            "emails_saved": self.events - self.single - self.digests - self.pending_events(),
+            "pending_users": len(self._pending),
+            "pending_events": self.pending_events(),
+        }
+
+    def pending_events(self) -> int:
+        return sum(len(pending.logins) for pending in self._pending.values())
+
+
+# Global instance
+login_notifier = LoginNotificationCoalescer(window=settings.LOGIN_NOTIFICATION_WINDOW_SECONDS)
@@ -0,0 +1,180 @@
+"""
+In-process mail queue used when no Celery broker is configured. Request
+handlers enqueue a built message and return; sender coroutines deliver it.
+"""
+import asyncio
+import time
+from typing import List, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.services.email_service import email_service
+from app.services.email_templates import RenderedEmail
+
+# aiosmtplib is optional; without it senders use the pooled smtplib client in a thread
+try:
+    import aiosmtplib
+    AIOSMTPLIB_AVAILABLE = True
+except ImportError:
+    aiosmtplib = None
+    AIOSMTPLIB_AVAILABLE = False
+
+
+class MailDispatcher:
+    """Bounded asyncio queue drained by a fixed number of sender coroutines."""
+
+    def __init__(self, max_queue: int, senders: int):
+        self.max_queue = max_queue
+        self.senders = senders
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._closing = False
+
+        self.enqueued = 0
+        self.sent = 0
+        self.failed = 0
+        self.dropped = 0
+        self.peak_depth = 0
+        self._dequeued = 0
+        self._total_wait = 0.0
+        self.max_wait = 0.0
+
+    def start(self):
+        """Start the sender coroutines on the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._tasks and self._loop is loop:
+            return
+        if self._tasks:
+            # Senders of a loop that has stopped (the app was restarted in
+            # this process) will never run again; their queue is lost
+            self.dropped += self._queue.qsize()
+        self._loop = loop
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._closing = False
+        self._tasks = [asyncio.create_task(self._sender()) for _ in range(self.senders)]
+
+    def enqueue(self, message: RenderedEmail, description: str) -> bool:
+        """Queue a message without waiting. Returns False if it was dropped.
+
+        Must be called from the event loop thread.
+        """
+        if self._closing:
+            self.dropped += 1
+            print(f"Mail queue is shutting down, dropping {description}")
+            return False
+        if not self._tasks or self._loop is not asyncio.get_running_loop():
+            self.start()
+        try:
+            self._queue.put_nowait((time.monotonic(), message, description))
+        except asyncio.QueueFull:
+            self.dropped += 1
+            print(f"Mail queue full, dropping {description}")
+            return False
+        self.enqueued += 1
+        self.peak_depth = max(self.peak_depth, self._queue.qsize())
+        return True
+
+    def _new_client(self):
+        if not email_service.smtp_user or not email_service.smtp_password:
+            raise Exception("SMTP credentials not configured")
+        return aiosmtplib.SMTP(
+            hostname=email_service.smtp_host,
+            port=email_service.smtp_port,
+            username=email_service.smtp_user,
+            password=email_service.smtp_password,
+            start_tls=settings.SMTP_USE_TLS,
+            timeout=settings.SMTP_TIMEOUT_SECONDS
+        )
+
+    async def _deliver(self, client, last_used: float, message):
+        """Send over this sender's connection, reconnecting when needed.
+
+        Returns the connection to keep for the next message.
+        """
+        if client is not None and time.monotonic() - last_used > settings.SMTP_POOL_IDLE_TIMEOUT:
+            client.close()
+            client = None
+
+        for attempt in range(2):
+            if client is None or not client.is_connected:
+                client = self._new_client()
+                await client.connect()
+            try:
+                await client.sendmail(message.sender, message.recipients, message.data)
+                return client
+            except aiosmtplib.SMTPServerDisconnected:
+                # Server dropped the idle connection: reconnect once
+                client = None
+                if attempt:
+                    raise
+
+    async def _sender(self):
+        client = None
+        last_used = 0.0
+        try:
+            while True:
+                queued_at, message, description = await self._queue.get()
+                wait = time.monotonic() - queued_at
+                self._dequeued += 1
+                self._total_wait += wait
+                self.max_wait = max(self.max_wait, wait)
+                try:
+                    if AIOSMTPLIB_AVAILABLE:
+                        client = await self._deliver(client, last_used, message)
+                        last_used = time.monotonic()
+                    else:
+                        await run_in_threadpool(email_service.pool.send_message, message)
+                    self.sent += 1
+                except Exception as e:
+                    self.failed += 1
+                    if client is not None:
+                        client.close()
+                        client = None
+                    print(f"Failed to send {description}: {str(e)}")
+                finally:
+                    self._queue.task_done()
+        finally:
+            if client is not None:
+                client.close()
+
+    async def drain(self, timeout: float):
+        """Stop accepting mail, deliver what is queued (up to timeout) and stop."""
+        if not self._tasks:
+            return
+        if self._loop is not asyncio.get_running_loop():
+            self._tasks = []
+            return
+        self._closing = True
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            print(f"Mail queue drain timed out, {self._queue.qsize()} messages not sent")
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def stats(self) -> dict:
+        """Queue depth and delivery counters."""
+        return {
+            "senders": self.senders,
+            "max_queue": self.max_queue,
+            "depth": self._queue.qsize() if self._queue is not None else 0,
+            "peak_depth": self.peak_depth,
+            "enqueued": self.enqueued,
+            "sent": self.sent,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "avg_wait_ms": round(self._total_wait / self._dequeued * 1000, 3) if self._dequeued else 0.0,
+            "max_wait_ms": round(self.max_wait * 1000, 3),
+            "client": "aiosmtplib" if AIOSMTPLIB_AVAILABLE else "smtplib",
+        }
+
+
+# Global instance
+mail_dispatcher = MailDispatcher(
+    max_queue=settings.MAIL_QUEUE_MAX_SIZE,
+    senders=settings.MAIL_SENDERS
+)
@@ -0,0 +1,114 @@
+"""
+Content-addressed disk cache for rendered CV PDFs.
+"""
+import hashlib
+import json
+import os
+import threading
+import uuid
+from typing import Optional
+
+from app.core.config import settings
+
+# Bump when the PDF layout changes so old renders and ETags are not reused
+RENDERER_VERSION = "2"
+
+# CV attributes that affect the rendered PDF
+RENDERED_FIELDS = (
+    'personal_info', 'education', 'experience', 'skills', 'projects',
+    'certifications', 'languages', 'achievements', 'references',
+    'template_id', 'color_scheme'
+)
+
+
+def cv_content_hash(cv) -> str:
+    """Hash the rendered content of a CV (ORM row or any object with the same attributes)."""
+    content = {field: getattr(cv, field, None) for field in RENDERED_FIELDS}
+    content['_renderer'] = RENDERER_VERSION
+    payload = json.dumps(content, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class PDFRenderCache:
+    """Size-bounded directory of PDFs named by content hash, evicted LRU by mtime."""
+
+    def __init__(self, cache_dir: str, max_bytes: int):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.pdf")
+
+    def temp_path(self) -> str:
+        """A scratch path on the cache filesystem to render into before put_file."""
+        return os.path.join(self.cache_dir, f".tmp_{uuid.uuid4().hex}.pdf")
+
+    def get_path(self, key: str) -> Optional[str]:
+        """Return the cached file for key, marking it as recently used."""
+        path = self.path_for(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def get_bytes(self, key: str) -> Optional[bytes]:
+        """Return the cached PDF bytes for key, if present."""
+        path = self.get_path(key)
+        if path is None:
+            return None
+        try:
+            with open(path, 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            # Evicted between the lookup and the read
+            return None
+
+    def put_file(self, key: str, src_path: str) -> str:
+        """Move a rendered file into the cache and return its cached path."""
+        path = self.path_for(key)
+        os.replace(src_path, path)
+        self._evict()
+        return path
+
+    def put_bytes(self, key: str, data: bytes) -> str:
+        """Store PDF bytes in the cache and return the cached path."""
+        tmp_path = self.temp_path()
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        return self.put_file(key, tmp_path)
+
+    def _evict(self):
+        """Remove least recently used files until the cache fits in max_bytes."""
+        with self._lock:
+            entries = []
+            total = 0
+            with os.scandir(self.cache_dir) as it:
+                for entry in it:
+                    if not entry.name.endswith('.pdf') or entry.name.startswith('.tmp_'):
+                        continue
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    total += stat.st_size
+
+            if total <= self.max_bytes:
+                return
+
+            entries.sort()
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                    total -= size
+                except FileNotFoundError:
+                    pass
+
+
+# Global instance
+pdf_render_cache = PDFRenderCache(settings.PDF_CACHE_DIR, settings.PDF_CACHE_MAX_BYTES)
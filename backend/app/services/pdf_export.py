@@ -0,0 +1,104 @@
+"""
+Batch export of CVs as a ZIP archive streamed while the PDFs are rendered.
+"""
+import asyncio
+import io
+import re
+import zipfile
+from typing import AsyncIterator, Dict, List
+
+from app.core.config import settings
+from app.core.process_pool import get_process_pool
+from app.services.pdf_cache import RENDERED_FIELDS
+from app.services.pdf_generator import render_cv_pdf
+
+
+def safe_filename(title: str, fallback: str) -> str:
+    """Reduce a CV title to a filesystem and header safe name."""
+    return re.sub(r'[^A-Za-z0-9._-]+', '_', title or '').strip('_') or fallback
+
+
+def cv_render_data(cv) -> dict:
+    """Picklable dict of the CV columns needed to render it."""
+    data = {field: getattr(cv, field) for field in RENDERED_FIELDS}
+    data['id'] = cv.id
+    data['title'] = cv.title
+    return data
+
+
+class _ZipChunkBuffer(io.RawIOBase):
+    """Write-only, non-seekable sink that hands zipfile output back in chunks."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+async def stream_cv_zip(cvs: List[dict]) -> AsyncIterator[bytes]:
+    """Render CVs on the worker pool and yield a ZIP archive incrementally.
+
+    At most a few renders are in flight at once and each PDF is written to the
+    archive as soon as it completes, so memory use does not grow with the
+    number of CVs.
+    """
+    loop = asyncio.get_running_loop()
+    pool = get_process_pool()
+    window = max(1, settings.CPU_POOL_WORKERS * 2)
+
+    buffer = _ZipChunkBuffer()
+    # PDFs are already compressed, so store them as-is
+    archive = zipfile.ZipFile(buffer, mode='w', compression=zipfile.ZIP_STORED)
+
+    remaining = iter(cvs)
+    in_flight: Dict[asyncio.Future, dict] = {}
+    failures: List[str] = []
+
+    def submit_next() -> bool:
+        cv = next(remaining, None)
+        if cv is None:
+            return False
+        in_flight[loop.run_in_executor(pool, render_cv_pdf, cv)] = cv
+        return True
+
+    try:
+        while len(in_flight) < window and submit_next():
+            pass
+
+        while in_flight:
+            done, _ = await asyncio.wait(in_flight.keys(), return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                cv = in_flight.pop(future)
+                name = f"{safe_filename(cv['title'], 'cv')}_{cv['id']}.pdf"
+                try:
+                    archive.writestr(name, future.result())
+                except Exception as e:
+                    failures.append(f"{name}: {str(e)}")
+                submit_next()
+            chunk = buffer.drain()
+            if chunk:
+                yield chunk
+
+        if failures:
+            archive.writestr("errors.txt", "\n".join(failures) + "\n")
+        archive.close()
+        yield buffer.drain()
+    finally:
+        # Client went away: don't keep rendering for nobody
+        for future in in_flight:
+            future.cancel()
@@ -1,5 +1,4 @@
 import os
-import uuid
 from io import BytesIO
 from reportlab.lib.pagesizes import letter, A4
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
@@ -10,64 +9,193 @@ from reportlab.lib.enums import TA_LEFT, TA_CENTER, TA_RIGHT
 from sqlalchemy.orm import Session
 from app.models.database import SessionLocal
 from app.models.models import CV as CVModel, PDFGeneration
+from app.services.pdf_cache import pdf_render_cache, cv_content_hash
 from datetime import datetime
+from types import MappingProxyType, SimpleNamespace
+from typing import Optional
 import json
 
-class PDFGeneratorService:
-    """Service to generate PDF resumes from CV data using ReportLab."""
+# Primary colours per CV color_scheme
+COLOR_SCHEMES = {
+    'blue': '#2563eb',
+    'green': '#16a34a',
+    'purple': '#9333ea',
+    'red': '#dc2626',
+    'orange': '#ea580c',
+    'teal': '#0d9488'
+}
+DEFAULT_COLOR_SCHEME = 'blue'
+
+# Typography per CV template_id, keyed by the ids the frontend's
+# TemplateSelector stores (1-3 free, 4-8 premium)
+TEMPLATE_LAYOUTS = {
+    # Professional Elite
+    '1': {
+        'font': 'Helvetica',
+        'bold_font': 'Helvetica-Bold',
+        'header_alignment': TA_CENTER,
+        'section_border': 1,
+    },
+    # Creative Master
+    '2': {
+        'font': 'Helvetica',
+        'bold_font': 'Helvetica-Bold',
+        'header_alignment': TA_LEFT,
+        'section_border': 1,
+    },
+    # Minimalist Pro
+    '3': {
+        'font': 'Helvetica',
+        'bold_font': 'Helvetica-Bold',
+        'header_alignment': TA_LEFT,
+        'section_border': 0,
+    },
+    # Executive
+    '4': {
+        'font': 'Times-Roman',
+        'bold_font': 'Times-Bold',
+        'header_alignment': TA_CENTER,
+        'section_border': 1,
+    },
+    # Tech Modern
+    '5': {
+        'font': 'Helvetica',
+        'bold_font': 'Helvetica-Bold',
+        'header_alignment': TA_LEFT,
+        'section_border': 0,
+    },
+    # Designer Pro
+    '6': {
+        'font': 'Helvetica',
+        'bold_font': 'Helvetica-Bold',
+        'header_alignment': TA_CENTER,
+        'section_border': 0,
+    },
+    # Academic
+    '7': {
+        'font': 'Times-Roman',
+        'bold_font': 'Times-Bold',
+        'header_alignment': TA_LEFT,
+        'section_border': 1,
+    },
+    # International
+    '8': {
+        'font': 'Helvetica',
+        'bold_font': 'Helvetica-Bold',
+        'header_alignment': TA_LEFT,
+        'section_border': 1,
+    },
+}
+DEFAULT_TEMPLATE = '1'
+
+# Template names stored by CVs saved before templates were numbered
+LEGACY_TEMPLATE_IDS = {
+    'modern': '1',
+    'classic': '4',
+    'minimal': '3',
+}
+
+
+def _build_styles(layout: dict, primary_color: str) -> MappingProxyType:
+    """Build the paragraph styles for one template/colour combination."""
+    base = getSampleStyleSheet()
+    color = HexColor(primary_color)
     
-    def __init__(self):
-        self.output_dir = "/tmp/uploads"
-        os.makedirs(self.output_dir, exist_ok=True)
-        self.styles = getSampleStyleSheet()
-        self._setup_custom_styles()
+    normal = ParagraphStyle(
+        name='Normal',
+        parent=base['Normal'],
+        fontName=layout['font']
+    )
     
-    def _setup_custom_styles(self):
-        """Setup custom paragraph styles."""
+    styles = {
+        'Normal': normal,
         # Header style
-        self.styles.add(ParagraphStyle(
+        'CustomHeader': ParagraphStyle(
             name='CustomHeader',
-            parent=self.styles['Heading1'],
+            parent=base['Heading1'],
+            fontName=layout['bold_font'],
             fontSize=24,
             spaceAfter=12,
-            alignment=TA_CENTER,
-            textColor=HexColor('#2563eb')
-        ))
-        
+            alignment=layout['header_alignment'],
+            textColor=color
+        ),
         # Section header style
-        self.styles.add(ParagraphStyle(
+        'SectionHeader': ParagraphStyle(
             name='SectionHeader',
-            parent=self.styles['Heading2'],
+            parent=base['Heading2'],
+            fontName=layout['bold_font'],
             fontSize=14,
             spaceBefore=12,
             spaceAfter=6,
-            textColor=HexColor('#2563eb'),
-            borderWidth=1,
+            textColor=color,
+            borderWidth=layout['section_border'],
             borderColor=grey,
             borderPadding=3
-        ))
-        
+        ),
         # Job title style
-        self.styles.add(ParagraphStyle(
+        'JobTitle': ParagraphStyle(
             name='JobTitle',
-            parent=self.styles['Heading3'],
+            parent=base['Heading3'],
+            fontName=layout['bold_font'],
             fontSize=12,
             spaceBefore=6,
             spaceAfter=3,
             textColor=black
-        ))
-        
+        ),
         # Contact info style
-        self.styles.add(ParagraphStyle(
+        'ContactInfo': ParagraphStyle(
             name='ContactInfo',
-            parent=self.styles['Normal'],
+            parent=normal,
             fontSize=10,
-            alignment=TA_CENTER,
+            alignment=layout['header_alignment'],
             spaceAfter=6
-        ))
+        ),
+    }
+    return MappingProxyType(styles)
+
+
+# Every (template_id, color_scheme) combination, built once at import
+STYLE_REGISTRY = MappingProxyType({
+    (template_id, color_scheme): _build_styles(layout, primary_color)
+    for template_id, layout in TEMPLATE_LAYOUTS.items()
+    for color_scheme, primary_color in COLOR_SCHEMES.items()
+})
+
+
+def get_styles(template_id: Optional[str], color_scheme: Optional[str]) -> MappingProxyType:
+    """Look up precomputed styles, falling back to the defaults for unknown values.
+
+    Numeric and legacy named template ids are accepted too.
+    """
+    styles = STYLE_REGISTRY.get((template_id, color_scheme))
+    if styles is None:
+        template_id = str(template_id)
+        template_id = LEGACY_TEMPLATE_IDS.get(template_id, template_id)
+        if template_id not in TEMPLATE_LAYOUTS:
+            template_id = DEFAULT_TEMPLATE
+        if color_scheme not in COLOR_SCHEMES:
+            color_scheme = DEFAULT_COLOR_SCHEME
+        styles = STYLE_REGISTRY[(template_id, color_scheme)]
+    return styles
+
+
+class PDFGeneratorService:
+    """Service to generate PDF resumes from CV data using ReportLab."""
+    
+    def __init__(self):
+        self.output_dir = "/tmp/uploads"
+        os.makedirs(self.output_dir, exist_ok=True)
+        self.styles = get_styles(DEFAULT_TEMPLATE, DEFAULT_COLOR_SCHEME)
     
-    def generate_pdf(self, cv_id: int, user_id: int, task_id: str) -> str:
-        """Generate PDF from CV data."""
+    def generate_pdf(self, cv_id: int, user_id: int, task_id: str,
+                     generation_id: Optional[int] = None,
+                     final_attempt: bool = True) -> str:
+        """Generate PDF from CV data.
+
+        Updates the PDFGeneration row generation_id when given (queued jobs),
+        otherwise records a new one. A failure marks the row failed only on
+        the final attempt; before a retry it goes back to pending.
+        """
         db = SessionLocal()
         
         try:
@@ -76,23 +204,36 @@ class PDFGeneratorService:
             if not cv:
                 raise ValueError(f"CV with id {cv_id} not found")
             
-            # Create PDF generation record
-            pdf_gen = PDFGeneration(
-                cv_id=cv_id,
-                user_id=user_id,
-                status="processing"
-            )
-            db.add(pdf_gen)
-            db.commit()
+            content_hash = cv_content_hash(cv)
             
-            # Generate PDF
-            pdf_filename = f"cv_{cv_id}_{uuid.uuid4().hex[:8]}.pdf"
-            pdf_path = os.path.join(self.output_dir, pdf_filename)
+            # Create or claim the PDF generation record
+            pdf_gen = db.get(PDFGeneration, generation_id) if generation_id else None
+            if pdf_gen is None:
+                pdf_gen = PDFGeneration(
+                    cv_id=cv_id,
+                    user_id=user_id,
+                    task_id=task_id
+                )
+                db.add(pdf_gen)
+            pdf_gen.status = "processing"
+            pdf_gen.content_hash = content_hash
+            db.commit()
             
-            self._create_pdf(cv, pdf_path)
+            # Reuse an identical earlier render if it is still cached
+            pdf_path = pdf_render_cache.get_path(content_hash)
+            if pdf_path:
+                pdf_gen.cache_hit = True
+            else:
+                tmp_path = pdf_render_cache.temp_path()
+                try:
+                    self._create_pdf(cv, tmp_path)
+                    pdf_path = pdf_render_cache.put_file(content_hash, tmp_path)
+                finally:
+                    if os.path.exists(tmp_path):
+                        os.remove(tmp_path)
             
-            # Update CV with PDF URL
-            cv.pdf_url = pdf_path
+            # The cached file can be evicted; downloads resolve the CV by content hash
+            cv.pdf_url = f"/api/cv/{cv_id}/pdf"
             
             # Update generation record
             pdf_gen.status = "completed"
@@ -106,17 +247,26 @@ class PDFGeneratorService:
         except Exception as e:
             # Update generation record with error
             if 'pdf_gen' in locals():
-                pdf_gen.status = "failed"
+                pdf_gen.status = "failed" if final_attempt else "pending"
                 pdf_gen.error_message = str(e)
                 db.commit()
             raise e
         finally:
             db.close()
     
-    def _create_pdf(self, cv: CVModel, pdf_path: str):
-        """Create PDF document using ReportLab."""
+    def render_pdf_bytes(self, cv: CVModel) -> bytes:
+        """Render a CV to PDF bytes in memory, without touching the disk."""
+        buffer = BytesIO()
+        self._create_pdf(cv, buffer)
+        return buffer.getvalue()
+    
+    def _create_pdf(self, cv: CVModel, target):
+        """Create PDF document using ReportLab.
+
+        target is a file path or a writable binary file-like object.
+        """
         doc = SimpleDocTemplate(
-            pdf_path,
+            target,
             pagesize=A4,
             rightMargin=0.75*inch,
             leftMargin=0.75*inch,
@@ -124,6 +274,7 @@ class PDFGeneratorService:
             bottomMargin=0.75*inch
         )
         
+        styles = get_styles(cv.template_id, cv.color_scheme)
         story = []
         
         # Parse JSON data
@@ -135,7 +286,7 @@ class PDFGeneratorService:
         
         # Header - Name
         if personal_info and personal_info.get('full_name'):
-            story.append(Paragraph(personal_info['full_name'], self.styles['CustomHeader']))
+            story.append(Paragraph(personal_info['full_name'], styles['CustomHeader']))
         
         # Contact Information
         contact_parts = []
@@ -148,7 +299,7 @@ class PDFGeneratorService:
                 contact_parts.append(personal_info['address'])
         
         if contact_parts:
-            story.append(Paragraph(' | '.join(contact_parts), self.styles['ContactInfo']))
+            story.append(Paragraph(' | '.join(contact_parts), styles['ContactInfo']))
         
         # Links
         link_parts = []
@@ -161,19 +312,19 @@ class PDFGeneratorService:
                 link_parts.append(f"Portfolio: {personal_info['portfolio']}")
         
         if link_parts:
-            story.append(Paragraph(' | '.join(link_parts), self.styles['ContactInfo']))
+            story.append(Paragraph(' | '.join(link_parts), styles['ContactInfo']))
         
         story.append(Spacer(1, 12))
         
         # Profile Summary
         if personal_info and personal_info.get('profile_summary'):
-            story.append(Paragraph('Profile Summary', self.styles['SectionHeader']))
-            story.append(Paragraph(personal_info['profile_summary'], self.styles['Normal']))
+            story.append(Paragraph('Profile Summary', styles['SectionHeader']))
+            story.append(Paragraph(personal_info['profile_summary'], styles['Normal']))
             story.append(Spacer(1, 12))
         
         # Work Experience
         if experience and len(experience) > 0:
-            story.append(Paragraph('Work Experience', self.styles['SectionHeader']))
+            story.append(Paragraph('Work Experience', styles['SectionHeader']))
             
             for exp in experience:
                 if exp.get('job_title') and exp.get('company_name'):
@@ -184,25 +335,25 @@ class PDFGeneratorService:
                     elif exp.get('start_date'):
                         job_header += f" ({exp['start_date']} - Present)"
                     
-                    story.append(Paragraph(job_header, self.styles['JobTitle']))
+                    story.append(Paragraph(job_header, styles['JobTitle']))
                     
                     # Location
                     if exp.get('location'):
-                        story.append(Paragraph(f"<i>{exp['location']}</i>", self.styles['Normal']))
+                        story.append(Paragraph(f"<i>{exp['location']}</i>", styles['Normal']))
                     
                     # Job description
                     if exp.get('job_description'):
                         if isinstance(exp['job_description'], list):
                             for desc in exp['job_description']:
-                                story.append(Paragraph(f"• {desc}", self.styles['Normal']))
+                                story.append(Paragraph(f"• {desc}", styles['Normal']))
                         else:
-                            story.append(Paragraph(f"• {exp['job_description']}", self.styles['Normal']))
+                            story.append(Paragraph(f"• {exp['job_description']}", styles['Normal']))
                     
                     story.append(Spacer(1, 6))
         
         # Education
         if education and len(education) > 0:
-            story.append(Paragraph('Education', self.styles['SectionHeader']))
+            story.append(Paragraph('Education', styles['SectionHeader']))
             
             for edu in education:
                 if edu.get('degree') and edu.get('school_name'):
@@ -216,16 +367,16 @@ class PDFGeneratorService:
                     elif edu.get('start_date'):
                         edu_text += f" ({edu['start_date']} - Present)"
                     
-                    story.append(Paragraph(edu_text, self.styles['Normal']))
+                    story.append(Paragraph(edu_text, styles['Normal']))
                     
                     if edu.get('grade'):
-                        story.append(Paragraph(f"Grade: {edu['grade']}", self.styles['Normal']))
+                        story.append(Paragraph(f"Grade: {edu['grade']}", styles['Normal']))
                     
                     story.append(Spacer(1, 6))
         
         # Skills
         if skills and len(skills) > 0:
-            story.append(Paragraph('Skills', self.styles['SectionHeader']))
+            story.append(Paragraph('Skills', styles['SectionHeader']))
             
             skill_text = ""
             for skill in skills:
@@ -237,29 +388,29 @@ class PDFGeneratorService:
                         skill_text += f" ({skill['proficiency_level']})"
             
             if skill_text:
-                story.append(Paragraph(skill_text, self.styles['Normal']))
+                story.append(Paragraph(skill_text, styles['Normal']))
                 story.append(Spacer(1, 6))
         
         # Projects
         if projects and len(projects) > 0:
-            story.append(Paragraph('Projects', self.styles['SectionHeader']))
+            story.append(Paragraph('Projects', styles['SectionHeader']))
             
             for project in projects:
                 if project.get('project_title'):
-                    story.append(Paragraph(f"<b>{project['project_title']}</b>", self.styles['JobTitle']))
+                    story.append(Paragraph(f"<b>{project['project_title']}</b>", styles['JobTitle']))
                     
                     if project.get('description'):
-                        story.append(Paragraph(project['description'], self.styles['Normal']))
+                        story.append(Paragraph(project['description'], styles['Normal']))
                     
                     if project.get('technologies_used'):
                         if isinstance(project['technologies_used'], list):
                             tech_text = f"<b>Technologies:</b> {', '.join(project['technologies_used'])}"
                         else:
                             tech_text = f"<b>Technologies:</b> {project['technologies_used']}"
-                        story.append(Paragraph(tech_text, self.styles['Normal']))
+                        story.append(Paragraph(tech_text, styles['Normal']))
                     
                     if project.get('link'):
-                        story.append(Paragraph(f"<b>Link:</b> {project['link']}", self.styles['Normal']))
+                        story.append(Paragraph(f"<b>Link:</b> {project['link']}", styles['Normal']))
                     
                     story.append(Spacer(1, 6))
         
@@ -268,19 +419,19 @@ class PDFGeneratorService:
     
     def _get_primary_color(self, color_scheme: str) -> str:
         """Get primary color based on color scheme."""
-        colors = {
-            'blue': '#2563eb',
-            'green': '#16a34a',
-            'purple': '#9333ea',
-            'red': '#dc2626',
-            'orange': '#ea580c',
-            'teal': '#0d9488'
-        }
-        return colors.get(color_scheme, '#2563eb')
+        return COLOR_SCHEMES.get(color_scheme, COLOR_SCHEMES[DEFAULT_COLOR_SCHEME])
 
 # Global instance
 pdf_generator = PDFGeneratorService()
 
+def render_cv_pdf(cv_data: dict) -> bytes:
+    """Render plain CV data to PDF bytes.
+
+    Takes a dict of CV columns rather than an ORM row so it can be sent to
+    worker processes.
+    """
+    return pdf_generator.render_pdf_bytes(SimpleNamespace(**cv_data))
+
 def generate_pdf_task(cv_id: int, user_id: int, task_id: str):
     """Background task to generate PDF."""
     try:
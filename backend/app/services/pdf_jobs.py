@@ -0,0 +1,63 @@
+"""
+PDF generation jobs: queued on Celery when a broker is configured, otherwise
+run on the shared in-process worker pool. Either way the API worker never
+renders inline.
+"""
+from app.core.config import celery_enabled
+from app.core.process_pool import get_process_pool
+from app.models.database import SessionLocal
+from app.models.models import PDFGeneration
+
+# Celery is optional; without it jobs always use the fallback pool
+try:
+    from app.core.celery_app import celery_app
+except ImportError:
+    celery_app = None
+
+
+def run_pdf_generation(generation_id: int, final_attempt: bool = True) -> str:
+    """Render the PDF for a PDFGeneration row and return the file path.
+
+    final_attempt is False while the caller will still retry a failure.
+    """
+    from app.services.pdf_generator import pdf_generator
+
+    db = SessionLocal()
+    try:
+        pdf_gen = db.get(PDFGeneration, generation_id)
+        if pdf_gen is None:
+            raise ValueError(f"PDF generation {generation_id} not found")
+        cv_id, user_id, task_id = pdf_gen.cv_id, pdf_gen.user_id, pdf_gen.task_id
+    finally:
+        db.close()
+
+    return pdf_generator.generate_pdf(
+        cv_id, user_id, task_id, generation_id=generation_id, final_attempt=final_attempt
+    )
+
+
+def _log_fallback_result(future):
+    exc = future.exception()
+    if exc is not None:
+        print(f"PDF generation failed: {str(exc)}")
+
+
+def enqueue_pdf_generation(generation_id: int, task_id: str):
+    """Queue a PDF job for an already committed PDFGeneration row."""
+    if celery_enabled():
+        from app.tasks.pdf_tasks import generate_cv_pdf
+        generate_cv_pdf.apply_async(
+            args=[generation_id],
+            task_id=task_id,
+            queue="pdf_generation"
+        )
+    else:
+        future = get_process_pool().submit(run_pdf_generation, generation_id)
+        future.add_done_callback(_log_fallback_result)
+
+
+def get_task_state(task_id: str) -> str:
+    """Celery state for a task id, or "UNKNOWN" when Celery is not in use."""
+    if not celery_enabled():
+        return "UNKNOWN"
+    return celery_app.AsyncResult(task_id).state
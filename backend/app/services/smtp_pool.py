@@ -0,0 +1,177 @@
+"""
+Pool of authenticated SMTP connections shared by everything that sends mail
+in a process (API fallbacks and Celery email tasks).
+"""
+import os
+import smtplib
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, List, Tuple
+
+
+def _should_reconnect(error: Exception) -> bool:
+    """Whether a send failed because of the connection rather than the message."""
+    if isinstance(error, smtplib.SMTPServerDisconnected):
+        return True
+    if isinstance(error, smtplib.SMTPResponseException):
+        return error.smtp_code == 421  # Service closing transmission channel
+    # SMTPException subclasses OSError; other OSErrors are socket failures
+    return isinstance(error, OSError) and not isinstance(error, smtplib.SMTPException)
+
+
+def _send(server: smtplib.SMTP, msg):
+    if hasattr(msg, 'data'):
+        server.sendmail(msg.sender, msg.recipients, msg.data)
+    else:
+        server.send_message(msg)
+
+
+class SMTPPoolTimeout(Exception):
+    """No SMTP connection became free in time."""
+
+
+class SMTPConnectionPool:
+    """Reuses logged-in SMTP connections instead of connecting per message.
+
+    Idle connections are closed after idle_timeout seconds and checked with
+    NOOP before reuse once they have been idle for healthcheck_after seconds.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], smtplib.SMTP],
+        size: int = 4,
+        idle_timeout: float = 60,
+        healthcheck_after: float = 5,
+        acquire_timeout: float = 30
+    ):
+        self._connect = connect
+        self.size = size
+        self.idle_timeout = idle_timeout
+        self.healthcheck_after = healthcheck_after
+        self.acquire_timeout = acquire_timeout
+
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._idle: List[Tuple[smtplib.SMTP, float]] = []
+        self._pid = os.getpid()
+
+        self.created = 0
+        self.reused = 0
+        self.discarded = 0
+        self.in_use = 0
+
+    def _check_fork(self):
+        # A forked worker (e.g. Celery prefork) must not share the parent's sockets
+        if self._pid != os.getpid():
+            with self._lock:
+                self._idle = []
+                self._slots = threading.BoundedSemaphore(self.size)
+                self.in_use = 0
+                self._pid = os.getpid()
+
+    @staticmethod
+    def _close(server: smtplib.SMTP):
+        try:
+            server.quit()
+        except Exception:
+            try:
+                server.close()
+            except Exception:
+                pass
+
+    def _is_alive(self, server: smtplib.SMTP) -> bool:
+        try:
+            code, _ = server.noop()
+            return code == 250
+        except Exception:
+            return False
+
+    def _checkout(self) -> smtplib.SMTP:
+        now = time.monotonic()
+        while True:
+            with self._lock:
+                if not self._idle:
+                    break
+                server, last_used = self._idle.pop()
+            idle_for = now - last_used
+            if idle_for > self.idle_timeout or (
+                idle_for > self.healthcheck_after and not self._is_alive(server)
+            ):
+                self._discard(server)
+                continue
+            with self._lock:
+                self.reused += 1
+                self.in_use += 1
+            return server
+
+        server = self._connect()
+        with self._lock:
+            self.created += 1
+            self.in_use += 1
+        return server
+
+    def _checkin(self, server: smtplib.SMTP):
+        with self._lock:
+            self.in_use -= 1
+            self._idle.append((server, time.monotonic()))
+
+    def _discard(self, server: smtplib.SMTP, borrowed: bool = False):
+        self._close(server)
+        with self._lock:
+            self.discarded += 1
+            if borrowed:
+                self.in_use -= 1
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection; it is discarded if the block raises."""
+        self._check_fork()
+        slots = self._slots
+        if not slots.acquire(timeout=self.acquire_timeout):
+            raise SMTPPoolTimeout("Timed out waiting for an SMTP connection")
+        try:
+            server = self._checkout()
+            try:
+                yield server
+            except BaseException:
+                self._discard(server, borrowed=True)
+                raise
+            self._checkin(server)
+        finally:
+            slots.release()
+
+    def send_message(self, msg) -> None:
+        """Send a message, reconnecting and retrying once on a dead connection.
+
+        Accepts an email.message.Message or a pre-serialized message with
+        sender, recipients and data attributes.
+        """
+        try:
+            with self.connection() as server:
+                _send(server, msg)
+        except Exception as e:
+            if not _should_reconnect(e):
+                raise
+            with self.connection() as server:
+                _send(server, msg)
+
+    def close_all(self):
+        """Close the idle connections."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for server, _ in idle:
+            self._close(server)
+
+    def stats(self) -> dict:
+        with self._lock:
+            idle = len(self._idle)
+        return {
+            "size": self.size,
+            "idle": idle,
+            "in_use": self.in_use,
+            "created": self.created,
+            "reused": self.reused,
+            "discarded": self.discarded,
+        }
@@ -0,0 +1,187 @@
+"""
+Cache of AI suggestion pools, keyed on normalized request fields.
+
+Suggestions are stored with the user-specific parts (company, name) replaced
+by placeholders, so one pool serves everyone asking for the same kind of
+role. A pool is filled from several LLM calls before it is served, and each
+hit returns a random sample of it, so users do not all get identical text.
+
+Backed by Redis when REDIS_URL is set (shared by all workers; configure
+Redis with an LRU maxmemory-policy), otherwise by an in-process TTL/LRU cache.
+"""
+import hashlib
+import json
+import random
+import re
+import time
+from typing import Dict, List, Optional
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.services.suggestion_engine import fill_placeholders, normalize_title, role_family
+
+# redis is optional; without it each worker keeps its own pools
+try:
+    import redis.asyncio as redis_asyncio
+    REDIS_AVAILABLE = True
+except ImportError:
+    redis_asyncio = None
+    REDIS_AVAILABLE = False
+
+# After a Redis error the cache is skipped (all misses) for this long
+REDIS_RETRY_AFTER_SECONDS = 30
+
+# Words of a name or company that identify nobody, so may stay in pooled text
+GENERIC_VALUE_WORDS = {
+    "a", "an", "and", "at", "co", "company", "corp", "corporation", "group",
+    "inc", "limited", "llc", "ltd", "of", "plc", "the",
+}
+
+_WORD = re.compile(r'[a-z0-9]+')
+
+
+def job_description_key(job_title: str, context: str) -> tuple:
+    return ("job_description", normalize_title(job_title), role_family(job_title), context.lower())
+
+
+def summary_key(context: str) -> tuple:
+    return ("summary", context.lower())
+
+
+def _to_template(text: str, values: Dict[str, str]) -> str:
+    """Replace user-specific values with {placeholders}."""
+    for name, value in values.items():
+        if value and value.strip():
+            text = re.sub(re.escape(value.strip()), '{' + name + '}', text, flags=re.IGNORECASE)
+    return text
+
+
+def _is_shareable(template: str, values: Dict[str, str]) -> bool:
+    """False if any word of a user-specific value survived templating
+    (e.g. "Alice" from "Alice Smith", "Acme" from "Acme Corp")."""
+    words = set(_WORD.findall(template.lower()))
+    for value in values.values():
+        for word in _WORD.findall((value or '').lower()):
+            if word not in GENERIC_VALUE_WORDS and word in words:
+                return False
+    return True
+
+
+class SuggestionCache:
+    """Pools of placeholder suggestions with hit/miss accounting."""
+
+    def __init__(
+        self,
+        redis_url: Optional[str],
+        ttl: float,
+        maxsize: int,
+        min_pool: int,
+        max_pool: int
+    ):
+        self.ttl = ttl
+        self.min_pool = min_pool
+        self.max_pool = max_pool
+        self._memory = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._redis = None
+        self._redis_down_until = 0.0
+        if redis_url and REDIS_AVAILABLE:
+            self._redis = redis_asyncio.from_url(redis_url)
+
+        self.hits = 0
+        self.misses = 0
+        self.fills = 0
+        self.withheld = 0
+        self.errors = 0
+
+    @staticmethod
+    def _redis_key(key: tuple) -> str:
+        digest = hashlib.sha1(json.dumps(key).encode('utf-8')).hexdigest()
+        return f"smartcv:suggestions:{digest}"
+
+    def _redis_error(self, action: str, error: Exception):
+        self.errors += 1
+        self._redis_down_until = time.monotonic() + REDIS_RETRY_AFTER_SECONDS
+        print(f"Suggestion cache {action} failed, skipping Redis for {REDIS_RETRY_AFTER_SECONDS}s: {str(error)}")
+
+    async def _get_pool(self, key: tuple) -> List[str]:
+        if self._redis is None:
+            return self._memory.get(key) or []
+        if time.monotonic() < self._redis_down_until:
+            return []
+        try:
+            raw = await self._redis.get(self._redis_key(key))
+        except Exception as e:
+            self._redis_error("read", e)
+            return []
+        return json.loads(raw) if raw else []
+
+    async def _set_pool(self, key: tuple, pool: List[str]):
+        if self._redis is None:
+            self._memory.set(key, pool)
+            return
+        if time.monotonic() < self._redis_down_until:
+            return
+        try:
+            await self._redis.set(self._redis_key(key), json.dumps(pool), ex=int(self.ttl))
+        except Exception as e:
+            self._redis_error("write", e)
+
+    async def sample(self, key: tuple, count: int, values: Dict[str, str]) -> Optional[List[str]]:
+        """Return count random suggestions from a full pool, or None (a miss)
+        while the pool is still being filled."""
+        pool = await self._get_pool(key)
+        if len(pool) < self.min_pool:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return [fill_placeholders(text, values) for text in random.sample(pool, min(count, len(pool)))]
+
+    async def add(self, key: tuple, suggestions: List[str], values: Dict[str, str]):
+        """Add fresh LLM suggestions to the pool for key.
+
+        Suggestions that still mention part of the user's name or company
+        after templating are not pooled, as the pool is served to everyone.
+        """
+        pool = await self._get_pool(key)
+        seen = {text.lower() for text in pool}
+        for text in suggestions:
+            template = _to_template(text, values)
+            if not _is_shareable(template, values):
+                self.withheld += 1
+                continue
+            if template.lower() not in seen:
+                seen.add(template.lower())
+                pool.append(template)
+        self.fills += 1
+        await self._set_pool(key, pool[-self.max_pool:])
+
+    async def close(self):
+        if self._redis is not None:
+            await self._redis.aclose()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        stats = {
+            "backend": "redis" if self._redis is not None else "memory",
+            "hits": self.hits,
+            "misses": self.misses,
+            "fills": self.fills,
+            "withheld": self.withheld,
+            "errors": self.errors,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "min_pool": self.min_pool,
+            "max_pool": self.max_pool,
+        }
+        if self._redis is None:
+            stats["pools"] = len(self._memory)
+        return stats
+
+
+# Global instance
+suggestion_cache = SuggestionCache(
+    redis_url=settings.REDIS_URL,
+    ttl=settings.SUGGESTION_CACHE_TTL_SECONDS,
+    maxsize=settings.SUGGESTION_CACHE_MAX_SIZE,
+    min_pool=settings.SUGGESTION_POOL_MIN_SIZE,
+    max_pool=settings.SUGGESTION_POOL_MAX_SIZE
+)
@@ -0,0 +1,186 @@
+"""
+Offline CV suggestions from a packaged corpus, served when OpenAI is not
+configured or a call fails.
+
+app/data/suggestion_corpus.json holds bullet templates per role family and
+seniority, and summary templates per family. Job titles are classified with
+word tries built from the corpus keywords; when several keywords match, the
+family listed first in the corpus wins (so "Sales Manager" is sales, not
+manager). The corpus and tries are loaded once, on first use.
+
+Sampling is seeded from the request, so the same job title and company
+always get the same suggestions.
+"""
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+CORPUS_PATH = Path(__file__).resolve().parent.parent / "data" / "suggestion_corpus.json"
+
+SENIORITY_LEVELS = ("entry", "mid", "senior", "lead")
+DEFAULT_SENIORITY = "mid"
+# Family for titles no keyword matches; its templates also top up short pools
+FALLBACK_FAMILY = "other"
+
+_NON_WORD = re.compile(r'[^a-z0-9+#]+')
+# Trie key marking the end of a phrase (words are never empty)
+_END = ""
+
+
+def normalize_title(title: str) -> str:
+    """Lower-case, punctuation-free, single-spaced job title."""
+    return _NON_WORD.sub(' ', title.lower()).strip()
+
+
+def fill_placeholders(text: str, values: Dict[str, str]) -> str:
+    """Replace {placeholders} with values."""
+    for name, value in values.items():
+        text = text.replace('{' + name + '}', value)
+    return text
+
+
+class PhraseIndex:
+    """Trie over words mapping keyword phrases to labels. A lookup returns
+    the label of the highest-priority phrase found anywhere in the text."""
+
+    def __init__(self):
+        self._root: dict = {}
+        self.phrases = 0
+
+    def add(self, phrase: str, priority: int, label: str):
+        node = self._root
+        for word in normalize_title(phrase).split():
+            node = node.setdefault(word, {})
+        # A phrase listed twice keeps its first (highest-priority) label
+        if _END not in node:
+            node[_END] = (priority, label)
+            self.phrases += 1
+
+    def find(self, words: Sequence[str]) -> Optional[str]:
+        best = None
+        for start in range(len(words)):
+            node = self._root
+            for position in range(start, len(words)):
+                node = node.get(words[position])
+                if node is None:
+                    break
+                match = node.get(_END)
+                if match is not None and (best is None or match < best):
+                    best = match
+        return best[1] if best else None
+
+
+class SuggestionEngine:
+    """Seeded job description and summary suggestions from the corpus."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._families = PhraseIndex()
+        self._seniority = PhraseIndex()
+        self._bullets: Dict[Tuple[str, str], Tuple[str, ...]] = {}
+        self._summaries: Dict[str, Tuple[str, ...]] = {}
+
+        self.load_ms = 0.0
+        self.templates = 0
+        self.suggestions = 0
+
+    def _load(self):
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            started = time.perf_counter()
+            corpus = json.loads(self.path.read_text(encoding='utf-8'))
+
+            for priority, entry in enumerate(corpus["seniority"]):
+                for keyword in entry["keywords"]:
+                    self._seniority.add(keyword, priority, entry["level"])
+
+            for priority, family in enumerate(corpus["families"]):
+                name = family["name"]
+                for keyword in family["keywords"]:
+                    self._families.add(keyword, priority, name)
+                # Precomputed pool per (family, seniority): shared bullets plus the level's own
+                bullets = family["bullets"]
+                for level in SENIORITY_LEVELS:
+                    self._bullets[(name, level)] = tuple(bullets.get("any", [])) + tuple(bullets.get(level, []))
+                self._summaries[name] = tuple(family["summaries"])
+
+            self.templates = len({text for pool in self._bullets.values() for text in pool})
+            self.load_ms = (time.perf_counter() - started) * 1000
+            self._loaded = True
+
+    @staticmethod
+    def _rng(seed: Optional[int], *parts: str) -> random.Random:
+        if seed is None:
+            digest = hashlib.blake2b('\x1f'.join(parts).encode('utf-8'), digest_size=8).digest()
+            seed = int.from_bytes(digest, 'big')
+        return random.Random(seed)
+
+    def classify(self, job_title: str) -> Tuple[str, str]:
+        """(role family, seniority) for a job title."""
+        self._load()
+        words = normalize_title(job_title).split()
+        return (
+            self._families.find(words) or FALLBACK_FAMILY,
+            self._seniority.find(words) or DEFAULT_SENIORITY
+        )
+
+    def job_descriptions(
+        self,
+        job_title: str,
+        company: str,
+        count: int,
+        seed: Optional[int] = None
+    ) -> List[str]:
+        """count distinct bullet points for the title's family and seniority.
+
+        Without a seed the choice is derived from the title and company.
+        """
+        family, level = self.classify(job_title)
+        rng = self._rng(seed, normalize_title(job_title), company.strip().lower())
+        pool = self._bullets[(family, level)]
+        picks = rng.sample(pool, min(count, len(pool)))
+        if len(picks) < count and family != FALLBACK_FAMILY:
+            extra = [text for text in self._bullets[(FALLBACK_FAMILY, level)] if text not in picks]
+            picks += rng.sample(extra, min(count - len(picks), len(extra)))
+        self.suggestions += len(picks)
+        values = {"company": company.strip() or "the company"}
+        return [fill_placeholders(text, values) for text in picks]
+
+    def summary(self, full_name: str, current_summary: str = "", seed: Optional[int] = None) -> str:
+        """A professional summary, themed by any role keywords in the
+        current summary. Without a seed the choice is derived from both."""
+        self._load()
+        family = self._families.find(normalize_title(current_summary).split()) or FALLBACK_FAMILY
+        rng = self._rng(seed, full_name.strip().lower(), normalize_title(current_summary))
+        self.suggestions += 1
+        values = {"full_name": full_name.strip() or "This professional"}
+        return fill_placeholders(rng.choice(self._summaries[family]), values)
+
+    def stats(self) -> dict:
+        return {
+            "loaded": self._loaded,
+            "load_ms": round(self.load_ms, 2),
+            "families": len(self._summaries),
+            "keywords": self._families.phrases,
+            "templates": self.templates,
+            "suggestions": self.suggestions,
+        }
+
+
+# Global instance
+suggestion_engine = SuggestionEngine(CORPUS_PATH)
+
+
+def role_family(title: str) -> str:
+    """Role family for a job title ("other" if no keyword matches)."""
+    return suggestion_engine.classify(title)[0]
@@ -106,6 +106,39 @@ def send_login_notification_task(self, user_id: int, login_info: dict):
         db.close()
 
 
+@celery_app.task(bind=True, max_retries=3)
+def send_login_digest_task(self, user_id: int, logins: list):
+    """Send one email summarising several logins."""
+    db = None
+    try:
+        db = next(get_db())
+        user = db.query(User).filter(User.id == user_id).first()
+        
+        if not user:
+            raise Exception(f"User with ID {user_id} not found")
+        
+        # Send the email
+        success = email_service.send_login_digest(
+            email=user.email,
+            user_name=user.full_name,
+            logins=logins
+        )
+        
+        if not success:
+            raise Exception("Failed to send login digest")
+        
+        return {"status": "success", "message": "Login digest sent successfully"}
+        
+    except Exception as e:
+        if self.request.retries < self.max_retries:
+            # Retry after 60 seconds
+            raise self.retry(countdown=60, exc=e)
+        else:
+            return {"status": "error", "message": str(e)}
+    finally:
+        if db is not None:
+            db.close()
+
 @celery_app.task
 def cleanup_expired_2fa_codes():
     """Clean up expired 2FA codes from database."""
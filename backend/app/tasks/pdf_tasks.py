@@ -1,49 +1,24 @@
 from app.core.celery_app import celery_app
-from app.services.pdf_generator import pdf_generator
-from sqlalchemy.orm import Session
-from app.models.database import SessionLocal
-from app.models.models import PDFGeneration
-from datetime import datetime
+from app.services.pdf_jobs import run_pdf_generation
 
-@celery_app.task(bind=True)
-def generate_cv_pdf(self, cv_id: int, user_id: int):
+@celery_app.task(bind=True, max_retries=3)
+def generate_cv_pdf(self, generation_id: int):
     """Celery task to generate CV PDF."""
-    db = SessionLocal()
-    
     try:
-        # Update task status
-        pdf_gen = db.query(PDFGeneration).filter(
-            PDFGeneration.cv_id == cv_id,
-            PDFGeneration.user_id == user_id,
-            PDFGeneration.status == "pending"
-        ).first()
-        
-        if pdf_gen:
-            pdf_gen.status = "processing"
-            db.commit()
-        
-        # Generate PDF
-        pdf_path = pdf_generator.generate_pdf(cv_id, user_id, self.request.id)
+        pdf_path = run_pdf_generation(
+            generation_id,
+            final_attempt=self.request.retries >= self.max_retries
+        )
         
         return {
             'status': 'completed',
             'pdf_path': pdf_path,
-            'cv_id': cv_id,
-            'user_id': user_id
+            'generation_id': generation_id
         }
         
     except Exception as exc:
-        # Update task status on failure
-        if pdf_gen:
-            pdf_gen.status = "failed"
-            pdf_gen.error_message = str(exc)
-            db.commit()
-        
-        # Retry the task
-        raise self.retry(exc=exc, countdown=60, max_retries=3)
-        
-    finally:
-        db.close()
+        # The row stays pending until the last retry fails
+        raise self.retry(exc=exc, countdown=60)
 
 @celery_app.task
 def cleanup_old_pdfs():
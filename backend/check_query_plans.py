@@ -0,0 +1,118 @@
+"""
+Check that the hot CV, PDF and auth queries are served by their composite indexes.
+Run this against a migrated PostgreSQL database (`alembic upgrade head`).
+
+Sequential scans are disabled for the session so the check does not depend on
+how much data the database happens to contain: if the planner still cannot
+use the index, the index is missing or does not match the query.
+"""
+
+import json
+import os
+import sys
+import psycopg2
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# (description, query, index expected in the plan)
+HOT_QUERIES = [
+    (
+        "CV listing for an owner",
+        "SELECT id, title, updated_at FROM cvs WHERE owner_id = 1 "
+        "ORDER BY updated_at DESC, id DESC LIMIT 51",
+        "ix_cvs_owner_id_updated_at",
+    ),
+    (
+        "CV listing, next page",
+        "SELECT id, title, updated_at FROM cvs WHERE owner_id = 1 "
+        "AND (updated_at < now() OR (updated_at = now() AND id < 100)) "
+        "ORDER BY updated_at DESC, id DESC LIMIT 51",
+        "ix_cvs_owner_id_updated_at",
+    ),
+    (
+        "PDF generation lookup by CV, user and status",
+        "SELECT id FROM pdf_generations WHERE cv_id = 1 AND user_id = 1 AND status = 'pending'",
+        "ix_pdf_generations_cv_id_user_id_status",
+    ),
+    (
+        "Active subscription for a user",
+        "SELECT id FROM subscriptions WHERE user_id = 1 AND status = 'active'",
+        "ix_subscriptions_user_id_status",
+    ),
+    (
+        "Refresh token lookup (POST /api/auth/refresh)",
+        "SELECT refresh_tokens.id, users.id FROM refresh_tokens "
+        "JOIN users ON users.id = refresh_tokens.user_id "
+        "WHERE refresh_tokens.token_hash = 'x'",
+        "ix_refresh_tokens_token_hash",
+    ),
+    (
+        "Active sessions for a user",
+        "SELECT id FROM refresh_tokens WHERE user_id = 1 AND revoked_at IS NULL",
+        "ix_refresh_tokens_user_id_revoked_at",
+    ),
+]
+
+def _index_names(plan: dict) -> set:
+    """Collect every index referenced anywhere in an EXPLAIN JSON plan."""
+    names = set()
+    if "Index Name" in plan:
+        names.add(plan["Index Name"])
+    for child in plan.get("Plans", []):
+        names |= _index_names(child)
+    return names
+
+def run_checks():
+    """EXPLAIN each hot query and report whether its index is used."""
+
+    database_url = os.getenv('DATABASE_URL')
+    if not database_url:
+        print("ERROR: DATABASE_URL not found in environment variables")
+        return False
+
+    conn = None
+    cursor = None
+    all_ok = True
+
+    try:
+        conn = psycopg2.connect(database_url)
+        cursor = conn.cursor()
+        cursor.execute("SET enable_seqscan = off;")
+
+        for description, query, index_name in HOT_QUERIES:
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {query}")
+            plan = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            used = _index_names(plan[0]["Plan"])
+
+            if index_name in used:
+                print(f"✅ {description}: uses {index_name}")
+            else:
+                all_ok = False
+                print(f"❌ {description}: expected {index_name}, plan uses {sorted(used) or 'no index'}")
+
+        return all_ok
+
+    except psycopg2.Error as e:
+        print(f"❌ Database error: {str(e)}")
+        return False
+
+    finally:
+        if cursor:
+            cursor.close()
+        if conn:
+            conn.rollback()
+            conn.close()
+
+if __name__ == "__main__":
+    print("🔍 Checking query plans...")
+    print("=" * 50)
+
+    if run_checks():
+        print("\n🎉 All hot queries use their indexes.")
+    else:
+        print("\n💥 Some queries are not using their indexes. Run `alembic upgrade head`.")
+        sys.exit(1)
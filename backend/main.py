@@ -1,14 +1,27 @@
-from fastapi import FastAPI
+import os
+import secrets
+from typing import Optional
+from fastapi import Depends, FastAPI, Header, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
 from app.api.auth import router as auth_router
 from app.api.cv import router as cv_router
 from app.api.payments import router as payments_router
 from app.api.ai import router as ai_router
-from app.models.database import engine, Base
+from app.core.auth import user_cache
+from app.services.cv_validation import validation_cache
+from app.services.email_service import email_service
+from app.services.mail_dispatcher import mail_dispatcher
+from app.services.login_notifier import login_notifier
+from app.services.ai_client import ai_client
+from app.services.suggestion_cache import suggestion_cache
+from app.services.suggestion_engine import suggestion_engine
+from app.core.rate_limit import rate_limiter
+from app.core.hashing import password_hasher
+from app.core.process_pool import shutdown_process_pool
+from app.models.database import async_engine, get_pool_metrics
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+# Database schema is managed by Alembic: run `alembic upgrade head` before starting
 
 app = FastAPI(
     title="SmartCV API",
@@ -21,7 +34,7 @@ app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.ALLOWED_HOSTS,
     allow_credentials=True,
-    allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
+    allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
     allow_headers=["*"],
     expose_headers=["*"]
 )
@@ -40,6 +53,56 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+def require_metrics_token(authorization: Optional[str] = Header(None)):
+    """Only let scrapers holding METRICS_TOKEN read the metrics."""
+    if not settings.METRICS_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if not authorization or not secrets.compare_digest(
+        authorization.encode(), f"Bearer {settings.METRICS_TOKEN}".encode()
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid metrics token",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+
+@app.get("/metrics", dependencies=[Depends(require_metrics_token)])
+async def metrics():
+    """Per-worker runtime metrics; needs METRICS_TOKEN."""
+    return {
+        "pid": os.getpid(),
+        "password_hashing": password_hasher.stats(),
+        "database_pool": get_pool_metrics(),
+        "user_cache": user_cache.stats(),
+        "validation_cache": validation_cache.stats(),
+        "smtp_pool": email_service.pool.stats(),
+        "mail_queue": mail_dispatcher.stats(),
+        "login_notifications": login_notifier.stats(),
+        "ai_client": ai_client.stats(),
+        "suggestion_cache": suggestion_cache.stats(),
+        "suggestion_engine": suggestion_engine.stats(),
+        "rate_limits": rate_limiter.stats()
+    }
+
+@app.on_event("startup")
+async def start_mail_dispatcher():
+    mail_dispatcher.start()
+
+@app.on_event("shutdown")
+async def shutdown_executors():
+    # Send buffered login notifications, then deliver queued mail before
+    # the SMTP connections go away
+    login_notifier.flush_all()
+    await mail_dispatcher.drain(settings.MAIL_DRAIN_TIMEOUT_SECONDS)
+    password_hasher.shutdown()
+    shutdown_process_pool()
+    email_service.pool.close_all()
+    await ai_client.close()
+    await suggestion_cache.close()
+    await rate_limiter.close()
+    if async_engine is not None:
+        await async_engine.dispose()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
@@ -1,6 +1,9 @@
 #!/usr/bin/env bash
 # start.sh
 
+# Apply database migrations
+alembic upgrade head || exit 1
+
 # Start the FastAPI application with Gunicorn for production
 exec gunicorn main:app \
     --bind 0.0.0.0:$PORT \
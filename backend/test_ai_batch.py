@@ -0,0 +1,166 @@
+"""
+Check batched job description suggestions: entries are packed into as few
+completions as the token budget allows, each entry gets the bullets the
+model wrote for its id, and entries the model left out or garbled fall back
+to mock suggestions on their own.
+
+Runs the batch endpoint against a fake OpenAI-compatible server.
+"""
+
+import json
+import re
+import sys
+import uuid
+
+from test_ai_concurrency import free_port, serve_in_thread, stop_server, use_fake_openai
+from test_support import app_client, register_user, use_test_database
+
+ENTRY_PATTERN = re.compile(r"^\[(\d+)\] Job Title: (.*?) \|", re.M)
+
+
+def start_fake_batch_openai(port: int):
+    """Answer batched prompts with a JSON object keyed by entry id.
+
+    Job titles steer the answer: "Missing" entries are left out, "Broken"
+    ones get a string instead of a list, "Short" ones a single bullet and a
+    "Garbage" entry makes the whole completion unparseable.
+    """
+    from starlette.applications import Starlette
+    from starlette.responses import JSONResponse
+    from starlette.routing import Route
+
+    state = {"packs": []}
+
+    async def chat_completions(request):
+        body = await request.json()
+        entries = ENTRY_PATTERN.findall(body["messages"][-1]["content"])
+        state["packs"].append([int(entry_id) for entry_id, _ in entries])
+
+        answer = {}
+        for entry_id, title in entries:
+            if title.startswith("Missing"):
+                continue
+            if title.startswith("Broken"):
+                answer[entry_id] = "Led things"
+            elif title.startswith("Short"):
+                answer[entry_id] = [f"Led {title}"]
+            else:
+                answer[entry_id] = [f"Built {title} {n}" for n in range(5)]
+        content = "```json\n" + json.dumps(answer) + "\n```"
+        if any(title.startswith("Garbage") for _, title in entries):
+            content = "Sorry, I cannot help with that."
+        return JSONResponse({
+            "id": "chatcmpl-test",
+            "object": "chat.completion",
+            "created": 0,
+            "model": body.get("model", "test"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2}
+        })
+
+    app = Starlette(routes=[Route("/v1/chat/completions", chat_completions, methods=["POST"])])
+    return serve_in_thread(app, port), state
+
+
+def entries(*titles):
+    # Unique titles so no answer comes from the shared suggestion cache
+    run = uuid.uuid4().hex[:8]
+    return [{"job_title": f"{title} {run}", "company": "Acme"} for title in titles]
+
+
+def request(*titles):
+    from app.api.ai import SuggestJobDescriptionRequest
+
+    return [SuggestJobDescriptionRequest(**entry) for entry in entries(*titles)]
+
+
+def test_entries_are_packed_within_the_budget():
+    use_test_database()
+    from app.services.ai_batch import pack_entries
+
+    small = request(*(f"Engineer {n}" for n in range(4)))
+    assert pack_entries(small, range(4), token_budget=3500, output_tokens_per_entry=250) == [[0, 1, 2, 3]]
+
+    many = request(*(f"Engineer {n}" for n in range(25)))
+    packs = pack_entries(many, list(range(25)), token_budget=3500, output_tokens_per_entry=250)
+    assert [entry_id for pack in packs for entry_id in pack] == list(range(25))
+    assert len(packs) == 3 and max(map(len, packs)) - min(map(len, packs)) <= 1
+
+    # An entry larger than the budget still gets a pack of its own
+    huge = request("Engineer", "Architect", "Engineer")
+    huge[1].current_descriptions = ["x" * 20000]
+    assert pack_entries(huge, [0, 1, 2], token_budget=3500, output_tokens_per_entry=250) == [[0], [1], [2]]
+    print(f"✅ 4 entries fit one call, 25 are split into packs of {[len(pack) for pack in packs]}")
+
+
+def test_outputs_are_parsed_per_entry():
+    from app.services.ai_batch import parse_batch_output
+
+    text = 'Here you go:\n```json\n{"3": [" Led a team ", "", 7], "5": "Built", "9": ["Shipped"]}\n```'
+    assert parse_batch_output(text, [3, 5, 7]) == {3: ["Led a team"]}
+    assert parse_batch_output("no json here", [0]) == {}
+    assert parse_batch_output('{"0": [', [0]) == {}
+    assert parse_batch_output('["Led"]', [0]) == {}
+    print("✅ answers are mapped to entry ids, anything malformed is left out")
+
+
+def test_batch_endpoint_maps_answers_back():
+    port = free_port()
+    server, state = start_fake_batch_openai(port)
+    try:
+        with use_fake_openai(port, max_concurrency=4), app_client() as client:
+            headers = register_user(client)
+            batch = entries("Engineer", "Missing", "Designer", "Broken", "Short")
+            response = client.post("/api/ai/suggest-job-descriptions/batch", json={"entries": batch}, headers=headers)
+            assert response.status_code == 200, response.text
+            body = response.json()
+    finally:
+        stop_server(server)
+
+    # Five entries, one completion
+    assert body["llm_calls"] == 1 and state["packs"] == [[0, 1, 2, 3, 4]]
+    results = body["results"]
+    assert [item["source"] for item in results] == ["ai", "mock", "ai", "mock", "ai+mock"]
+    assert results[0]["suggestions"] == [f"Built {batch[0]['job_title']} {n}" for n in range(5)]
+    assert results[2]["suggestions"] == [f"Built {batch[2]['job_title']} {n}" for n in range(5)]
+    assert results[4]["suggestions"][0] == f"Led {batch[4]['job_title']}"
+    assert all(len(item["suggestions"]) == 5 for item in results)
+    print("✅ one completion answers five entries; missing and broken ones fall back on their own")
+
+
+def test_failed_packs_fall_back_without_failing_the_batch():
+    port = free_port()
+    server, state = start_fake_batch_openai(port)
+    try:
+        with use_fake_openai(port, max_concurrency=4), app_client() as client:
+            headers = register_user(client)
+            titles = [f"Engineer {n}" for n in range(24)] + ["Garbage"]
+            response = client.post(
+                "/api/ai/suggest-job-descriptions/batch", json={"entries": entries(*titles)}, headers=headers
+            )
+            assert response.status_code == 200, response.text
+            body = response.json()
+    finally:
+        stop_server(server)
+
+    assert body["llm_calls"] == len(state["packs"]) == 3
+    garbled = next(pack for pack in state["packs"] if 24 in pack)
+    sources = [item["source"] for item in body["results"]]
+    assert all(sources[entry_id] == "mock" for entry_id in garbled)
+    assert all(source == "ai" for entry_id, source in enumerate(sources) if entry_id not in garbled)
+    print(f"✅ an unparseable completion only affects its own {len(garbled)} entries")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing batched AI suggestions...")
+    print("=" * 50)
+
+    try:
+        test_entries_are_packed_within_the_budget()
+        test_outputs_are_parsed_per_entry()
+        test_batch_endpoint_maps_answers_back()
+        test_failed_packs_fall_back_without_failing_the_batch()
+        print("\n🎉 Batched suggestions are packed and mapped back per entry.")
+    except AssertionError as e:
+        print(f"\n💥 {str(e) or 'Check failed'}")
+        sys.exit(1)
@@ -0,0 +1,175 @@
+"""
+Check that AI calls do not block the worker.
+
+Starts a fake OpenAI-compatible server that answers after a delay, fires 50
+AI suggestion requests at the app at once and measures how long /health
+takes to answer while they are in flight.
+"""
+
+import asyncio
+import socket
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+from test_support import rate_limits_off, use_test_database
+
+FAKE_DELAY_SECONDS = 1.0
+AI_CALLS = 50
+MAX_HEALTH_LATENCY_SECONDS = 0.25
+FAKE_SUGGESTION = "Built reliable systems used by 10,000 people."
+# Client settings use_fake_openai changes and restores
+FAKE_OPENAI_ATTRIBUTES = ("api_key", "base_url", "max_concurrency", "stall_timeout", "_client", "_semaphore")
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def serve_in_thread(app, port: int):
+    """Run an ASGI app with uvicorn in a background thread."""
+    import uvicorn
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    server.thread = threading.Thread(target=server.run, daemon=True)
+    server.thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+def stop_server(server):
+    """Stop a server from serve_in_thread and wait for its shutdown hooks
+    (which close the shared AI client) before the next check starts."""
+    server.should_exit = True
+    server.thread.join(timeout=10)
+
+
+@contextmanager
+def use_fake_openai(port: int, max_concurrency: int):
+    """Point the app's AI client at a fake server on port, with rate limits
+    off, and restore both afterwards."""
+    use_test_database()
+    from app.services.ai_client import ai_client
+
+    saved = {name: getattr(ai_client, name) for name in FAKE_OPENAI_ATTRIBUTES}
+    ai_client.api_key = "test-key"
+    ai_client.base_url = f"http://127.0.0.1:{port}/v1"
+    ai_client.max_concurrency = max_concurrency
+    # Rebuilt on the next call, on the current event loop
+    ai_client._client = None
+    ai_client._semaphore = None
+    try:
+        # These checks fire more calls than a free plan allows
+        with rate_limits_off():
+            yield ai_client
+    finally:
+        # The fake server's client belongs to a loop that is gone; drop it unclosed
+        for name, value in saved.items():
+            setattr(ai_client, name, value)
+
+
+def start_fake_openai(port: int):
+    """Serve /v1/chat/completions from a background thread."""
+    from starlette.applications import Starlette
+    from starlette.responses import JSONResponse
+    from starlette.routing import Route
+
+    state = {"in_flight": 0, "peak": 0, "requests": 0}
+
+    async def chat_completions(request):
+        state["requests"] += 1
+        state["in_flight"] += 1
+        state["peak"] = max(state["peak"], state["in_flight"])
+        try:
+            await asyncio.sleep(FAKE_DELAY_SECONDS)
+        finally:
+            state["in_flight"] -= 1
+        body = await request.json()
+        return JSONResponse({
+            "id": "chatcmpl-test",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "test"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": FAKE_SUGGESTION},
+                "finish_reason": "stop"
+            }],
+            "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2}
+        })
+
+    app = Starlette(routes=[Route("/v1/chat/completions", chat_completions, methods=["POST"])])
+    return serve_in_thread(app, port), state
+
+
+async def _run_check(app, get_current_user):
+    import httpx
+    from types import SimpleNamespace
+
+    app.dependency_overrides[get_current_user] = lambda: SimpleNamespace(id=1, email="test@example.com")
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        async def suggest():
+            response = await client.post("/api/ai/suggest-summary", json={"full_name": "Test User"})
+            return response.json()["suggestion"]
+
+        ai_calls = [asyncio.create_task(suggest()) for _ in range(AI_CALLS)]
+        await asyncio.sleep(0.1)
+
+        health_latencies = []
+        while not all(task.done() for task in ai_calls):
+            started = time.perf_counter()
+            response = await client.get("/health")
+            assert response.status_code == 200
+            health_latencies.append(time.perf_counter() - started)
+            await asyncio.sleep(0.05)
+
+        suggestions = await asyncio.gather(*ai_calls)
+    app.dependency_overrides.clear()
+    return suggestions, health_latencies
+
+
+def test_ai_calls_do_not_block_other_requests():
+    """Other endpoints answer promptly while 50 AI calls are in flight."""
+    port = free_port()
+    server, state = start_fake_openai(port)
+    try:
+        with use_fake_openai(port, max_concurrency=AI_CALLS) as ai_client:
+            from main import app
+            from app.core.auth import get_current_user
+
+            started = time.perf_counter()
+            suggestions, health_latencies = asyncio.run(_run_check(app, get_current_user))
+            elapsed = time.perf_counter() - started
+            ai_stats = ai_client.stats()
+    finally:
+        stop_server(server)
+
+    print(f"✅ {len(suggestions)} AI calls finished in {elapsed:.2f}s "
+          f"(fake server delay {FAKE_DELAY_SECONDS}s, peak concurrency {state['peak']})")
+    print(f"✅ /health answered {len(health_latencies)} times while they were in flight, "
+          f"max {max(health_latencies) * 1000:.1f} ms")
+    print(f"   AI client: {ai_stats}")
+
+    assert all(suggestion == FAKE_SUGGESTION for suggestion in suggestions), "some calls fell back to mock output"
+    assert state["peak"] > 1, "AI calls were serialized"
+    assert health_latencies, "no /health requests were made while AI calls were in flight"
+    assert max(health_latencies) < MAX_HEALTH_LATENCY_SECONDS, "the event loop was blocked"
+    # Sequential calls would take AI_CALLS * FAKE_DELAY_SECONDS
+    assert elapsed < FAKE_DELAY_SECONDS * 5
+
+
+if __name__ == "__main__":
+    print("🧪 Testing AI call concurrency...")
+    print("=" * 50)
+
+    try:
+        test_ai_calls_do_not_block_other_requests()
+        print("\n🎉 AI calls run without blocking the worker.")
+    except AssertionError as e:
+        print(f"\n💥 {str(e) or 'Check failed'}")
+        sys.exit(1)
@@ -0,0 +1,141 @@
+"""
+Check the streamed AI endpoints against a fake streaming OpenAI server.
+
+Measures time to the first job description bullet compared with the whole
+response, and checks that a stream which stalls part way through is
+completed with mock bullets.
+"""
+
+import asyncio
+import json
+import sys
+import time
+
+from test_ai_concurrency import free_port, serve_in_thread, stop_server, use_fake_openai
+
+TOKEN_DELAY_SECONDS = 0.03
+STALL_TIMEOUT_SECONDS = 0.5
+FAKE_BULLETS = [
+    "Built a billing service handling 2M invoices a month",
+    "Cut page load time by 40% through caching and lazy loading",
+    "Led the migration of 30 services to Kubernetes",
+    "Mentored 4 junior engineers through their first releases",
+    "Automated release checks, reducing failed deploys by 60%",
+]
+
+
+def start_fake_streaming_openai(port: int):
+    """Stream FAKE_BULLETS word by word; stall after state["stall_after"] lines."""
+    from starlette.applications import Starlette
+    from starlette.responses import StreamingResponse
+    from starlette.routing import Route
+
+    state = {"stall_after": None}
+
+    def chunk(content: str) -> str:
+        return "data: " + json.dumps({
+            "id": "chatcmpl-test",
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": "test",
+            "choices": [{"index": 0, "delta": {"content": content}, "finish_reason": None}]
+        }) + "\n\n"
+
+    async def tokens():
+        for line_number, line in enumerate(FAKE_BULLETS):
+            if line_number == state["stall_after"]:
+                await asyncio.sleep(60)
+            for position, word in enumerate(line.split(" ")):
+                await asyncio.sleep(TOKEN_DELAY_SECONDS)
+                yield chunk(word if position == 0 else " " + word)
+            yield chunk("\n")
+        yield "data: [DONE]\n\n"
+
+    async def chat_completions(request):
+        return StreamingResponse(tokens(), media_type="text/event-stream")
+
+    app = Starlette(routes=[Route("/v1/chat/completions", chat_completions, methods=["POST"])])
+    return serve_in_thread(app, port), state
+
+
+def read_events(port: int, job_title: str):
+    """POST to the streaming endpoint; return [(seconds since start, event, data)]."""
+    import httpx
+
+    events = []
+    started = time.perf_counter()
+    with httpx.stream(
+        "POST",
+        f"http://127.0.0.1:{port}/api/ai/suggest-job-description/stream",
+        json={"job_title": job_title, "company": "Acme"},
+        timeout=30
+    ) as response:
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        event = None
+        for line in response.iter_lines():
+            if line.startswith("event: "):
+                event = line[len("event: "):]
+            elif line.startswith("data: "):
+                events.append((time.perf_counter() - started, event, json.loads(line[len("data: "):])))
+    return events
+
+
+def check_streaming(state):
+    from main import app
+    from app.core.auth import get_current_user
+    from types import SimpleNamespace
+
+    app.dependency_overrides[get_current_user] = lambda: SimpleNamespace(id=1, email="test@example.com")
+    app_port = free_port()
+    app_server = serve_in_thread(app, app_port)
+    try:
+        # The first call also pays for creating the OpenAI client
+        read_events(app_port, "Backend Engineer")
+
+        events = read_events(app_port, "Platform Engineer")
+        bullets = [(at, data["text"]) for at, event, data in events if event == "bullet"]
+        done = events[-1]
+        print(f"✅ first bullet after {bullets[0][0] * 1000:.0f} ms, "
+              f"full response after {done[0] * 1000:.0f} ms")
+        assert done[1] == "done" and done[2]["source"] == "ai"
+        assert [text for _, text in bullets] == FAKE_BULLETS
+        assert bullets[0][0] < done[0] / 3, "the first bullet waited for the whole completion"
+
+        state["stall_after"] = 2
+        events = read_events(app_port, "Site Reliability Engineer")
+        kinds = [event for _, event, _ in events]
+        done = events[-1][2]
+        print(f"✅ stalled stream fell back after {events[-1][0] * 1000:.0f} ms: {done['source']}")
+        assert "fallback" in kinds
+        assert events[kinds.index("fallback")][2]["reason"] == "stalled"
+        assert done["source"] == "ai+mock"
+        assert done["suggestions"][:2] == FAKE_BULLETS[:2]
+        assert len(done["suggestions"]) == 5
+        assert events[-1][0] < 2 + STALL_TIMEOUT_SECONDS
+    finally:
+        app.dependency_overrides.clear()
+        stop_server(app_server)
+
+
+def test_streamed_bullets_arrive_before_the_full_response():
+    fake_port = free_port()
+    fake_server, state = start_fake_streaming_openai(fake_port)
+    try:
+        with use_fake_openai(fake_port, max_concurrency=4) as ai_client:
+            ai_client.stall_timeout = STALL_TIMEOUT_SECONDS
+            check_streaming(state)
+    finally:
+        stop_server(fake_server)
+
+
+if __name__ == "__main__":
+    print("🧪 Testing streamed AI suggestions...")
+    print("=" * 50)
+
+    try:
+        test_streamed_bullets_arrive_before_the_full_response()
+        print("\n🎉 Streaming works.")
+    except AssertionError as e:
+        print(f"\n💥 {str(e) or 'Check failed'}")
+        sys.exit(1)
@@ -0,0 +1,141 @@
+"""
+Check the routers' database sessions under load.
+
+Without DATABASE_ASYNC, get_async_db yields a ThreadedSession that runs each
+call on the threadpool. Fires more concurrent requests than there are pool
+connections and threadpool workers, and checks they all finish without
+pool timeouts while /health stays responsive. Also checks that disabling
+2FA is committed.
+"""
+
+import asyncio
+import sys
+import time
+
+from test_support import SAMPLE_CV, app_client, rate_limits_off, register_user, use_test_database
+
+CONCURRENT_REQUESTS = 200
+MAX_HEALTH_LATENCY_SECONDS = 0.25
+
+
+async def _run_load(app, headers):
+    import httpx
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=60) as client:
+        async def list_cvs():
+            response = await client.get("/api/cv/", headers=headers)
+            return response.status_code
+
+        async def rename_cv(cv_id):
+            # Loads, updates and commits the CV
+            response = await client.put(f"/api/cv/{cv_id}", json={"title": "Renamed"}, headers=headers)
+            return response.status_code
+
+        cv_ids = []
+        for _ in range(5):
+            response = await client.post("/api/cv/", json=SAMPLE_CV, headers=headers)
+            cv_ids.append(response.json()["id"])
+
+        lists = [asyncio.create_task(list_cvs()) for _ in range(CONCURRENT_REQUESTS * 3 // 4)]
+        renames = [
+            asyncio.create_task(rename_cv(cv_ids[number % len(cv_ids)]))
+            for number in range(CONCURRENT_REQUESTS // 4)
+        ]
+        requests = lists + renames
+
+        health_latencies = []
+        while not all(task.done() for task in requests):
+            started = time.perf_counter()
+            assert (await client.get("/health")).status_code == 200
+            health_latencies.append(time.perf_counter() - started)
+            await asyncio.sleep(0.02)
+        return await asyncio.gather(*lists), await asyncio.gather(*renames), health_latencies
+
+
+def test_sessions_do_not_exhaust_the_threadpool():
+    use_test_database()
+    from app.core.config import settings
+    from app.models.database import AsyncSessionLocal, get_pool_metrics
+
+    with app_client() as client:
+        headers = register_user(client)
+    import main
+
+    assert AsyncSessionLocal is None, "run without DATABASE_ASYNC to check ThreadedSession"
+    before = get_pool_metrics()["sync"]
+
+    started = time.perf_counter()
+    with rate_limits_off():
+        list_statuses, rename_statuses, health_latencies = asyncio.run(_run_load(main.app, headers))
+    elapsed = time.perf_counter() - started
+    after = get_pool_metrics()["sync"]
+
+    print(f"✅ {CONCURRENT_REQUESTS} concurrent requests in {elapsed:.2f}s with "
+          f"{settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW} pool connections, "
+          f"max checkout wait {after['max_wait_ms']:.1f} ms, "
+          f"{rename_statuses.count(409)} racing renames answered with 409")
+    print(f"✅ /health answered {len(health_latencies)} times meanwhile, "
+          f"max {max(health_latencies) * 1000:.1f} ms")
+
+    assert set(list_statuses) == {200}, sorted(set(list_statuses))
+    # Renames racing on the same CV lose with 409, never 500
+    assert set(rename_statuses) <= {200, 409}, sorted(set(rename_statuses))
+    assert 200 in rename_statuses
+    assert after["timeouts"] == before["timeouts"], "requests timed out waiting for a connection"
+    assert after["checked_out"] == 0
+    assert max(health_latencies) < MAX_HEALTH_LATENCY_SECONDS, "the event loop was blocked"
+
+
+def test_disable_2fa_is_committed():
+    from app.models.database import SessionLocal
+    from app.models.models import User
+
+    def stored_user(email):
+        db = SessionLocal()
+        try:
+            return db.query(User).filter(User.email == email).one()
+        finally:
+            db.close()
+
+    with app_client() as client:
+        headers = register_user(client)
+        email = client.get("/api/auth/me", headers=headers).json()["email"]
+
+        db = SessionLocal()
+        try:
+            db.query(User).filter(User.email == email).update(
+                {"two_factor_enabled": True, "email_verified": True}
+            )
+            db.commit()
+        finally:
+            db.close()
+
+        # Without a code a new one is sent (and committed) first
+        response = client.post("/api/auth/2fa/disable",
+                               json={"password": "pw123456", "verification_code": ""}, headers=headers)
+        assert response.status_code == 202, response.text
+        code = stored_user(email).two_factor_code
+        assert code
+
+        response = client.post("/api/auth/2fa/disable",
+                               json={"password": "pw123456", "verification_code": code}, headers=headers)
+        assert response.status_code == 200, response.text
+
+    user = stored_user(email)
+    assert user.two_factor_enabled is False
+    assert user.two_factor_code is None and user.two_factor_code_expires is None
+    print("✅ disabling 2FA is committed with the cleared code")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing database sessions under load...")
+    print("=" * 50)
+
+    try:
+        test_sessions_do_not_exhaust_the_threadpool()
+        test_disable_2fa_is_committed()
+        print("\n🎉 Database sessions hold up under load.")
+    except AssertionError as e:
+        print(f"\n💥 {str(e) or 'Check failed'}")
+        sys.exit(1)
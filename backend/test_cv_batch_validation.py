@@ -0,0 +1,115 @@
+"""
+Check bulk CV validation: the endpoint streams one NDJSON line per payload
+index, payloads that fail schema parsing get their own errors without
+failing the batch, and large batches are validated in chunks on the worker
+process pool.
+"""
+
+import asyncio
+import copy
+import json
+import sys
+
+from test_support import SAMPLE_CV, app_client, register_user, use_test_database
+
+BATCH_SIZE = 120
+
+
+def payloads(count: int):
+    """SAMPLE_CV copies, with every seventh one missing required sections."""
+    items = []
+    for index in range(count):
+        if index % 7 == 3:
+            items.append({"title": f"Broken {index}", "personal_info": {"full_name": "No Email"}})
+        else:
+            cv = copy.deepcopy(SAMPLE_CV)
+            cv["title"] = f"CV {index}"
+            items.append(cv)
+    return items
+
+
+def test_endpoint_streams_one_line_per_payload():
+    with app_client() as client:
+        headers = register_user(client)
+        response = client.post("/api/cv/validate/batch", json=payloads(BATCH_SIZE), headers=headers)
+        assert response.status_code == 200, response.text
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert sorted(line["index"] for line in lines) == list(range(BATCH_SIZE))
+
+        broken = [line for line in lines if line["index"] % 7 == 3]
+        assert broken and all(not line["is_valid"] and line["errors"] for line in broken)
+        assert any(error.startswith("personal_info.email") for error in broken[0]["errors"]), broken[0]
+        valid = [line for line in lines if line["index"] % 7 != 3]
+        assert all(line["is_valid"] and "errors" not in line for line in valid)
+    print(f"✅ {BATCH_SIZE} payloads answered with {len(lines)} NDJSON lines, "
+          f"{len(broken)} schema failures reported per payload")
+
+
+def test_endpoint_refuses_empty_and_oversized_batches():
+    from app.core.config import settings
+
+    with app_client() as client:
+        headers = register_user(client)
+        assert client.post("/api/cv/validate/batch", json=[], headers=headers).status_code == 400
+        too_many = [{}] * (settings.VALIDATION_BATCH_MAX_ITEMS + 1)
+        assert client.post("/api/cv/validate/batch", json=too_many, headers=headers).status_code == 413
+    print("✅ empty batches answer 400, oversized ones 413")
+
+
+def collect(items):
+    """Run stream_batch_validation; return its chunks and the pool requests it made."""
+    use_test_database()
+    from app.services import cv_batch_validation
+
+    get_process_pool = cv_batch_validation.get_process_pool
+    pool_requests = []
+
+    def counting_pool():
+        pool_requests.append(1)
+        return get_process_pool()
+
+    async def run():
+        return [chunk async for chunk in cv_batch_validation.stream_batch_validation(items)]
+
+    cv_batch_validation.get_process_pool = counting_pool
+    try:
+        chunks = asyncio.run(run())
+    finally:
+        cv_batch_validation.get_process_pool = get_process_pool
+    return [[json.loads(line) for line in chunk.decode().splitlines()] for chunk in chunks], len(pool_requests)
+
+
+def test_large_batches_use_the_process_pool():
+    from app.core.config import settings
+
+    chunk_size = settings.VALIDATION_BATCH_CHUNK_SIZE
+    chunks, pool_requests = collect(payloads(BATCH_SIZE))
+    assert pool_requests == 1
+    assert len(chunks) == -(-BATCH_SIZE // chunk_size)
+    for chunk in chunks:
+        indexes = [line["index"] for line in chunk]
+        # Each chunk is a contiguous run of payloads
+        assert indexes == list(range(indexes[0], indexes[0] + len(indexes)))
+        assert len(indexes) <= chunk_size
+    assert sorted(line["index"] for chunk in chunks for line in chunk) == list(range(BATCH_SIZE))
+
+    # A single chunk is validated in a thread, without the pool
+    chunks, pool_requests = collect(payloads(chunk_size))
+    assert pool_requests == 0 and len(chunks) == 1 and len(chunks[0]) == chunk_size
+    print(f"✅ {BATCH_SIZE} payloads validated in {-(-BATCH_SIZE // chunk_size)} chunks on the process pool")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing bulk CV validation...")
+    print("=" * 50)
+
+    try:
+        test_endpoint_streams_one_line_per_payload()
+        test_endpoint_refuses_empty_and_oversized_batches()
+        test_large_batches_use_the_process_pool()
+        print("\n🎉 Bulk validation streams every result.")
+    except AssertionError as e:
+        print(f"\n💥 {str(e) or 'Check failed'}")
+        sys.exit(1)
@@ -0,0 +1,97 @@
+"""
+Check the ZIP export of all of a user's CVs: one valid PDF per CV named
+after its title and id, an errors.txt listing CVs that failed to render,
+and the error responses.
+"""
+
+import io
+import sys
+import zipfile
+
+from test_support import SAMPLE_CV, app_client, register_user
+
+TITLES = ["Backend Engineer", "Résumé / 2026", ""]
+
+
+def create_cvs(client, headers):
+    ids = []
+    for title in TITLES:
+        response = client.post("/api/cv/", json=dict(SAMPLE_CV, title=title), headers=headers)
+        assert response.status_code == 200, response.text
+        ids.append(response.json()["id"])
+    return ids
+
+
+def export(client, headers) -> zipfile.ZipFile:
+    response = client.post("/api/cv/export", headers=headers)
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"] == "application/zip"
+    assert 'filename="smartcv_export.zip"' in response.headers["content-disposition"]
+    archive = zipfile.ZipFile(io.BytesIO(response.content))
+    assert archive.testzip() is None
+    return archive
+
+
+def test_export_contains_a_pdf_per_cv():
+    with app_client() as client:
+        headers = register_user(client)
+        ids = create_cvs(client, headers)
+        archive = export(client, headers)
+
+    expected = [f"Backend_Engineer_{ids[0]}.pdf", f"R_sum_2026_{ids[1]}.pdf", f"cv_{ids[2]}.pdf"]
+    assert sorted(archive.namelist()) == sorted(expected), archive.namelist()
+    for name in expected:
+        pdf = archive.read(name)
+        assert pdf.startswith(b"%PDF-") and pdf.rstrip().endswith(b"%%EOF"), name
+        # Stored, not deflated: PDFs are compressed already
+        assert archive.getinfo(name).compress_type == zipfile.ZIP_STORED
+    print(f"✅ export holds {len(expected)} valid PDFs named by title and id")
+
+
+def test_render_failures_are_listed_in_errors_txt():
+    from app.models.database import SessionLocal
+    from app.models.models import CV
+
+    with app_client() as client:
+        headers = register_user(client)
+        ids = create_cvs(client, headers)
+
+        db = SessionLocal()
+        try:
+            db.query(CV).filter(CV.id == ids[0]).update({"experience": [5]})
+            db.commit()
+        finally:
+            db.close()
+
+        archive = export(client, headers)
+
+    broken = f"Backend_Engineer_{ids[0]}.pdf"
+    names = archive.namelist()
+    assert broken not in names
+    assert f"cv_{ids[2]}.pdf" in names and "errors.txt" in names
+    errors = archive.read("errors.txt").decode().splitlines()
+    assert len(errors) == 1 and errors[0].startswith(f"{broken}: "), errors
+    print("✅ a CV that fails to render is listed in errors.txt, the rest are exported")
+
+
+def test_export_errors():
+    with app_client() as client:
+        headers = register_user(client)
+        response = client.post("/api/cv/export", headers=headers)
+        assert response.status_code == 404 and response.json()["detail"] == "No CVs to export"
+        assert client.post("/api/cv/export").status_code in (401, 403)
+    print("✅ exporting without CVs answers 404, without a token 401/403")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing the CV export...")
+    print("=" * 50)
+
+    try:
+        test_export_contains_a_pdf_per_cv()
+        test_render_failures_are_listed_in_errors_txt()
+        test_export_errors()
+        print("\n🎉 CV exports are complete and valid.")
+    except AssertionError as e:
+        print(f"\n💥 {str(e) or 'Check failed'}")
+        sys.exit(1)
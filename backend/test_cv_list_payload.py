@@ -0,0 +1,87 @@
+"""
+Check the CV listing with 200 CVs: pages hold summaries only, following
+X-Next-Cursor returns every CV exactly once, and X-Total-Count gives the
+full count on the first page.
+
+Prints a benchmark of payload size and latency for the summary pages
+against fetching every full CV.
+"""
+
+import sys
+import time
+
+from test_support import SAMPLE_CV, app_client, register_user
+
+CV_COUNT = 200
+PAGE_SIZE = 50
+SUMMARY_FIELDS = {"id", "title", "template_id", "color_scheme", "is_public", "created_at", "updated_at"}
+
+
+def bulky_cv(number: int) -> dict:
+    """A realistically sized CV: several jobs with a handful of bullets each."""
+    experience = [
+        dict(SAMPLE_CV["experience"][0],
+             company_name=f"Company {job}",
+             job_description=[f"Delivered project {job}.{bullet} ahead of schedule" for bullet in range(6)])
+        for job in range(5)
+    ]
+    return dict(SAMPLE_CV, title=f"CV {number}", experience=experience)
+
+
+def follow_cursor(client, headers):
+    """Every page of the listing; returns (rows, total, bytes, requests)."""
+    rows, size, requests, total = [], 0, 0, None
+    params = {"limit": PAGE_SIZE}
+    while True:
+        response = client.get("/api/cv/", params=params, headers=headers)
+        assert response.status_code == 200, response.text
+        requests += 1
+        size += len(response.content)
+        rows += response.json()
+        if total is None:
+            total = int(response.headers["x-total-count"])
+        else:
+            assert "x-total-count" not in response.headers
+        cursor = response.headers.get("x-next-cursor")
+        if not cursor:
+            return rows, total, size, requests
+        params = {"limit": PAGE_SIZE, "cursor": cursor}
+
+
+def test_listing_200_cvs():
+    with app_client() as client:
+        headers = register_user(client)
+        for number in range(CV_COUNT):
+            assert client.post("/api/cv/", json=bulky_cv(number), headers=headers).status_code == 200
+
+        started = time.perf_counter()
+        rows, total, summary_bytes, requests = follow_cursor(client, headers)
+        summary_ms = (time.perf_counter() - started) * 1000
+
+        assert total == CV_COUNT
+        assert requests == CV_COUNT // PAGE_SIZE
+        assert len({row["id"] for row in rows}) == CV_COUNT
+        assert all(set(row) == SUMMARY_FIELDS for row in rows), rows[0]
+
+        started = time.perf_counter()
+        full_bytes = sum(
+            len(client.get(f"/api/cv/{row['id']}", headers=headers).content) for row in rows
+        )
+        full_ms = (time.perf_counter() - started) * 1000
+
+    print(f"✅ {CV_COUNT} CVs in {requests} pages: {summary_bytes / 1024:.1f} KiB in {summary_ms:.0f} ms "
+          f"vs {full_bytes / 1024:.1f} KiB in {full_ms:.0f} ms for the full CVs "
+          f"({full_bytes / summary_bytes:.1f}x smaller)")
+    assert summary_bytes * 5 < full_bytes
+
+
+if __name__ == "__main__":
+    print("🧪 Testing the CV listing payload...")
+    print("=" * 50)
+
+    try:
+        test_listing_200_cvs()
+        print("\n🎉 CV listing pages are small and complete.")
+    except AssertionError as e:
+        print(f"\n💥 {str(e) or 'Check failed'}")
+        sys.exit(1)
@@ -0,0 +1,94 @@
+"""
+Check JSON Patch on CVs: edits to sections, validation of touched items
+and refusal of fields that cannot be patched.
+"""
+
+import sys
+
+from test_support import SAMPLE_CV, app_client, register_user
+
+
+def patch(client, headers, cv, operations):
+    return client.patch(
+        f"/api/cv/{cv['id']}",
+        json={"version": cv["version"], "operations": operations},
+        headers=headers
+    )
+
+
+def test_patch_updates_touched_sections():
+    with app_client() as client:
+        headers = register_user(client)
+        cv = client.post("/api/cv/", json=SAMPLE_CV, headers=headers).json()
+
+        response = patch(client, headers, cv, [
+            {"op": "test", "path": "/title", "value": "My CV"},
+            {"op": "replace", "path": "/experience/0/job_title", "value": "Lead Engineer"},
+            {"op": "add", "path": "/skills/-", "value": {"skill_name": "Rust"}},
+        ])
+        assert response.status_code == 200, response.text
+        assert response.json()["updated_fields"] == ["experience", "skills"]
+        assert response.json()["version"] == cv["version"] + 1
+
+        stored = client.get(f"/api/cv/{cv['id']}", headers=headers).json()
+        assert stored["experience"][0]["job_title"] == "Lead Engineer"
+        assert stored["skills"][-1]["skill_name"] == "Rust"
+
+        # The old version is now stale
+        assert patch(client, headers, cv, [{"op": "remove", "path": "/skills/0"}]).status_code == 409
+    print("✅ patch edits sections and bumps the version")
+
+
+def test_patch_refuses_fields_that_cannot_be_patched():
+    with app_client() as client:
+        headers = register_user(client)
+        cv = client.post("/api/cv/", json=SAMPLE_CV, headers=headers).json()
+
+        for operations in (
+            [{"op": "add", "path": "/owner_id", "value": [1]}],
+            [{"op": "add", "path": "/version", "value": 7}],
+            [{"op": "replace", "path": "/owner_id", "value": 2}],
+            [{"op": "copy", "from": "/experience", "path": "/pdf_url"}],
+            [{"op": "move", "from": "/experience/0", "path": "/owner_id"}],
+        ):
+            response = patch(client, headers, cv, operations)
+            assert response.status_code == 422, (operations, response.status_code, response.text)
+            assert "cannot be patched" in response.json()["detail"], response.json()
+
+        response = patch(client, headers, cv, [{"op": "remove", "path": "/owner_id"}])
+        assert response.status_code == 422
+
+        stored = client.get(f"/api/cv/{cv['id']}", headers=headers).json()
+        assert stored["version"] == cv["version"]
+        assert stored["experience"] == cv["experience"]
+    print("✅ non-patchable fields are refused with 422")
+
+
+def test_patch_rejects_invalid_items():
+    with app_client() as client:
+        headers = register_user(client)
+        cv = client.post("/api/cv/", json=SAMPLE_CV, headers=headers).json()
+
+        response = patch(client, headers, cv, [
+            {"op": "add", "path": "/skills/-", "value": {"level": "expert"}}
+        ])
+        assert response.status_code == 422
+        assert response.json()["detail"].startswith("skills/1/skill_name")
+
+        response = patch(client, headers, cv, [{"op": "test", "path": "/title", "value": "Other"}])
+        assert response.status_code == 409
+    print("✅ invalid items give 422, failed tests 409")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing CV JSON Patch...")
+    print("=" * 50)
+
+    try:
+        test_patch_updates_touched_sections()
+        test_patch_refuses_fields_that_cannot_be_patched()
+        test_patch_rejects_invalid_items()
+        print("\n🎉 CV patching works.")
+    except AssertionError as e:
+        print(f"\n💥 {str(e) or 'Check failed'}")
+        sys.exit(1)
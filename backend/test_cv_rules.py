@@ -0,0 +1,104 @@
+"""
+Check the shared CV rules: action verb inflections, bullet punctuation,
+date and number patterns.
+
+Prints a benchmark of action verb checks per second over typical bullets.
+"""
+
+import sys
+import time
+
+from test_support import use_test_database
+
+BENCH_BULLETS = [
+    "Led a team of 5 engineers", "• Built the billing service", "Responsible for deployments",
+    "Optimizing query plans", "Spearheaded the migration to Postgres", "Worked on the API",
+    "Analysed churn, cutting it by 12%", "Helped customers", "Mentored two interns", "",
+]
+BENCH_CALLS = 200000
+MAX_CHECK_US = 5.0
+
+
+def test_inflections_are_recognised():
+    from app.core.cv_rules import ACTION_VERBS, is_action_verb
+
+    for word in (
+        "lead", "leads", "leading", "led",
+        "build", "built", "rebuilt",
+        "optimize", "optimizes", "optimizing", "optimized",
+        "plan", "planning", "planned",
+        "simplify", "simplifies", "simplified",
+        "analyse", "analysed", "analyze", "analyzing",
+        "oversaw", "overseen", "wrote", "written",
+        "streamlined", "spearheaded",
+    ):
+        assert is_action_verb(word), word
+    for word in ("responsible", "worked", "helped", "the", "planed", "leaded", ""):
+        assert not is_action_verb(word), word
+    assert all(word == word.lower() for word in ACTION_VERBS)
+    print(f"✅ {len(ACTION_VERBS)} action verb forms, inflections recognised")
+
+
+def test_bullets_are_matched_on_their_first_word():
+    from app.core.cv_rules import first_word, starts_with_action_verb
+
+    assert first_word("  •Led, the team") == "led"
+    assert first_word('"Built" things') == "built"
+    assert first_word("• Built a CLI") == "built"
+    assert first_word("") == ""
+    for bullet in ("Led the team", "• Built a CLI", "- Reduced costs by 30%", "DELIVERED (early)", "Optimizing: queries"):
+        assert starts_with_action_verb(bullet), bullet
+    for bullet in ("Responsible for deployments", "The team lead", "", "•", "Worked on the API"):
+        assert not starts_with_action_verb(bullet), bullet
+    print("✅ bullets are matched on their first word, ignoring punctuation")
+
+
+def test_validator_uses_the_lexicon():
+    use_test_database()
+    from app.services.cv_validation import cv_validator
+
+    assert cv_validator.improve_description("Spearheaded a data migration") == "Spearheaded a data migration"
+    assert cv_validator.improve_description("Responsible for a data migration").startswith(
+        "Consider starting with an action verb"
+    )
+    print("✅ the validator checks bullets against the lexicon")
+
+
+def test_dates_and_numbers():
+    from app.core.cv_rules import has_number, is_valid_date
+
+    assert is_valid_date("09/2021")
+    for value in ("9/2021", "2021-09", "09/21", "09/2021 ", "Sept 2021"):
+        assert not is_valid_date(value), value
+    assert has_number("Cut costs by 30%") and not has_number("Cut costs")
+    print("✅ MM/YYYY dates and quantified bullets detected")
+
+
+def test_action_verb_check_speed():
+    from app.core.cv_rules import starts_with_action_verb
+
+    started = time.perf_counter()
+    for call in range(BENCH_CALLS):
+        starts_with_action_verb(BENCH_BULLETS[call % len(BENCH_BULLETS)])
+    elapsed = time.perf_counter() - started
+
+    per_call_us = elapsed / BENCH_CALLS * 1e6
+    print(f"✅ {BENCH_CALLS} bullet checks in {elapsed:.2f}s: {per_call_us:.2f} µs each, "
+          f"{BENCH_CALLS / elapsed:,.0f} checks/sec")
+    assert per_call_us < MAX_CHECK_US
+
+
+if __name__ == "__main__":
+    print("🧪 Testing CV rules...")
+    print("=" * 50)
+
+    try:
+        test_inflections_are_recognised()
+        test_bullets_are_matched_on_their_first_word()
+        test_validator_uses_the_lexicon()
+        test_dates_and_numbers()
+        test_action_verb_check_speed()
+        print("\n🎉 CV rules work.")
+    except AssertionError as e:
+        print(f"\n💥 {str(e) or 'Check failed'}")
+        sys.exit(1)
@@ -0,0 +1,145 @@
+"""
+Check the per-entry validation cache: entries are validated once per
+content, messages get the entry's current "Experience N: " / "Education N: "
+prefix, and an edit only re-validates the edited entry.
+
+Prints validation time for a large CV with a cold and a warm cache.
+"""
+
+import copy
+import sys
+import time
+
+from test_support import SAMPLE_CV, use_test_database
+
+BENCH_EXPERIENCES = 20
+BENCH_CALLS = 200
+
+
+def cv_with(experience=None, education=None):
+    use_test_database()
+    from app.schemas.schemas import CVBase
+
+    data = copy.deepcopy(SAMPLE_CV)
+    if experience is not None:
+        data["experience"] = experience
+    if education is not None:
+        data["education"] = education
+    return CVBase(**data)
+
+
+def job(title: str, bullets, company: str = "Acme"):
+    return {"job_title": title, "company_name": company, "start_date": "01/2015", "job_description": bullets}
+
+
+def counting_validator():
+    """A fresh validator and cache that count how often each section is validated."""
+    use_test_database()
+    from app.core.cache import TTLCache
+    from app.services import cv_validation
+
+    cv_validation.validation_cache = TTLCache(maxsize=1000, ttl=60)
+    validator = cv_validation.CVValidationService()
+    calls = {"experience": 0, "education": 0}
+
+    for section in calls:
+        validate = getattr(validator, f"_validate_{section}")
+
+        def counted(entry, validate=validate, section=section):
+            calls[section] += 1
+            return validate(entry)
+
+        setattr(validator, f"_validate_{section}", counted)
+    return validator, calls
+
+
+def test_messages_get_the_current_entry_number():
+    validator, calls = counting_validator()
+    weak = job("Engineer", ["Worked on things", "Helped 2 teams"], company=" ")
+    strong = job("Lead", ["Led 3 teams", "Built 2 products"])
+
+    result = validator.validate_cv(cv_with([strong, weak]))
+    assert "Experience 2: Company name is required" in result.missing_required_fields
+    assert any(s.startswith("Experience 2: Consider starting bullet points [1, 2]") for s in result.suggestions)
+    assert not any(s.startswith("Experience 1:") for s in result.suggestions + result.missing_required_fields)
+
+    # Reordered: same cached results, new numbers
+    result = validator.validate_cv(cv_with([weak, strong]))
+    assert "Experience 1: Company name is required" in result.missing_required_fields
+    assert not any(s.startswith("Experience 2:") for s in result.suggestions + result.missing_required_fields)
+    assert calls["experience"] == 2
+
+    # Cached messages are stored unnumbered and never modified
+    from app.services.cv_validation import _experience_key, validation_cache
+    missing, suggestions = validation_cache.get(_experience_key(cv_with([weak]).experience[0]))
+    assert missing == ["Company name is required"]
+    assert not any(s.startswith("Experience") for s in suggestions)
+    print("✅ cached messages are numbered by the entry's current position")
+
+
+def test_edits_revalidate_only_the_edited_entry():
+    validator, calls = counting_validator()
+    jobs = [job(f"Engineer {n}", [f"Built {n} services", "Led reviews"]) for n in range(5)]
+    schools = [dict(SAMPLE_CV["education"][0], school_name=f"School {n}") for n in range(2)]
+
+    first = validator.validate_cv(cv_with(jobs, schools))
+    assert calls == {"experience": 5, "education": 2}
+
+    jobs[3] = job("Engineer 3", ["Built 3 services", "Responsible for reviews"])
+    result = validator.validate_cv(cv_with(jobs, schools))
+    assert calls == {"experience": 6, "education": 2}
+    assert result.suggestions != first.suggestions
+    assert any(s.startswith("Experience 4: Consider starting bullet points [2]") for s in result.suggestions)
+
+    # Same content in another CV is a cache hit too
+    validator.validate_cv(cv_with(jobs[:2], schools[:1]))
+    assert calls == {"experience": 6, "education": 2}
+
+    schools[1]["degree"] = ""
+    result = validator.validate_cv(cv_with(jobs, schools))
+    assert calls == {"experience": 6, "education": 3}
+    assert any(m.startswith("Education 2: ") for m in result.missing_required_fields), result.missing_required_fields
+    print("✅ editing one entry re-validates only that entry")
+
+
+def test_validation_speed():
+    validator, _ = counting_validator()
+    jobs = [job(f"Engineer {n}", [f"Built {n} services", "Responsible for reviews", "Led 2 teams"])
+            for n in range(BENCH_EXPERIENCES)]
+    cvs = []
+    for call in range(BENCH_CALLS):
+        # One entry changes per request, as when a user edits a CV
+        edited = list(jobs)
+        edited[call % BENCH_EXPERIENCES] = job("Editing", [f"Built {call} things", "Led reviews"])
+        cvs.append(cv_with(edited))
+
+    from app.core.cache import TTLCache
+    from app.services import cv_validation
+
+    started = time.perf_counter()
+    for cv in cvs:
+        cv_validation.validation_cache = TTLCache(maxsize=1000, ttl=60)
+        validator.validate_cv(cv)
+    cold_ms = (time.perf_counter() - started) / BENCH_CALLS * 1000
+
+    started = time.perf_counter()
+    for cv in cvs:
+        validator.validate_cv(cv)
+    warm_ms = (time.perf_counter() - started) / BENCH_CALLS * 1000
+
+    print(f"✅ {BENCH_EXPERIENCES}-job CV validated in {cold_ms:.3f} ms cold, {warm_ms:.3f} ms warm")
+    assert warm_ms < cold_ms
+
+
+if __name__ == "__main__":
+    print("🧪 Testing the validation cache...")
+    print("=" * 50)
+
+    try:
+        test_messages_get_the_current_entry_number()
+        test_edits_revalidate_only_the_edited_entry()
+        test_validation_speed()
+        print("\n🎉 CV validation is cached per entry.")
+    except AssertionError as e:
+        print(f"\n💥 {str(e) or 'Check failed'}")
+        sys.exit(1)
@@ -0,0 +1,126 @@
+"""
+Check the compiled email templates: messages parse as multipart/alternative
+with a plaintext part first, values are HTML-escaped in the HTML part only,
+and header values cannot inject headers.
+
+Prints how many messages per second are rendered.
+"""
+
+import sys
+import time
+from email import message_from_bytes, policy
+
+from test_support import use_test_database
+
+BENCH_CALLS = 20000
+HOSTILE_NAME = '<script>alert("x")</script> Zoë & Co'
+
+
+def email_service():
+    use_test_database()
+    from app.services.email_service import email_service
+    return email_service
+
+
+def parse(rendered):
+    return message_from_bytes(rendered.as_bytes(), policy=policy.default)
+
+
+def test_messages_are_multipart_alternative():
+    service = email_service()
+    rendered = service.build_2fa_code_message("user@example.com", "123456", "Ada")
+    msg = parse(rendered)
+
+    assert msg.get_content_type() == "multipart/alternative"
+    assert msg["To"] == "user@example.com"
+    assert msg["Subject"] == "SmartCV - Two-Factor Authentication Code"
+    assert rendered.recipients == ["user@example.com"]
+
+    text, markup = msg.get_payload()
+    assert text.get_content_type() == "text/plain" and markup.get_content_type() == "text/html"
+    assert text.get_content_charset() == markup.get_content_charset() == "utf-8"
+    for part in (text, markup):
+        body = part.get_content()
+        assert "123456" in body and "Ada" in body
+        assert "{code}" not in body and "{user_name}" not in body
+    assert "<" not in text.get_content()
+    print("✅ messages are multipart/alternative, plaintext first")
+
+
+def test_values_are_escaped_in_html_only():
+    service = email_service()
+    msg = parse(service.build_email_verification_message("user@example.com", "tok-en_123", HOSTILE_NAME))
+    text, markup = (part.get_content() for part in msg.get_payload())
+
+    assert "<script>" not in markup
+    assert "&lt;script&gt;alert(&quot;x&quot;)&lt;/script&gt; Zoë &amp; Co" in markup
+    assert HOSTILE_NAME in text
+    # Links survive in the plaintext part
+    assert "/verify-email?token=tok-en_123" in text
+    print("✅ values are HTML-escaped in the HTML part and verbatim in plaintext")
+
+
+def test_digest_rows_are_escaped_and_capped():
+    service = email_service()
+    from app.core.config import settings
+
+    logins = [{"time": f"2026-01-01 00:00:{n:02d} UTC", "ip": "10.0.0.1", "device": "<b>Firefox</b>"}
+              for n in range(settings.LOGIN_DIGEST_MAX_ROWS + 3)]
+    msg = parse(service.build_login_digest_message("user@example.com", "Ada", logins))
+    text, markup = (part.get_content() for part in msg.get_payload())
+
+    assert msg["Subject"] == "SmartCV - New Logins Detected"
+    assert "<b>Firefox</b>" not in markup and markup.count("&lt;b&gt;Firefox&lt;/b&gt;") == settings.LOGIN_DIGEST_MAX_ROWS
+    assert text.count("<b>Firefox</b>") == settings.LOGIN_DIGEST_MAX_ROWS
+    assert "3 earlier logins not listed" in text
+    # Only the latest rows are listed
+    assert logins[-1]["time"] in text and logins[0]["time"] not in text.split("not listed")[1]
+    print("✅ digest rows are escaped and capped at LOGIN_DIGEST_MAX_ROWS")
+
+
+def test_headers_cannot_be_injected():
+    email_service()
+    from app.services.email_templates import LOGIN_NOTIFICATION
+
+    try:
+        LOGIN_NOTIFICATION.render_message("noreply@example.com", "user@example.com\r\nBcc: victim@example.com",
+                                          user_name="Ada", time="now", ip="1.2.3.4", device="x")
+        raise AssertionError("a recipient with a line break was accepted")
+    except ValueError:
+        pass
+
+    msg = parse(LOGIN_NOTIFICATION.render_message("Zoë <noreply@example.com>", "user@example.com",
+                                                  user_name="Ada", time="now", ip="1.2.3.4", device="x"))
+    assert str(msg["From"]) == "Zoë <noreply@example.com>"
+    # Only the display name is encoded, the address stays readable
+    assert msg["From"].addresses[0].addr_spec == "noreply@example.com"
+    print("✅ header line breaks are refused, non-ASCII headers are encoded")
+
+
+def test_render_speed():
+    service = email_service()
+    login_info = {"time": "2026-01-01 00:00:00 UTC", "ip": "10.0.0.1", "device": "Firefox"}
+
+    started = time.perf_counter()
+    for call in range(BENCH_CALLS):
+        service.build_login_notification_message(f"user{call}@example.com", "Ada", login_info)
+    elapsed = time.perf_counter() - started
+
+    print(f"✅ {BENCH_CALLS} login notifications rendered in {elapsed:.2f}s: "
+          f"{elapsed / BENCH_CALLS * 1e6:.1f} µs each, {BENCH_CALLS / elapsed:,.0f} messages/sec")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing email templates...")
+    print("=" * 50)
+
+    try:
+        test_messages_are_multipart_alternative()
+        test_values_are_escaped_in_html_only()
+        test_digest_rows_are_escaped_and_capped()
+        test_headers_cannot_be_injected()
+        test_render_speed()
+        print("\n🎉 Email templates render valid MIME.")
+    except AssertionError as e:
+        print(f"\n💥 {str(e) or 'Check failed'}")
+        sys.exit(1)
@@ -0,0 +1,117 @@
+"""
+Check login under a burst of 200 logins/sec.
+
+Password hashing runs on a bounded pool; once PASSWORD_HASH_MAX_PENDING
+hashes are waiting, further logins are refused at once with 503 and
+Retry-After instead of queueing without limit. Measures login latency,
+rejections and how long /health takes to answer during the burst.
+"""
+
+import asyncio
+import sys
+import time
+
+from test_support import rate_limits_off, use_test_database
+
+LOGINS_PER_SECOND = 200
+BURST_SECONDS = 1.0
+MAX_PENDING = 16
+MAX_HEALTH_LATENCY_SECONDS = 0.25
+PASSWORD = "pw123456"
+
+
+async def _run_burst(app):
+    import httpx
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=60) as client:
+        response = await client.post("/api/auth/register", json={
+            "email": "burst@example.com", "full_name": "Burst User", "password": PASSWORD
+        })
+        assert response.status_code == 200, response.text
+
+        async def login():
+            started = time.perf_counter()
+            response = await client.post("/api/auth/login", json={
+                "email": "burst@example.com", "password": PASSWORD
+            })
+            return response, time.perf_counter() - started
+
+        logins = []
+        interval = 1 / LOGINS_PER_SECOND
+        started = time.perf_counter()
+        for number in range(int(LOGINS_PER_SECOND * BURST_SECONDS)):
+            # Paced against the start time, so slow scheduling does not lower the rate
+            await asyncio.sleep(max(0.0, started + number * interval - time.perf_counter()))
+            logins.append(asyncio.create_task(login()))
+
+        health_latencies = []
+        while not all(task.done() for task in logins):
+            health_started = time.perf_counter()
+            assert (await client.get("/health")).status_code == 200
+            health_latencies.append(time.perf_counter() - health_started)
+            await asyncio.sleep(0.02)
+
+        results = await asyncio.gather(*logins)
+
+        # A refused client that honours Retry-After gets in once the burst is over
+        retry_after = next(
+            (int(response.headers["retry-after"]) for response, _ in results if response.status_code == 503), 0
+        )
+        await asyncio.sleep(retry_after)
+        retried, _ = await login()
+    return results, health_latencies, retried
+
+
+def test_login_burst_is_shed_with_retry_after():
+    use_test_database()
+    from app.core.hashing import password_hasher
+    from app.models.database import Base, engine
+    from main import app
+
+    Base.metadata.create_all(bind=engine)
+    max_pending = password_hasher.max_pending
+    password_hasher.max_pending = MAX_PENDING
+    try:
+        started = time.perf_counter()
+        with rate_limits_off():
+            results, health_latencies, retried = asyncio.run(_run_burst(app))
+        elapsed = time.perf_counter() - started
+        stats = password_hasher.stats()
+    finally:
+        password_hasher.max_pending = max_pending
+
+    accepted = [latency for response, latency in results if response.status_code == 200]
+    rejected = [response for response, _ in results if response.status_code == 503]
+    other = [response.status_code for response, _ in results if response.status_code not in (200, 503)]
+    accepted.sort()
+
+    print(f"✅ {len(results)} logins in {elapsed:.2f}s: {len(accepted)} accepted, {len(rejected)} refused with 503")
+    print(f"   accepted latency p50 {accepted[len(accepted) // 2] * 1000:.0f} ms, "
+          f"max {accepted[-1] * 1000:.0f} ms; peak pending hashes {stats['peak_pending']}")
+    print(f"✅ /health answered {len(health_latencies)} times during the burst, "
+          f"max {max(health_latencies) * 1000:.1f} ms")
+
+    assert not other, f"unexpected statuses: {other}"
+    assert accepted, "no login got through"
+    assert rejected, "the burst never filled the hashing queue"
+    assert all(response.headers.get("retry-after") == "1" for response in rejected)
+    assert all("busy" in response.json()["detail"] for response in rejected)
+    assert stats["peak_pending"] <= MAX_PENDING
+    assert stats["rejected"] >= len(rejected)
+    assert stats["queued"] == 0 and stats["running"] == 0
+    assert max(health_latencies) < MAX_HEALTH_LATENCY_SECONDS, "the event loop was blocked"
+    assert retried.status_code == 200, retried.text
+    print("✅ refused clients get in after Retry-After")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing a login burst...")
+    print("=" * 50)
+
+    try:
+        test_login_burst_is_shed_with_retry_after()
+        print("\n🎉 Login bursts are shed without blocking the worker.")
+    except AssertionError as e:
+        print(f"\n💥 {str(e) or 'Check failed'}")
+        sys.exit(1)
@@ -0,0 +1,148 @@
+"""
+Check login notification coalescing: the first login is notified at once,
+logins during the window are sent together when it closes, and a burst
+costs one email per window.
+"""
+
+import asyncio
+import sys
+from types import SimpleNamespace
+
+from test_support import use_test_database
+
+WINDOW = 0.1
+NOTIFICATION = "SmartCV - New Login Detected"
+DIGEST = "SmartCV - New Logins Detected"
+
+
+class RecordingDispatcher:
+    """Stands in for the mail queue and records what would be sent."""
+
+    def __init__(self):
+        self.sent = []
+
+    def enqueue(self, message, description: str) -> bool:
+        self.sent.append((message.recipients[0], message.subject))
+        return True
+
+
+def make_notifier(window: float = WINDOW):
+    """A coalescer whose emails go to a RecordingDispatcher instead of the
+    app's mail queue."""
+    use_test_database()
+    from app.services import login_notifier
+
+    dispatcher = RecordingDispatcher()
+
+    class RecordingCoalescer(login_notifier.LoginNotificationCoalescer):
+        def _deliver(self, pending, logins):
+            mail_dispatcher = login_notifier.mail_dispatcher
+            login_notifier.mail_dispatcher = dispatcher
+            try:
+                super()._deliver(pending, logins)
+            finally:
+                login_notifier.mail_dispatcher = mail_dispatcher
+
+    return RecordingCoalescer(window=window), dispatcher
+
+
+def user(number: int):
+    return SimpleNamespace(id=number, email=f"user{number}@example.com", full_name=f"User {number}")
+
+
+def login(number: int) -> dict:
+    return {"time": f"2026-01-01 00:00:{number:02d} UTC", "ip": "10.0.0.1", "device": "Firefox"}
+
+
+def test_first_login_is_sent_at_once():
+    notifier, dispatcher = make_notifier()
+
+    async def run():
+        notifier.record(user(1), login(0))
+        # No waiting for the window
+        assert dispatcher.sent == [("user1@example.com", NOTIFICATION)]
+        await asyncio.sleep(WINDOW * 2)
+        # Nothing followed, so the window closes silently
+        assert len(dispatcher.sent) == 1
+        assert notifier.stats()["pending_users"] == 0
+
+        # The next login opens a new window and is again sent at once
+        notifier.record(user(1), login(1))
+        assert len(dispatcher.sent) == 2
+        await asyncio.sleep(WINDOW * 2)
+
+    asyncio.run(run())
+    assert notifier.stats()["single_notifications"] == 2 and notifier.stats()["digests"] == 0
+    print("✅ the first login in a window is notified immediately")
+
+
+def test_following_logins_are_coalesced():
+    notifier, dispatcher = make_notifier()
+
+    async def run():
+        notifier.record(user(1), login(0))
+        notifier.record(user(2), login(0))
+        for number in range(1, 4):
+            notifier.record(user(1), login(number))
+        notifier.record(user(2), login(1))
+        assert len(dispatcher.sent) == 2
+        assert notifier.stats()["pending_events"] == 4
+
+        await asyncio.sleep(WINDOW * 1.5)
+        assert sorted(dispatcher.sent[2:]) == [("user1@example.com", DIGEST), ("user2@example.com", NOTIFICATION)]
+
+        # Still within the follow-up window: a new login keeps being buffered
+        notifier.record(user(1), login(4))
+        assert len(dispatcher.sent) == 4
+        await asyncio.sleep(WINDOW * 3)
+        assert dispatcher.sent[4:] == [("user1@example.com", NOTIFICATION)]
+        assert notifier.stats()["pending_users"] == 0
+
+    asyncio.run(run())
+    stats = notifier.stats()
+    assert stats["events"] == 7 and stats["coalesced"] == 5
+    assert stats["digests"] == 1 and stats["single_notifications"] == 4
+    assert stats["emails_saved"] == 2
+    print("✅ logins during the window are sent together when it closes")
+
+
+def test_a_burst_costs_one_email_per_window():
+    notifier, dispatcher = make_notifier()
+
+    async def run():
+        for number in range(50):
+            notifier.record(user(1), login(number))
+            await asyncio.sleep(WINDOW / 10)
+        notifier.flush_all()
+
+    asyncio.run(run())
+    windows = len(dispatcher.sent) - 1
+    assert [subject for _, subject in dispatcher.sent[:2]] == [NOTIFICATION, DIGEST]
+    # 50 logins spread over about five windows
+    assert 3 <= windows <= 8, dispatcher.sent
+    assert notifier.stats()["pending_events"] == 0
+    print(f"✅ 50 logins over {windows} windows sent as {len(dispatcher.sent)} emails")
+
+
+def test_zero_window_sends_every_login():
+    notifier, dispatcher = make_notifier(window=0)
+    for number in range(3):
+        notifier.record(user(1), login(number))
+    assert [subject for _, subject in dispatcher.sent] == [NOTIFICATION] * 3
+    assert notifier.stats()["pending_users"] == 0
+    print("✅ a zero window sends every login on its own")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing login notifications...")
+    print("=" * 50)
+
+    try:
+        test_first_login_is_sent_at_once()
+        test_following_logins_are_coalesced()
+        test_a_burst_costs_one_email_per_window()
+        test_zero_window_sends_every_login()
+        print("\n🎉 Login notifications are coalesced.")
+    except AssertionError as e:
+        print(f"\n💥 {str(e) or 'Check failed'}")
+        sys.exit(1)
@@ -0,0 +1,179 @@
+"""
+Check the in-process mail queue against a stub SMTP client: queued mail is
+delivered over reused connections, a full queue drops new mail instead of
+blocking the handler, shutdown drains what is queued (up to the timeout),
+and the queue survives the app being restarted on a new event loop.
+"""
+
+import asyncio
+import sys
+
+from test_support import use_test_database
+
+
+class StubSMTPClient:
+    """Stands in for aiosmtplib.SMTP and records what it sends."""
+
+    def __init__(self, outbox: list, gate: asyncio.Event, delay: float):
+        self.outbox = outbox
+        self.gate = gate
+        self.delay = delay
+        self.is_connected = False
+
+    async def connect(self):
+        self.is_connected = True
+
+    async def sendmail(self, sender, recipients, data):
+        await self.gate.wait()
+        await asyncio.sleep(self.delay)
+        self.outbox.append((sender, tuple(recipients), data))
+
+    def close(self):
+        self.is_connected = False
+
+
+def make_dispatcher(max_queue: int = 100, senders: int = 2, delay: float = 0.0):
+    """A dispatcher whose senders use StubSMTPClient connections.
+
+    Returns (dispatcher, outbox, connections, gate); sends wait until gate is set.
+    """
+    use_test_database()
+    from app.services.mail_dispatcher import MailDispatcher
+
+    outbox, connections = [], []
+    gate = asyncio.Event()
+    gate.set()
+
+    class StubDispatcher(MailDispatcher):
+        def _new_client(self):
+            client = StubSMTPClient(outbox, gate, delay)
+            connections.append(client)
+            return client
+
+    return StubDispatcher(max_queue=max_queue, senders=senders), outbox, connections, gate
+
+
+def message(number: int):
+    from app.services.email_templates import RenderedEmail
+
+    return RenderedEmail("noreply@example.com", f"user{number}@example.com", f"Message {number}", b"Hello")
+
+
+def aiosmtplib_installed() -> bool:
+    use_test_database()
+    from app.services import mail_dispatcher
+
+    if not mail_dispatcher.AIOSMTPLIB_AVAILABLE:
+        print("⚠️ aiosmtplib is not installed, skipping")
+        return False
+    return True
+
+
+def test_queued_mail_is_delivered():
+    if not aiosmtplib_installed():
+        return
+    dispatcher, outbox, connections, _ = make_dispatcher(senders=2)
+
+    async def run():
+        for number in range(10):
+            assert dispatcher.enqueue(message(number), "test message")
+        await dispatcher.drain(timeout=5)
+
+    asyncio.run(run())
+    stats = dispatcher.stats()
+    assert sorted(recipients[0] for _, recipients, _ in outbox) == sorted(f"user{n}@example.com" for n in range(10))
+    assert stats["enqueued"] == stats["sent"] == 10 and stats["failed"] == stats["dropped"] == 0
+    # One connection per sender, reused for every message
+    assert len(connections) <= 2
+    print(f"✅ 10 messages delivered over {len(connections)} connections")
+
+
+def test_full_queue_drops_instead_of_blocking():
+    if not aiosmtplib_installed():
+        return
+    dispatcher, outbox, _, gate = make_dispatcher(max_queue=3, senders=1)
+
+    async def run():
+        gate.clear()
+        assert dispatcher.enqueue(message(0), "test message")
+        # The sender takes the first message and waits on the gate
+        await asyncio.sleep(0.01)
+        accepted = [dispatcher.enqueue(message(number), "test message") for number in range(1, 6)]
+        assert accepted == [True, True, True, False, False]
+        assert dispatcher.stats()["depth"] == 3
+        gate.set()
+        await dispatcher.drain(timeout=5)
+
+    asyncio.run(run())
+    stats = dispatcher.stats()
+    assert len(outbox) == stats["sent"] == 4 and stats["dropped"] == 2
+    assert stats["peak_depth"] == 3
+    print("✅ a full queue drops new mail and reports it in stats")
+
+
+def test_shutdown_drains_the_queue():
+    if not aiosmtplib_installed():
+        return
+    dispatcher, outbox, _, _ = make_dispatcher(senders=1, delay=0.02)
+
+    async def run():
+        for number in range(5):
+            dispatcher.enqueue(message(number), "test message")
+        await dispatcher.drain(timeout=5)
+        assert len(outbox) == 5
+        # Mail after shutdown started is refused
+        assert not dispatcher.enqueue(message(5), "test message")
+
+    asyncio.run(run())
+    assert dispatcher.stats()["dropped"] == 1
+    print("✅ shutdown delivers queued mail before stopping")
+
+    slow, outbox, _, _ = make_dispatcher(senders=1, delay=1.0)
+
+    async def run_slow():
+        for number in range(5):
+            slow.enqueue(message(number), "test message")
+        started = asyncio.get_running_loop().time()
+        await slow.drain(timeout=0.2)
+        return asyncio.get_running_loop().time() - started
+
+    elapsed = asyncio.run(run_slow())
+    assert elapsed < 1.0 and slow.stats()["sent"] == 0
+    print(f"✅ draining gives up after the timeout ({elapsed:.2f}s)")
+
+
+def test_survives_a_new_event_loop():
+    if not aiosmtplib_installed():
+        return
+    dispatcher, outbox, _, _ = make_dispatcher(senders=1)
+
+    async def send(number):
+        dispatcher.enqueue(message(number), "test message")
+        await asyncio.sleep(0.01)
+
+    # Senders started on a loop that then closes without draining
+    asyncio.run(send(0))
+
+    async def restarted():
+        dispatcher.start()
+        await send(1)
+        await dispatcher.drain(timeout=5)
+
+    asyncio.run(restarted())
+    assert [recipients[0] for _, recipients, _ in outbox] == ["user0@example.com", "user1@example.com"]
+    print("✅ the queue restarts its senders on a new event loop")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing the mail queue...")
+    print("=" * 50)
+
+    try:
+        test_queued_mail_is_delivered()
+        test_full_queue_drops_instead_of_blocking()
+        test_shutdown_drains_the_queue()
+        test_survives_a_new_event_loop()
+        print("\n🎉 Mail is queued, shed and drained.")
+    except AssertionError as e:
+        print(f"\n💥 {str(e) or 'Check failed'}")
+        sys.exit(1)
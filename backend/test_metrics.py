@@ -0,0 +1,58 @@
+"""
+Check that the runtime metrics are only served to scrapers holding
+METRICS_TOKEN, and are off when no token is configured.
+"""
+
+import sys
+from contextlib import contextmanager
+
+from test_support import app_client, register_user, use_test_database
+
+METRICS_TOKEN = "test-metrics-token"
+
+
+@contextmanager
+def metrics_token(token):
+    """Set METRICS_TOKEN for the duration of a check."""
+    use_test_database()
+    from app.core.config import settings
+
+    previous = settings.METRICS_TOKEN
+    settings.METRICS_TOKEN = token
+    try:
+        yield
+    finally:
+        settings.METRICS_TOKEN = previous
+
+
+def test_metrics_are_off_without_a_token():
+    with metrics_token(None), app_client() as client:
+        assert client.get("/metrics").status_code == 404
+        assert client.get("/metrics", headers={"Authorization": "Bearer anything"}).status_code == 404
+    print("✅ /metrics answers 404 when METRICS_TOKEN is not set")
+
+
+def test_metrics_need_the_token():
+    with metrics_token(METRICS_TOKEN), app_client() as client:
+        assert client.get("/metrics").status_code == 401
+        assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
+        # A user's access token is not enough
+        assert client.get("/metrics", headers=register_user(client)).status_code == 401
+
+        response = client.get("/metrics", headers={"Authorization": f"Bearer {METRICS_TOKEN}"})
+        assert response.status_code == 200, response.text
+        assert {"pid", "database_pool", "mail_queue", "rate_limits"} <= set(response.json())
+    print("✅ /metrics is only served with the metrics token")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing the metrics endpoint...")
+    print("=" * 50)
+
+    try:
+        test_metrics_are_off_without_a_token()
+        test_metrics_need_the_token()
+        print("\n🎉 Metrics are protected.")
+    except AssertionError as e:
+        print(f"\n💥 {str(e) or 'Check failed'}")
+        sys.exit(1)
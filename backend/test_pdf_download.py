@@ -0,0 +1,154 @@
+"""
+Check PDF downloads: served from the render cache by content hash,
+re-rendered when the content changes or the cached file is gone, and
+answered with 304 when the client's ETag is current. Generation jobs serve
+their own artifact and are only marked failed once they stop retrying.
+"""
+
+import os
+import sys
+import time
+
+from test_support import SAMPLE_CV, app_client, register_user
+
+
+def test_downloads_use_the_render_cache():
+    with app_client() as client:
+        headers = register_user(client)
+        cv = client.post("/api/cv/", json=SAMPLE_CV, headers=headers).json()
+        url = f"/api/cv/{cv['id']}/pdf"
+
+        first = client.get(url, headers=headers)
+        assert first.status_code == 200
+        assert first.content.startswith(b"%PDF")
+        assert first.headers["x-pdf-cache"] == "miss"
+
+        second = client.get(url, headers=headers)
+        assert second.headers["x-pdf-cache"] == "hit"
+        assert second.content == first.content
+        assert second.headers["etag"] == first.headers["etag"]
+
+        not_modified = client.get(url, headers=dict(headers, **{"If-None-Match": first.headers["etag"]}))
+        assert not_modified.status_code == 304
+
+        client.put(f"/api/cv/{cv['id']}", json={"color_scheme": "blue"}, headers=headers)
+        changed = client.get(url, headers=headers)
+        assert changed.headers["x-pdf-cache"] == "miss"
+        assert changed.headers["etag"] != first.headers["etag"]
+
+        # An evicted file is rendered again
+        from app.services.pdf_cache import pdf_render_cache
+        os.remove(pdf_render_cache.path_for(changed.headers["etag"].strip('"')))
+        again = client.get(url, headers=headers)
+        assert again.status_code == 200
+        assert again.headers["x-pdf-cache"] == "miss"
+    print("✅ downloads are served from the render cache and refilled on a miss")
+
+
+def wait_for_job(client, headers, cv_id, task_id, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = client.get(f"/api/cv/{cv_id}/pdf-status/{task_id}", headers=headers).json()
+        if job["status"] in ("completed", "failed"):
+            return job
+        time.sleep(0.1)
+    raise AssertionError(f"PDF job {task_id} did not finish")
+
+
+def test_generated_cv_links_to_its_download():
+    with app_client() as client:
+        headers = register_user(client)
+        cv = client.post("/api/cv/", json=SAMPLE_CV, headers=headers).json()
+
+        task_id = client.post(f"/api/cv/{cv['id']}/generate-pdf", headers=headers).json()["task_id"]
+        job = wait_for_job(client, headers, cv["id"], task_id)
+        assert job["status"] == "completed", job
+
+        # A download URL, not a cache path the LRU may delete
+        pdf_url = client.get(f"/api/cv/{cv['id']}", headers=headers).json()["pdf_url"]
+        assert pdf_url == f"/api/cv/{cv['id']}/pdf", pdf_url
+        assert client.get(pdf_url, headers=headers).headers["x-pdf-cache"] == "hit"
+    print("✅ generated CVs link to their download endpoint")
+
+
+def test_jobs_serve_their_own_artifact():
+    from app.services.pdf_cache import pdf_render_cache
+
+    with app_client() as client:
+        headers = register_user(client)
+        cv = client.post("/api/cv/", json=SAMPLE_CV, headers=headers).json()
+
+        task_id = client.post(f"/api/cv/{cv['id']}/generate-pdf", headers=headers).json()["task_id"]
+        job = wait_for_job(client, headers, cv["id"], task_id)
+        url = job["download_url"]
+        assert url == f"/api/cv/{cv['id']}/pdf-status/{task_id}/download", url
+
+        first = client.get(url, headers=headers)
+        assert first.status_code == 200 and first.content.startswith(b"%PDF")
+        assert first.headers["x-pdf-cache"] == "hit"
+        content_hash = first.headers["etag"].strip('"')
+
+        # Evicted but unchanged: rendered again
+        os.remove(pdf_render_cache.path_for(content_hash))
+        assert client.get(url, headers=headers).headers["x-pdf-cache"] == "miss"
+
+        # Evicted and the CV has moved on: the job's PDF is gone
+        os.remove(pdf_render_cache.path_for(content_hash))
+        client.put(f"/api/cv/{cv['id']}", json={"color_scheme": "teal"}, headers=headers)
+        assert client.get(url, headers=headers).status_code == 410
+
+        assert client.get(f"/api/cv/{cv['id']}/pdf-status/pdf_missing/download",
+                          headers=headers).status_code == 404
+    print("✅ job downloads serve the job's cached artifact")
+
+
+def test_failures_are_final_only_on_the_last_attempt():
+    from app.models.database import SessionLocal
+    from app.models.models import PDFGeneration
+    from app.services.pdf_generator import pdf_generator
+
+    with app_client() as client:
+        headers = register_user(client)
+        # Content no other test renders, so the render cache misses
+        personal_info = dict(SAMPLE_CV["personal_info"], full_name="Never Rendered")
+        cv = client.post("/api/cv/", json=dict(SAMPLE_CV, personal_info=personal_info), headers=headers).json()
+        user_id = client.get("/api/auth/me", headers=headers).json()["id"]
+
+    def broken(cv, target):
+        raise RuntimeError("renderer crashed")
+
+    original = pdf_generator._create_pdf
+    pdf_generator._create_pdf = broken
+    try:
+        for final_attempt, expected in ((False, "pending"), (True, "failed")):
+            task_id = f"retry-{expected}"
+            try:
+                pdf_generator.generate_pdf(cv["id"], user_id, task_id, final_attempt=final_attempt)
+                raise AssertionError("generation should have failed")
+            except RuntimeError:
+                pass
+            db = SessionLocal()
+            try:
+                pdf_gen = db.query(PDFGeneration).filter(PDFGeneration.task_id == task_id).one()
+                assert pdf_gen.status == expected, (final_attempt, pdf_gen.status)
+                assert pdf_gen.error_message == "renderer crashed"
+            finally:
+                db.close()
+    finally:
+        pdf_generator._create_pdf = original
+    print("✅ failed attempts stay pending until the last retry")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing PDF downloads...")
+    print("=" * 50)
+
+    try:
+        test_downloads_use_the_render_cache()
+        test_generated_cv_links_to_its_download()
+        test_jobs_serve_their_own_artifact()
+        test_failures_are_final_only_on_the_last_attempt()
+        print("\n🎉 PDF downloads work.")
+    except AssertionError as e:
+        print(f"\n💥 {str(e) or 'Check failed'}")
+        sys.exit(1)
@@ -0,0 +1,127 @@
+"""
+Check the precomputed PDF style registry: every template and colour scheme
+is built once, lookups fall back to the defaults and rendered PDFs use the
+CV's template and colour.
+
+Prints how long a lookup takes compared with building the styles.
+"""
+
+import base64
+import re
+import sys
+import time
+import zlib
+from types import SimpleNamespace
+
+from test_support import SAMPLE_CV, use_test_database
+
+BENCH_CALLS = 100000
+
+
+def test_registry_covers_every_combination():
+    use_test_database()
+    from app.services.pdf_generator import COLOR_SCHEMES, STYLE_REGISTRY, TEMPLATE_LAYOUTS
+
+    # One layout per template the frontend's TemplateSelector offers
+    assert set(TEMPLATE_LAYOUTS) == {str(template_id) for template_id in range(1, 9)}
+    assert set(STYLE_REGISTRY) == {
+        (template_id, color_scheme) for template_id in TEMPLATE_LAYOUTS for color_scheme in COLOR_SCHEMES
+    }
+    for (template_id, color_scheme), styles in STYLE_REGISTRY.items():
+        layout = TEMPLATE_LAYOUTS[template_id]
+        assert styles['Normal'].fontName == layout['font']
+        assert styles['CustomHeader'].fontName == layout['bold_font']
+        assert styles['CustomHeader'].alignment == layout['header_alignment']
+        assert styles['SectionHeader'].textColor.hexval()[2:] == COLOR_SCHEMES[color_scheme][1:]
+
+    # Shared across requests, so they must not be modifiable
+    for mapping in (STYLE_REGISTRY, STYLE_REGISTRY[('1', 'blue')]):
+        try:
+            mapping['x'] = None
+            raise AssertionError("registry is writable")
+        except TypeError:
+            pass
+    print(f"✅ {len(STYLE_REGISTRY)} read-only style sets, one per template and colour")
+
+
+def test_lookup_falls_back_to_defaults():
+    use_test_database()
+    from app.services.pdf_generator import STYLE_REGISTRY, get_styles
+
+    assert get_styles('7', 'red') is STYLE_REGISTRY[('7', 'red')]
+    # The frontend's numeric ids and the names older CVs stored
+    assert get_styles(7, 'red') is STYLE_REGISTRY[('7', 'red')]
+    assert get_styles('classic', 'red') is STYLE_REGISTRY[('4', 'red')]
+    assert get_styles('unknown', 'red') is STYLE_REGISTRY[('1', 'red')]
+    assert get_styles('3', 'pink') is STYLE_REGISTRY[('3', 'blue')]
+    assert get_styles(None, None) is STYLE_REGISTRY[('1', 'blue')]
+    print("✅ numeric and legacy ids resolve, unknown templates and colours fall back to 1/blue")
+
+
+def test_numeric_template_ids_are_accepted():
+    use_test_database()
+    from app.schemas.schemas import CVCreate, CVUpdate
+
+    assert CVCreate(**dict(SAMPLE_CV, template_id=5)).template_id == '5'
+    assert CVCreate(**SAMPLE_CV).template_id == '1'
+    assert CVUpdate(template_id=7).template_id == '7'
+    print("✅ CVs accept the frontend's numeric template ids")
+
+
+def page_content(pdf: bytes) -> bytes:
+    """Decoded content streams of a ReportLab PDF (ASCII85 + Flate)."""
+    streams = re.findall(rb'stream\r?\n(.*?)endstream', pdf, re.S)
+    return b''.join(zlib.decompress(base64.a85decode(stream.strip(), adobe=True)) for stream in streams)
+
+
+def test_rendered_pdf_uses_the_cv_style():
+    use_test_database()
+    from app.services.pdf_generator import pdf_generator
+
+    def render(template_id, color_scheme):
+        cv = SimpleNamespace(**dict(SAMPLE_CV, template_id=template_id, color_scheme=color_scheme, projects=[]))
+        return pdf_generator.render_pdf_bytes(cv)
+
+    academic = render('7', 'red')
+    professional = render('1', 'red')
+    assert b'/Times-Bold' in academic and b'/Times-Bold' not in professional
+    # #dc2626 as a PDF fill colour
+    assert b'.862745 .14902 .14902 rg' in page_content(academic), "header colour missing"
+    assert b'.862745 .14902 .14902 rg' in page_content(professional)
+    assert b'.862745 .14902 .14902 rg' not in page_content(render('1', 'teal'))
+    print("✅ rendered PDFs use the CV's template fonts and colour")
+
+
+def test_lookup_speed():
+    use_test_database()
+    from app.services.pdf_generator import TEMPLATE_LAYOUTS, _build_styles, get_styles
+
+    keys = [('1', 'blue'), ('4', 'teal'), ('7', 'orange'), ('fancy', 'pink')]
+    started = time.perf_counter()
+    for call in range(BENCH_CALLS):
+        get_styles(*keys[call % len(keys)])
+    lookup_us = (time.perf_counter() - started) / BENCH_CALLS * 1e6
+
+    started = time.perf_counter()
+    for _ in range(200):
+        _build_styles(TEMPLATE_LAYOUTS['7'], '#0d9488')
+    build_us = (time.perf_counter() - started) / 200 * 1e6
+
+    print(f"✅ style lookup {lookup_us:.2f} µs vs {build_us:.0f} µs to build the styles")
+    assert lookup_us * 10 < build_us
+
+
+if __name__ == "__main__":
+    print("🧪 Testing PDF styles...")
+    print("=" * 50)
+
+    try:
+        test_registry_covers_every_combination()
+        test_lookup_falls_back_to_defaults()
+        test_numeric_template_ids_are_accepted()
+        test_rendered_pdf_uses_the_cv_style()
+        test_lookup_speed()
+        print("\n🎉 PDF styles are precomputed and applied.")
+    except AssertionError as e:
+        print(f"\n💥 {str(e) or 'Check failed'}")
+        sys.exit(1)
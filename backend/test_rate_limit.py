@@ -0,0 +1,185 @@
+"""
+Check the per-user token-bucket rate limits: an empty bucket answers 429
+with Retry-After, a batch costing more than the bucket holds answers 413
+without spending tokens, every PDF render is charged, buckets refill over
+time, and limits still hold on the in-process buckets when Redis is down.
+"""
+
+import asyncio
+import socket
+import sys
+import time
+from types import SimpleNamespace
+
+from test_support import SAMPLE_CV, app_client, register_user, use_test_database
+
+SUMMARY_REQUEST = {"full_name": "Test User", "current_summary": "Engineer"}
+
+
+def job_entries(count: int) -> dict:
+    return {"entries": [{"job_title": f"Engineer {n}", "company": "Acme"} for n in range(count)]}
+
+
+def closed_port() -> int:
+    """A local port nothing is listening on."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def make_limiter(redis_url=None, spec: str = "2/second"):
+    use_test_database()
+    from app.core.rate_limit import RateLimiter
+
+    return RateLimiter(
+        limits={"free": {"ai": spec}}, redis_url=redis_url, max_buckets=100, plan_ttl=60
+    )
+
+
+def test_empty_bucket_answers_429():
+    with app_client() as client:
+        headers = register_user(client)
+        limits = client.get("/api/auth/me/limits", headers=headers).json()["limits"]["ai"]
+        capacity = limits["limit"]
+        assert limits["remaining"] == capacity
+
+        for sent in range(capacity):
+            response = client.post("/api/ai/suggest-summary", json=SUMMARY_REQUEST, headers=headers)
+            assert response.status_code == 200, response.text
+            assert response.headers["X-RateLimit-Limit"] == str(capacity)
+            assert response.headers["X-RateLimit-Remaining"] == str(capacity - sent - 1)
+
+        response = client.post("/api/ai/suggest-summary", json=SUMMARY_REQUEST, headers=headers)
+        assert response.status_code == 429, response.text
+        retry_after = int(response.headers["Retry-After"])
+        # One token refills in period / capacity seconds
+        assert 1 <= retry_after <= limits["period_seconds"] // capacity
+        assert response.headers["X-RateLimit-Remaining"] == "0"
+
+        # Another user's bucket is untouched
+        other = register_user(client)
+        assert client.post("/api/ai/suggest-summary", json=SUMMARY_REQUEST, headers=other).status_code == 200
+    print(f"✅ request {capacity + 1} within the {capacity}-request limit is refused with 429, Retry-After {retry_after}s")
+
+
+def test_batch_larger_than_the_bucket_answers_413():
+    with app_client() as client:
+        headers = register_user(client)
+        capacity = client.get("/api/auth/me/limits", headers=headers).json()["limits"]["ai"]["limit"]
+
+        response = client.post("/api/ai/suggest-job-descriptions/batch", json=job_entries(capacity + 1), headers=headers)
+        assert response.status_code == 413, response.text
+        assert "Retry-After" not in response.headers
+        # Nothing was spent
+        limits = client.get("/api/auth/me/limits", headers=headers).json()["limits"]["ai"]
+        assert limits["remaining"] == capacity
+
+        response = client.post("/api/ai/suggest-job-descriptions/batch", json=job_entries(3), headers=headers)
+        assert response.status_code == 200, response.text
+        assert response.headers["X-RateLimit-Remaining"] == str(capacity - 3)
+
+        # Fits the bucket but not what is left of it: 429, not 413
+        response = client.post("/api/ai/suggest-job-descriptions/batch", json=job_entries(capacity), headers=headers)
+        assert response.status_code == 429, response.text
+    print(f"✅ a batch of {capacity + 1} entries is refused with 413, each entry costs a token")
+
+
+def test_pdf_renders_are_charged():
+    with app_client() as client:
+        headers = register_user(client)
+
+        def pdf_remaining():
+            return client.get("/api/auth/me/limits", headers=headers).json()["limits"]["pdf"]["remaining"]
+
+        def create_cv(number):
+            cv = dict(SAMPLE_CV, personal_info=dict(SAMPLE_CV["personal_info"], full_name=f"Rate Limit {number}"))
+            response = client.post("/api/cv/", json=cv, headers=headers)
+            assert response.status_code == 200, response.text
+            return response.json()["id"]
+
+        capacity = pdf_remaining()
+        cv_id = create_cv(0)
+        response = client.get(f"/api/cv/{cv_id}/pdf", headers=headers)
+        assert response.status_code == 200 and response.headers["X-PDF-Cache"] == "miss"
+        assert response.headers["X-RateLimit-Remaining"] == str(capacity - 1)
+
+        # Cached downloads render nothing and are free
+        response = client.get(f"/api/cv/{cv_id}/pdf", headers=headers)
+        assert response.status_code == 200 and response.headers["X-PDF-Cache"] == "hit"
+        assert "X-RateLimit-Remaining" not in response.headers
+        assert pdf_remaining() == capacity - 1
+
+        # An export renders every CV
+        create_cv(1)
+        response = client.post("/api/cv/export", headers=headers)
+        assert response.status_code == 200, response.text
+        assert response.headers["X-RateLimit-Remaining"] == str(capacity - 3)
+
+        for number in range(2, capacity + 1):
+            create_cv(number)
+        response = client.post("/api/cv/export", headers=headers)
+        assert response.status_code == 413, response.text
+        assert pdf_remaining() == capacity - 3
+    print(f"✅ uncached downloads and exports are charged per PDF, {capacity} a day on the free plan")
+
+
+def test_buckets_refill():
+    limiter = make_limiter()
+    user = SimpleNamespace(id=1, is_premium=False)
+
+    async def run():
+        decisions = [await limiter.check(user, "ai", db=None) for _ in range(3)]
+        assert [d.allowed for d in decisions] == [True, True, False]
+        assert 0 < decisions[2].retry_after <= 0.5
+        await asyncio.sleep(decisions[2].retry_after + 0.05)
+        assert (await limiter.check(user, "ai", db=None)).allowed
+        assert not (await limiter.check(user, "ai", db=None)).allowed
+
+    asyncio.run(run())
+    assert limiter.stats()["allowed"] == {"ai": 3} and limiter.stats()["limited"] == {"ai": 2}
+    print("✅ buckets refill at capacity / period tokens per second")
+
+
+def test_falls_back_to_memory_when_redis_is_down():
+    from app.core import rate_limit
+
+    if not rate_limit.REDIS_AVAILABLE:
+        print("⚠️ redis is not installed, skipping the fallback check")
+        return
+
+    limiter = make_limiter(redis_url=f"redis://127.0.0.1:{closed_port()}/0")
+    user = SimpleNamespace(id=1, is_premium=False)
+    assert limiter.stats()["backend"] == "redis"
+
+    async def run():
+        decisions = [await limiter.check(user, "ai", db=None) for _ in range(3)]
+        # Still enforced, not failing open
+        assert [d.allowed for d in decisions] == [True, True, False]
+        stats = limiter.stats()
+        assert stats["errors"] == 1 and stats["redis_fallback"] and stats["memory_buckets"] == 1
+
+        # Redis is tried again after REDIS_RETRY_AFTER_SECONDS
+        limiter._redis_down_until = time.monotonic()
+        assert not (await limiter.check(user, "ai", db=None)).allowed
+        assert limiter.stats()["errors"] == 2
+        await limiter.close()
+
+    asyncio.run(run())
+    print(f"✅ limits hold on in-process buckets while Redis is down, "
+          f"retried after {rate_limit.REDIS_RETRY_AFTER_SECONDS}s")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing rate limits...")
+    print("=" * 50)
+
+    try:
+        test_empty_bucket_answers_429()
+        test_batch_larger_than_the_bucket_answers_413()
+        test_pdf_renders_are_charged()
+        test_buckets_refill()
+        test_falls_back_to_memory_when_redis_is_down()
+        print("\n🎉 Rate limits are enforced.")
+    except AssertionError as e:
+        print(f"\n💥 {str(e) or 'Check failed'}")
+        sys.exit(1)
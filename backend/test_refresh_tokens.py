@@ -0,0 +1,139 @@
+"""
+Check refresh token sessions: refreshing rotates the token, replaying a
+rotated token after the grace period ends the whole session, a replay
+within it leaves the successor valid, logout ends the session and users can
+only revoke their own sessions.
+"""
+
+import sys
+from datetime import datetime, timedelta
+
+from test_support import app_client, register_and_login
+
+
+def refresh(client, refresh_token: str):
+    return client.post("/api/auth/refresh", json={"refresh_token": refresh_token})
+
+
+def auth(tokens: dict) -> dict:
+    return {"Authorization": f"Bearer {tokens['access_token']}"}
+
+
+def age_revocation(refresh_token: str, seconds: float):
+    """Move a rotated token's revocation seconds into the past."""
+    from app.core.auth import hash_refresh_token
+    from app.models.database import SessionLocal
+    from app.models.models import RefreshToken
+
+    db = SessionLocal()
+    try:
+        db.query(RefreshToken).filter(RefreshToken.token_hash == hash_refresh_token(refresh_token)).update(
+            {"revoked_at": datetime.utcnow() - timedelta(seconds=seconds)}
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+def test_refresh_rotates_the_token():
+    with app_client() as client:
+        first = register_and_login(client)
+        second = refresh(client, first["refresh_token"])
+        assert second.status_code == 200, second.text
+        second = second.json()
+        assert second["refresh_token"] != first["refresh_token"]
+        assert client.get("/api/auth/me", headers=auth(second)).status_code == 200
+
+        # Same session, still one entry in the session list
+        sessions = client.get("/api/auth/sessions", headers=auth(second)).json()
+        assert len(sessions) == 1 and sessions[0]["current"]
+
+        third = refresh(client, second["refresh_token"])
+        assert third.status_code == 200, third.text
+        assert refresh(client, "not-a-token").status_code == 401
+    print("✅ refreshing issues a new refresh token in the same session")
+
+
+def test_reuse_after_the_grace_period_revokes_the_session():
+    from app.core.config import settings
+
+    with app_client() as client:
+        first = register_and_login(client)
+        second = refresh(client, first["refresh_token"]).json()
+        third = refresh(client, second["refresh_token"]).json()
+
+        age_revocation(first["refresh_token"], settings.REFRESH_TOKEN_REUSE_GRACE_SECONDS + 1)
+        response = refresh(client, first["refresh_token"])
+        assert response.status_code == 401 and "revoked" in response.json()["detail"]
+
+        # The stolen token's whole family is gone, including the latest token
+        assert refresh(client, third["refresh_token"]).status_code == 401
+        assert client.get("/api/auth/sessions", headers=auth(third)).json() == []
+    print("✅ replaying a rotated token after the grace period ends the session")
+
+
+def test_reuse_within_the_grace_period_keeps_the_successor():
+    with app_client() as client:
+        first = register_and_login(client)
+        second = refresh(client, first["refresh_token"]).json()
+
+        # e.g. a second tab refreshing with the token it still had
+        response = refresh(client, first["refresh_token"])
+        assert response.status_code == 401
+
+        third = refresh(client, second["refresh_token"])
+        assert third.status_code == 200, third.text
+    print("✅ a replay within the grace period is refused without ending the session")
+
+
+def test_logout_ends_the_session():
+    with app_client() as client:
+        first = register_and_login(client)
+        other_device = register_and_login(client)
+        second = refresh(client, first["refresh_token"]).json()
+
+        response = client.post("/api/auth/logout", json={"refresh_token": second["refresh_token"]})
+        assert response.status_code == 200, response.text
+        assert refresh(client, second["refresh_token"]).status_code == 401
+        assert refresh(client, first["refresh_token"]).status_code == 401
+
+        # Unknown tokens are not an error, and other sessions are untouched
+        assert client.post("/api/auth/logout", json={"refresh_token": "not-a-token"}).status_code == 200
+        assert refresh(client, other_device["refresh_token"]).status_code == 200
+    print("✅ logout revokes the session's refresh tokens")
+
+
+def test_sessions_can_only_be_revoked_by_their_owner():
+    with app_client() as client:
+        owner = register_and_login(client)
+        intruder = register_and_login(client)
+        session_id = client.get("/api/auth/sessions", headers=auth(owner)).json()[0]["id"]
+
+        response = client.delete(f"/api/auth/sessions/{session_id}", headers=auth(intruder))
+        assert response.status_code == 404, response.text
+        assert client.delete("/api/auth/sessions/unknown", headers=auth(owner)).status_code == 404
+        assert refresh(client, owner["refresh_token"]).status_code == 200
+
+        member = register_and_login(client)
+        sessions = client.get("/api/auth/sessions", headers=auth(member)).json()
+        assert len(sessions) == 1
+        response = client.delete(f"/api/auth/sessions/{sessions[0]['id']}", headers=auth(member))
+        assert response.status_code == 200, response.text
+        assert refresh(client, member["refresh_token"]).status_code == 401
+    print("✅ deleting another user's session answers 404")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing refresh token sessions...")
+    print("=" * 50)
+
+    try:
+        test_refresh_rotates_the_token()
+        test_reuse_after_the_grace_period_revokes_the_session()
+        test_reuse_within_the_grace_period_keeps_the_successor()
+        test_logout_ends_the_session()
+        test_sessions_can_only_be_revoked_by_their_owner()
+        print("\n🎉 Refresh tokens rotate and revoke correctly.")
+    except AssertionError as e:
+        print(f"\n💥 {str(e) or 'Check failed'}")
+        sys.exit(1)
@@ -0,0 +1,225 @@
+"""
+Check the SMTP connection pool against a stub SMTP server: connections are
+reused, checked with NOOP after healthcheck_after, replaced after
+idle_timeout, and a send on a dropped connection is retried once on a new
+one.
+"""
+
+import smtplib
+import socket
+import socketserver
+import sys
+import threading
+import time
+from email.message import EmailMessage
+
+
+class StubSMTPServer(socketserver.ThreadingTCPServer):
+    """Minimal SMTP server recording the commands of each connection."""
+
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), StubSMTPHandler)
+        self.port = self.server_address[1]
+        self.lock = threading.Lock()
+        self.connections = []
+        self.accepted = 0
+        self.commands = []
+        self.delivered = 0
+        # Close the connection instead of answering this many MAIL commands
+        self.drop_on_mail = 0
+        self.reject_recipients = False
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    def log(self, connection: int, command: str):
+        with self.lock:
+            self.commands.append((connection, command))
+
+    def sent(self, command: str) -> int:
+        with self.lock:
+            return sum(1 for _, logged in self.commands if logged == command)
+
+    def drop_connections(self):
+        """Close every open connection from the server side."""
+        with self.lock:
+            connections, self.connections = self.connections, []
+        for connection in connections:
+            try:
+                connection.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def stop(self):
+        self.drop_connections()
+        self.shutdown()
+        self.server_close()
+
+
+class StubSMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line: str):
+        self.wfile.write((line + "\r\n").encode())
+
+    def handle(self):
+        stub = self.server
+        with stub.lock:
+            stub.connections.append(self.connection)
+            stub.accepted += 1
+            number = stub.accepted
+        self.reply("220 stub ESMTP")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode(errors="replace").split()[0].upper()
+            stub.log(number, command)
+            if command in ("EHLO", "HELO"):
+                self.reply("250 stub")
+            elif command == "MAIL":
+                with stub.lock:
+                    drop = stub.drop_on_mail > 0
+                    stub.drop_on_mail -= drop
+                if drop:
+                    return
+                self.reply("250 ok")
+            elif command == "RCPT":
+                self.reply("550 no such user" if stub.reject_recipients else "250 ok")
+            elif command == "DATA":
+                self.reply("354 go ahead")
+                while self.rfile.readline() not in (b".\r\n", b""):
+                    pass
+                with stub.lock:
+                    stub.delivered += 1
+                self.reply("250 queued")
+            elif command == "QUIT":
+                self.reply("221 bye")
+                return
+            else:
+                self.reply("250 ok")
+
+
+def message(number: int = 1) -> EmailMessage:
+    msg = EmailMessage()
+    msg["From"] = "noreply@example.com"
+    msg["To"] = "user@example.com"
+    msg["Subject"] = f"Message {number}"
+    msg.set_content("Hello")
+    return msg
+
+
+def make_pool(stub, **options):
+    from app.services.smtp_pool import SMTPConnectionPool
+
+    options.setdefault("healthcheck_after", 60)
+    return SMTPConnectionPool(lambda: smtplib.SMTP("127.0.0.1", stub.port, timeout=5), **options)
+
+
+def test_connections_are_reused():
+    stub = StubSMTPServer()
+    try:
+        pool = make_pool(stub)
+        for number in range(3):
+            pool.send_message(message(number))
+        stats = pool.stats()
+        assert stub.delivered == 3
+        assert stats["created"] == 1 and stats["reused"] == 2 and stats["idle"] == 1
+        assert stub.accepted == 1 and stub.sent("NOOP") == 0
+        pool.close_all()
+    finally:
+        stub.stop()
+    print("✅ one connection carries consecutive messages")
+
+
+def test_noop_healthcheck_replaces_dead_connections():
+    stub = StubSMTPServer()
+    try:
+        pool = make_pool(stub, healthcheck_after=0.05)
+        pool.send_message(message(1))
+        time.sleep(0.1)
+        pool.send_message(message(2))
+        assert stub.sent("NOOP") == 1
+        assert pool.stats()["reused"] == 1
+
+        # The server hangs up while the connection is idle: NOOP fails, a new one is made
+        stub.drop_connections()
+        time.sleep(0.1)
+        pool.send_message(message(3))
+        stats = pool.stats()
+        assert stub.delivered == 3
+        assert stats["created"] == 2 and stats["discarded"] == 1
+        pool.close_all()
+    finally:
+        stub.stop()
+    print("✅ connections idle past healthcheck_after are checked with NOOP")
+
+
+def test_idle_timeout_reconnects():
+    stub = StubSMTPServer()
+    try:
+        pool = make_pool(stub, idle_timeout=0.05, healthcheck_after=0.01)
+        pool.send_message(message(1))
+        time.sleep(0.1)
+        pool.send_message(message(2))
+        stats = pool.stats()
+        assert stats["created"] == 2 and stats["reused"] == 0 and stats["discarded"] == 1
+        # Closed politely, without a NOOP first
+        assert stub.sent("QUIT") == 1 and stub.sent("NOOP") == 0
+        assert stub.delivered == 2
+        pool.close_all()
+    finally:
+        stub.stop()
+    print("✅ connections idle past idle_timeout are replaced")
+
+
+def test_dropped_connection_is_retried_once():
+    stub = StubSMTPServer()
+    try:
+        pool = make_pool(stub)
+        pool.send_message(message(1))
+
+        # Dropped mid-send (no NOOP, the connection is fresh): retried on a new connection
+        stub.drop_on_mail = 1
+        pool.send_message(message(2))
+        stats = pool.stats()
+        assert stub.delivered == 2
+        assert stats["created"] == 2 and stats["discarded"] == 1 and stats["in_use"] == 0
+
+        # Only once: a second drop is raised
+        stub.drop_on_mail = 2
+        try:
+            pool.send_message(message(3))
+            raise AssertionError("the send should have failed")
+        except smtplib.SMTPServerDisconnected:
+            pass
+        assert stub.delivered == 2
+        assert pool.stats()["created"] == 3 and pool.stats()["in_use"] == 0
+
+        # Refused messages are not the connection's fault and are not retried
+        stub.reject_recipients = True
+        mail_before = stub.sent("MAIL")
+        try:
+            pool.send_message(message(4))
+            raise AssertionError("the send should have been refused")
+        except smtplib.SMTPRecipientsRefused:
+            pass
+        assert stub.sent("MAIL") == mail_before + 1
+        pool.close_all()
+    finally:
+        stub.stop()
+    print("✅ a send on a dropped connection is retried once, refusals are not")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing the SMTP connection pool...")
+    print("=" * 50)
+
+    try:
+        test_connections_are_reused()
+        test_noop_healthcheck_replaces_dead_connections()
+        test_idle_timeout_reconnects()
+        test_dropped_connection_is_retried_once()
+        print("\n🎉 SMTP connections are pooled and recovered.")
+    except AssertionError as e:
+        print(f"\n💥 {str(e) or 'Check failed'}")
+        sys.exit(1)
@@ -0,0 +1,73 @@
+"""
+Check the shared AI suggestion pools: placeholders, pool thresholds and that
+no part of one user's name or company is served to another user.
+"""
+
+import asyncio
+import sys
+
+from test_support import use_test_database
+
+
+def memory_cache(min_pool: int = 2):
+    use_test_database()
+    from app.services.suggestion_cache import SuggestionCache
+    return SuggestionCache(redis_url=None, ttl=60, maxsize=100, min_pool=min_pool, max_pool=10)
+
+
+def test_pools_are_templated_and_refilled_per_user():
+    cache = memory_cache()
+    key = ("summary", "professional_summary")
+
+    async def run():
+        assert await cache.sample(key, 1, {"full_name": "Alice Smith"}) is None
+        await cache.add(key, [
+            "Alice Smith is a backend engineer who ships reliable systems.",
+            "Results-driven engineer; ALICE SMITH leads with empathy.",
+        ], {"full_name": "Alice Smith"})
+        return await cache.sample(key, 2, {"full_name": "Bob Jones"})
+
+    suggestions = asyncio.run(run())
+    assert suggestions is not None and len(suggestions) == 2
+    assert all("Bob Jones" in text for text in suggestions)
+    assert not any("alice" in text.lower() for text in suggestions)
+    print("✅ pooled suggestions are re-filled with the requesting user's name")
+
+
+def test_partial_names_and_companies_are_not_pooled():
+    cache = memory_cache(min_pool=1)
+    summary_key = ("summary", "professional_summary")
+    job_key = ("job_description", "engineer", "engineering", "work_experience")
+
+    async def run():
+        await cache.add(summary_key, [
+            "Alice is a versatile engineer. Alice Smith brings ten years of experience.",
+            "Ms. Smith mentors junior developers.",
+        ], {"full_name": "Alice Smith"})
+        await cache.add(job_key, [
+            "Led the Acme platform team at Acme Corp.",
+            "Scaled the billing service at Acme Corp to 2M invoices a month.",
+        ], {"company": "Acme Corp"})
+        return (
+            await cache.sample(summary_key, 5, {"full_name": "Bob Jones"}),
+            await cache.sample(job_key, 5, {"company": "Globex"}),
+        )
+
+    summaries, bullets = asyncio.run(run())
+    assert summaries is None, summaries
+    assert bullets == ["Scaled the billing service at Globex to 2M invoices a month."], bullets
+    assert cache.stats()["withheld"] == 3
+    print("✅ suggestions still naming part of the user or company are withheld")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing the AI suggestion cache...")
+    print("=" * 50)
+
+    try:
+        test_pools_are_templated_and_refilled_per_user()
+        test_partial_names_and_companies_are_not_pooled()
+        print("\n🎉 Suggestion pools are safe to share.")
+    except AssertionError as e:
+        print(f"\n💥 {str(e) or 'Check failed'}")
+        sys.exit(1)
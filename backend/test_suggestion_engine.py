@@ -0,0 +1,97 @@
+"""
+Check the offline suggestion engine: title classification, seeded sampling,
+lazy loading and lookup speed.
+
+Prints a benchmark of suggestions per second over a mix of job titles.
+"""
+
+import sys
+import time
+
+BENCH_TITLES = [
+    "Senior Software Engineer", "Junior Frontend Developer", "Data Scientist",
+    "Sales Manager", "Marketing Intern", "Lead UX Designer", "Registered Nurse",
+    "Financial Analyst", "Mechanical Engineer", "Customer Support Agent",
+    "HR Business Partner", "Head of Operations", "Barista", "Maths Teacher",
+]
+BENCH_CALLS = 20000
+MAX_LOOKUP_MS = 1.0
+
+
+def fresh_engine():
+    from app.services.suggestion_engine import CORPUS_PATH, SuggestionEngine
+    return SuggestionEngine(CORPUS_PATH)
+
+
+def test_titles_are_classified_by_family_and_seniority():
+    engine = fresh_engine()
+    assert engine.classify("Senior Software Engineer") == ("software", "senior")
+    assert engine.classify("Jr. Front-End Developer") == ("software", "entry")
+    assert engine.classify("Sales Manager") == ("sales", "mid")
+    assert engine.classify("Head of Data Science") == ("data", "lead")
+    assert engine.classify("Mechanical Engineer") == ("engineering", "mid")
+    assert engine.classify("Barista") == ("other", "mid")
+    print("✅ titles classified by family and seniority")
+
+
+def test_sampling_is_seeded_and_filled():
+    engine = fresh_engine()
+    first = engine.job_descriptions("Backend Developer", "Acme", 5)
+    assert first == engine.job_descriptions("backend developer", " Acme ", 5)
+    assert len(set(first)) == 5
+    assert all("{" not in text for text in first)
+    assert engine.job_descriptions("Backend Developer", "Acme", 5, seed=1) == \
+        engine.job_descriptions("Backend Developer", "Acme", 5, seed=1)
+    assert engine.job_descriptions("Backend Developer", "Globex", 5) != first
+
+    summary = engine.summary("Ada Lovelace", "Backend developer who likes tests")
+    assert "Ada Lovelace" in summary
+    assert summary == engine.summary("Ada Lovelace", "Backend developer who likes tests")
+    print("✅ sampling is seeded and placeholders are filled")
+
+
+def test_corpus_loads_lazily_once():
+    engine = fresh_engine()
+    assert not engine.stats()["loaded"]
+    engine.classify("Developer")
+    stats = engine.stats()
+    assert stats["loaded"] and stats["families"] > 1 and stats["templates"] > 100
+    load_ms = stats["load_ms"]
+    engine.classify("Designer")
+    assert engine.stats()["load_ms"] == load_ms
+    print(f"✅ corpus loaded on first use in {load_ms:.1f} ms: "
+          f"{stats['families']} families, {stats['keywords']} keywords, {stats['templates']} templates")
+
+
+def test_lookup_speed():
+    engine = fresh_engine()
+    engine.classify("warm up")
+
+    slowest = 0.0
+    started = time.perf_counter()
+    for call in range(BENCH_CALLS):
+        title = BENCH_TITLES[call % len(BENCH_TITLES)]
+        call_started = time.perf_counter()
+        engine.job_descriptions(title, f"Company {call}", 5)
+        slowest = max(slowest, time.perf_counter() - call_started)
+    elapsed = time.perf_counter() - started
+
+    per_call_us = elapsed / BENCH_CALLS * 1e6
+    print(f"✅ {BENCH_CALLS} requests in {elapsed:.2f}s: {per_call_us:.1f} µs each, "
+          f"{BENCH_CALLS * 5 / elapsed:,.0f} suggestions/sec, slowest {slowest * 1000:.2f} ms")
+    assert per_call_us < MAX_LOOKUP_MS * 1000
+
+
+if __name__ == "__main__":
+    print("🧪 Testing the offline suggestion engine...")
+    print("=" * 50)
+
+    try:
+        test_titles_are_classified_by_family_and_seniority()
+        test_sampling_is_seeded_and_filled()
+        test_corpus_loads_lazily_once()
+        test_lookup_speed()
+        print("\n🎉 Offline suggestions work.")
+    except AssertionError as e:
+        print(f"\n💥 {str(e) or 'Check failed'}")
+        sys.exit(1)
@@ -0,0 +1,88 @@
+"""
+Helpers shared by the root-level test scripts: a throwaway SQLite database,
+an app client and registered users.
+"""
+
+import os
+import tempfile
+import uuid
+from contextlib import contextmanager
+
+TEST_DATABASE_PATH = "/tmp/smartcv_test.db"
+
+SAMPLE_CV = {
+    "title": "My CV",
+    "personal_info": {
+        "full_name": "Test User",
+        "email": "test@example.com",
+        "phone": "123",
+        "profile_summary": "Engineer with ten years of experience building reliable backend systems."
+    },
+    "education": [{
+        "school_name": "University", "degree": "BSc", "field_of_study": "CS",
+        "start_date": "01/2010", "end_date": "06/2014"
+    }],
+    "experience": [{
+        "job_title": "Engineer", "company_name": "Acme", "start_date": "01/2015",
+        "job_description": ["Developed 3 services", "Fixed production issues"]
+    }],
+    "skills": [{"skill_name": "Python"}],
+    "color_scheme": "green"
+}
+
+
+def use_test_database():
+    """Point the app at a fresh SQLite file unless DATABASE_URL is set,
+    and at an empty PDF cache directory.
+
+    Must run before the app is imported; later calls are no-ops.
+    """
+    if "DATABASE_URL" not in os.environ:
+        if os.path.exists(TEST_DATABASE_PATH):
+            os.remove(TEST_DATABASE_PATH)
+        os.environ["DATABASE_URL"] = f"sqlite:///{TEST_DATABASE_PATH}"
+    if "PDF_CACHE_DIR" not in os.environ:
+        os.environ["PDF_CACHE_DIR"] = tempfile.mkdtemp(prefix="smartcv_pdf_cache_")
+
+
+def app_client():
+    """TestClient for the app with the schema created."""
+    use_test_database()
+    from fastapi.testclient import TestClient
+    from app.models.database import Base, engine
+    import main
+
+    Base.metadata.create_all(bind=engine)
+    return TestClient(main.app)
+
+
+def register_and_login(client, password: str = "pw123456") -> dict:
+    """Register and log in a new user; return the login's token response."""
+    email = f"user-{uuid.uuid4().hex[:12]}@example.com"
+    response = client.post("/api/auth/register", json={
+        "email": email, "full_name": "Test User", "password": password
+    })
+    assert response.status_code == 200, response.text
+    response = client.post("/api/auth/login", json={"email": email, "password": password})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def register_user(client, password: str = "pw123456") -> dict:
+    """Register and log in a new user; return its auth headers."""
+    return {"Authorization": f"Bearer {register_and_login(client, password)['access_token']}"}
+
+
+@contextmanager
+def rate_limits_off():
+    """Disable the per-user rate limits for checks that fire more requests
+    than a plan allows; they are restored on exit."""
+    use_test_database()
+    from app.core.rate_limit import rate_limiter
+
+    enabled = rate_limiter.enabled
+    rate_limiter.enabled = False
+    try:
+        yield
+    finally:
+        rate_limiter.enabled = enabled
@@ -0,0 +1,129 @@
+"""
+Check that the user cache behind get_current_user never serves a stale user:
+profile updates, email verification, 2FA changes and plan changes from
+payments are visible on the next request.
+"""
+
+import asyncio
+import sys
+import uuid
+
+from test_support import app_client, register_user
+
+
+def user_id(client, headers) -> int:
+    response = client.get("/api/auth/me", headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()["id"]
+
+
+def cached(user_id: int):
+    from app.core.auth import user_cache
+
+    return user_cache.get(user_id)
+
+
+def stored(user_id: int):
+    """The user as stored in the database."""
+    from app.models.database import SessionLocal
+    from app.models.models import User
+
+    db = SessionLocal()
+    try:
+        return db.get(User, user_id)
+    finally:
+        db.close()
+
+
+def run_with_session(handler, payload):
+    """Call a payments handler with a request-style database session."""
+    from app.models.database import get_async_db
+
+    async def run():
+        sessions = get_async_db()
+        db = await sessions.__anext__()
+        try:
+            await handler(payload, db)
+        finally:
+            await sessions.aclose()
+
+    asyncio.run(run())
+
+
+def test_profile_updates_are_not_served_from_the_cache():
+    with app_client() as client:
+        headers = register_user(client)
+        user = user_id(client, headers)
+        assert cached(user) is not None
+
+        response = client.put("/api/auth/me", json={"full_name": "New Name"}, headers=headers)
+        assert response.status_code == 200, response.text
+        assert cached(user) is None
+        assert client.get("/api/auth/me", headers=headers).json()["full_name"] == "New Name"
+    print("✅ a profile update is visible on the next request")
+
+
+def test_2fa_changes_are_not_served_from_the_cache():
+    with app_client() as client:
+        headers = register_user(client)
+        user = user_id(client, headers)
+
+        token = stored(user).email_verification_token
+        assert client.post("/api/auth/verify-email", json={"token": token}).status_code == 200
+        assert cached(user) is None
+        assert client.get("/api/auth/2fa/status", headers=headers).json()["email_verified"]
+
+        response = client.post("/api/auth/2fa/setup", json={"password": "pw123456"}, headers=headers)
+        assert response.status_code == 200, response.text
+        assert cached(user) is None
+        assert client.get("/api/auth/me", headers=headers).json()["two_factor_enabled"]
+
+        # Disabling asks for a code first, then takes it
+        disable = {"password": "pw123456", "verification_code": "000000"}
+        assert client.post("/api/auth/2fa/disable", json=disable, headers=headers).status_code == 202
+        disable["verification_code"] = stored(user).two_factor_code
+        response = client.post("/api/auth/2fa/disable", json=disable, headers=headers)
+        assert response.status_code == 200, response.text
+        assert cached(user) is None
+        assert not client.get("/api/auth/me", headers=headers).json()["two_factor_enabled"]
+    print("✅ email verification and enabling or disabling 2FA are visible on the next request")
+
+
+def test_plan_changes_are_not_served_from_the_cache():
+    from app.api.payments import handle_subscription_cancellation, handle_successful_payment
+
+    with app_client() as client:
+        headers = register_user(client)
+        user = user_id(client, headers)
+        assert client.get("/api/auth/me/limits", headers=headers).json()["plan"] == "free"
+        assert cached(user) is not None
+
+        subscription_id = f"sub_{uuid.uuid4().hex[:12]}"
+        run_with_session(handle_successful_payment, {
+            "metadata": {"user_id": str(user), "plan": "pro"},
+            "customer": "cus_test",
+            "subscription": subscription_id
+        })
+        assert cached(user) is None
+        assert client.get("/api/auth/me", headers=headers).json()["is_premium"]
+        assert client.get("/api/auth/me/limits", headers=headers).json()["plan"] == "pro"
+
+        run_with_session(handle_subscription_cancellation, {"id": subscription_id})
+        assert cached(user) is None
+        assert not client.get("/api/auth/me", headers=headers).json()["is_premium"]
+        assert client.get("/api/auth/me/limits", headers=headers).json()["plan"] == "free"
+    print("✅ upgrades and cancellations change the plan on the next request")
+
+
+if __name__ == "__main__":
+    print("🧪 Testing the user cache...")
+    print("=" * 50)
+
+    try:
+        test_profile_updates_are_not_served_from_the_cache()
+        test_2fa_changes_are_not_served_from_the_cache()
+        test_plan_changes_are_not_served_from_the_cache()
+        print("\n🎉 Cached users are invalidated on every change.")
+    except AssertionError as e:
+        print(f"\n💥 {str(e) or 'Check failed'}")
+        sys.exit(1)
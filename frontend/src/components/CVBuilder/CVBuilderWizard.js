@@ -54,7 +54,7 @@ const CVBuilderWizard = ({ cvId }) => {
       setIsLoading(true);
       const response = await cvService.getCV(cvId);
       setCvData(response.data);
-      setSelectedTemplate(response.data.template_id || 1);
+      setSelectedTemplate(Number(response.data.template_id) || 1);
     } catch (error) {
       console.error('Failed to load CV data:', error);
     } finally {
@@ -173,7 +173,9 @@ const ExperienceForm = ({ data, onUpdate, isPremium }) => {
       }));
     } catch (error) {
       console.error('Failed to get AI suggestions:', error);
-      alert('Failed to get AI suggestions. Please try again.');
+      alert(error.response?.status === 429
+        ? error.response.data.detail
+        : 'Failed to get AI suggestions. Please try again.');
     } finally {
       setAiLoading(prev => ({ ...prev, [expIndex]: false }));
     }
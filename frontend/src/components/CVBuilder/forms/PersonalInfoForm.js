@@ -132,7 +132,9 @@ const PersonalInfoForm = ({ data, onUpdate, isPremium }) => {
       setAiSuggestion(response.data.suggestion || '');
     } catch (error) {
       console.error('Failed to get AI suggestion:', error);
-      alert('Failed to get AI suggestion. Please try again.');
+      alert(error.response?.status === 429
+        ? error.response.data.detail
+        : 'Failed to get AI suggestion. Please try again.');
     } finally {
       setIsGettingAiSuggestion(false);
     }
@@ -1,5 +1,5 @@
 import React, { createContext, useContext, useState, useEffect, useCallback } from 'react';
-import { authAPI } from '../services/api';
+import { authAPI, storeTokens, clearTokens } from '../services/api';
 import toast from 'react-hot-toast';
 import { handleError } from '../utils/errorHandler';
 
@@ -19,7 +19,12 @@ export const AuthProvider = ({ children }) => {
   const [token, setToken] = useState(localStorage.getItem('token'));
 
   const logout = () => {
-    localStorage.removeItem('token');
+    const refreshToken = localStorage.getItem('refreshToken');
+    if (refreshToken) {
+      // End the session server-side; the local logout does not wait for it
+      authAPI.post('/logout', { refresh_token: refreshToken }).catch(() => {});
+    }
+    clearTokens();
     setToken(null);
     setUser(null);
     delete authAPI.defaults.headers.common['Authorization'];
@@ -62,7 +67,7 @@ export const AuthProvider = ({ children }) => {
       const response = await authAPI.post('/login', { email, password });
       const { access_token } = response.data;
       
-      localStorage.setItem('token', access_token);
+      storeTokens(response.data);
       setToken(access_token);
       authAPI.defaults.headers.common['Authorization'] = `Bearer ${access_token}`;
       
@@ -1,13 +1,28 @@
 import React from 'react';
 import { Link } from 'react-router-dom';
-import { useQuery } from 'react-query';
+import { useInfiniteQuery } from 'react-query';
 import { cvService } from '../services/api';
 import { useAuth } from '../contexts/AuthContext';
 
 const DashboardPage = () => {
   const { user } = useAuth();
   
-  const { data: cvs, isLoading, error } = useQuery('cvs', cvService.getCVs);
+  const {
+    data,
+    isLoading,
+    error,
+    fetchNextPage,
+    hasNextPage,
+    isFetchingNextPage
+  } = useInfiniteQuery(
+    'cvs',
+    ({ pageParam }) => cvService.getCVs(pageParam),
+    { getNextPageParam: (lastPage) => lastPage.headers['x-next-cursor'] || undefined }
+  );
+
+  const cvs = data?.pages.flatMap((page) => page.data) || [];
+  // The first page carries the total, however many pages are loaded
+  const totalCVs = Number(data?.pages[0]?.headers['x-total-count'] ?? cvs.length);
 
   if (isLoading) {
     return (
@@ -44,7 +59,7 @@ const DashboardPage = () => {
               </div>
               <div className="ml-4">
                 <p className="text-sm font-medium text-gray-600">Total CVs</p>
-                <p className="text-2xl font-semibold text-gray-900">{cvs?.data?.length || 0}</p>
+                <p className="text-2xl font-semibold text-gray-900">{totalCVs}</p>
               </div>
             </div>
           </div>
@@ -101,7 +116,7 @@ const DashboardPage = () => {
             <div className="text-center py-12">
               <p className="text-red-600">Error loading CVs. Please try again.</p>
             </div>
-          ) : cvs?.data?.length === 0 ? (
+          ) : cvs.length === 0 ? (
             <div className="text-center py-12 bg-white rounded-lg shadow">
               <svg className="w-16 h-16 text-gray-400 mx-auto mb-4" fill="none" stroke="currentColor" viewBox="0 0 24 24">
                 <path strokeLinecap="round" strokeLinejoin="round" strokeWidth={2} d="M9 12h6m-6 4h6m2 5H7a2 2 0 01-2-2V5a2 2 0 012-2h5.586a1 1 0 01.707.293l5.414 5.414a1 1 0 01.293.707V19a2 2 0 01-2 2z" />
@@ -116,32 +131,45 @@ const DashboardPage = () => {
               </Link>
             </div>
           ) : (
-            <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6">
-              {cvs?.data?.map((cv) => (
-                <div key={cv.id} className="bg-white rounded-lg shadow hover:shadow-md transition-shadow">
-                  <div className="p-6">
-                    <h3 className="text-lg font-semibold text-gray-900 mb-2">{cv.title}</h3>
-                    <p className="text-gray-600 text-sm mb-4">
-                      Last updated: {new Date(cv.updated_at || cv.created_at).toLocaleDateString()}
-                    </p>
-                    <div className="flex space-x-2">
-                      <Link
-                        to={`/builder/${cv.id}`}
-                        className="flex-1 bg-primary-600 text-white text-center py-2 px-3 rounded text-sm hover:bg-primary-700 transition-colors"
-                      >
-                        Edit
-                      </Link>
-                      <Link
-                        to={`/preview/${cv.id}`}
-                        className="flex-1 bg-gray-200 text-gray-800 text-center py-2 px-3 rounded text-sm hover:bg-gray-300 transition-colors"
-                      >
-                        Preview
-                      </Link>
+            <>
+              <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6">
+                {cvs.map((cv) => (
+                  <div key={cv.id} className="bg-white rounded-lg shadow hover:shadow-md transition-shadow">
+                    <div className="p-6">
+                      <h3 className="text-lg font-semibold text-gray-900 mb-2">{cv.title}</h3>
+                      <p className="text-gray-600 text-sm mb-4">
+                        Last updated: {new Date(cv.updated_at || cv.created_at).toLocaleDateString()}
+                      </p>
+                      <div className="flex space-x-2">
+                        <Link
+                          to={`/builder/${cv.id}`}
+                          className="flex-1 bg-primary-600 text-white text-center py-2 px-3 rounded text-sm hover:bg-primary-700 transition-colors"
+                        >
+                          Edit
+                        </Link>
+                        <Link
+                          to={`/preview/${cv.id}`}
+                          className="flex-1 bg-gray-200 text-gray-800 text-center py-2 px-3 rounded text-sm hover:bg-gray-300 transition-colors"
+                        >
+                          Preview
+                        </Link>
+                      </div>
                     </div>
                   </div>
+                ))}
+              </div>
+              {hasNextPage && (
+                <div className="text-center mt-6">
+                  <button
+                    onClick={() => fetchNextPage()}
+                    disabled={isFetchingNextPage}
+                    className="bg-white text-gray-800 border border-gray-300 px-6 py-2 rounded-lg hover:bg-gray-100 transition-colors disabled:opacity-50"
+                  >
+                    {isFetchingNextPage ? 'Loading...' : `Load more (${cvs.length} of ${totalCVs})`}
+                  </button>
                 </div>
-              ))}
-            </div>
+              )}
+            </>
           )}
         </div>
 
@@ -36,6 +36,48 @@ export const aiAPI = axios.create({
   },
 });
 
+// Token storage shared by the interceptors and AuthContext
+export const storeTokens = ({ access_token, refresh_token }) => {
+  localStorage.setItem('token', access_token);
+  if (refresh_token) {
+    localStorage.setItem('refreshToken', refresh_token);
+  }
+};
+
+export const clearTokens = () => {
+  localStorage.removeItem('token');
+  localStorage.removeItem('refreshToken');
+};
+
+// Requests that fail together with 401 share a single refresh call
+let refreshPromise = null;
+
+const refreshAccessToken = () => {
+  if (!refreshPromise) {
+    const refreshToken = localStorage.getItem('refreshToken');
+    if (!refreshToken) {
+      return Promise.reject(new Error('No refresh token'));
+    }
+    refreshPromise = axios
+      .post(`${API_BASE_URL}/auth/refresh`, { refresh_token: refreshToken })
+      .then((response) => {
+        storeTokens(response.data);
+        return response.data.access_token;
+      })
+      .catch((error) => {
+        // Another tab may have rotated the refresh token first
+        if (localStorage.getItem('refreshToken') !== refreshToken) {
+          return localStorage.getItem('token');
+        }
+        throw error;
+      })
+      .finally(() => {
+        refreshPromise = null;
+      });
+  }
+  return refreshPromise;
+};
+
 // Request interceptor to add auth token
 const addAuthInterceptor = (apiInstance) => {
   apiInstance.interceptors.request.use(
@@ -54,10 +96,21 @@ const addAuthInterceptor = (apiInstance) => {
   // Response interceptor to handle common errors
   apiInstance.interceptors.response.use(
     (response) => response,
-    (error) => {
+    async (error) => {
+      const request = error.config;
+      if (error.response?.status === 401 && request && !request._retried && request.url !== '/login') {
+        // Access token expired: renew it and retry the request once
+        request._retried = true;
+        try {
+          await refreshAccessToken();
+          return apiInstance(request);
+        } catch (refreshError) {
+          // Fall through to the login redirect
+        }
+      }
       if (error.response?.status === 401) {
         // Token expired or invalid
-        localStorage.removeItem('token');
+        clearTokens();
         window.location.href = '/login';
       }
       return Promise.reject(error);
@@ -73,8 +126,8 @@ addAuthInterceptor(aiAPI);
 
 // CV API functions
 export const cvService = {
-  // Get all CVs for current user
-  getCVs: () => cvAPI.get('/'),
+  // Get a page of CV summaries; the next page's cursor is in the X-Next-Cursor header
+  getCVs: (cursor) => cvAPI.get('/', { params: cursor ? { cursor } : {} }),
   
   // Get specific CV by ID
   getCV: (id) => cvAPI.get(`/${id}`),
@@ -85,6 +138,9 @@ export const cvService = {
   // Update CV
   updateCV: (id, cvData) => cvAPI.put(`/${id}`, cvData),
   
+  // Apply JSON Patch operations to a CV (autosave)
+  patchCV: (id, version, operations) => cvAPI.patch(`/${id}`, { version, operations }),
+  
   // Delete CV
   deleteCV: (id) => cvAPI.delete(`/${id}`),
   
@@ -118,6 +174,13 @@ export const authService = {
   // Login
   login: (credentials) => authAPI.post('/login', credentials),
   
+  // End the session of a refresh token
+  logout: (refreshToken) => authAPI.post('/logout', { refresh_token: refreshToken }),
+  
+  // List / revoke logged-in devices
+  getSessions: () => authAPI.get('/sessions'),
+  revokeSession: (sessionId) => authAPI.delete(`/sessions/${sessionId}`),
+  
   // Register
   register: (userData) => authAPI.post('/register', userData),
   
@@ -126,6 +189,9 @@ export const authService = {
   
   // Update user
   updateUser: (userData) => authAPI.put('/me', userData),
+  
+  // Plan and remaining AI/PDF quota
+  getLimits: () => authAPI.get('/me/limits'),
 };
 
 // AI API functions
@@ -135,6 +201,9 @@ export const aiService = {
   
   // Suggest job description
   suggestJobDescription: (data) => aiAPI.post('/suggest-job-description', data),
+  
+  // Suggest job descriptions for several experience entries in one request
+  suggestJobDescriptionsBatch: (entries) => aiAPI.post('/suggest-job-descriptions/batch', { entries }),
 };
 
 const apiServices = {